@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Per-call cost of building and preparing requests with and without prepared templates.
+
+Usage: python benchmarks/bench_request.py [--number N]
+"""
+
+import argparse
+import os.path
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pycryptoclients.markets.stocks_exchange.request import TickerRequest, GraficPublicRequest  # noqa: E402
+
+
+class NoTemplateTickerRequest(TickerRequest):
+    use_templates = False
+
+
+class NoTemplateGraficPublicRequest(GraficPublicRequest):
+    use_templates = False
+
+
+CASES = (
+    ('ticker', TickerRequest, NoTemplateTickerRequest, {}),
+    ('grafic', GraficPublicRequest, NoTemplateGraficPublicRequest, {'currency1': 'BTC', 'currency2': 'USDT'}),
+)
+
+
+def measure(request_class, kwargs: dict, number: int) -> float:
+    return min(timeit.repeat(lambda: request_class(**kwargs).prepare(), number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=10000, help='calls per measurement')
+    args = parser.parse_args()
+
+    print('{:<10} {:>14} {:>15} {:>9}'.format('request', 'template, us', 'no template, us', 'speedup'))
+
+    for name, request_class, no_template_class, kwargs in CASES:
+        with_template = measure(request_class, kwargs, args.number)
+        without_template = measure(no_template_class, kwargs, args.number)
+        print('{:<10} {:>14.1f} {:>15.1f} {:>8.1f}x'.format(name, with_template, without_template,
+                                                            without_template / with_template))
+
+
+if __name__ == '__main__':
+    main()
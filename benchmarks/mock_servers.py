@@ -0,0 +1,172 @@
+"""
+In-process HTTP stand-ins for Stocks.Exchange API and Dash JSON-RPC server (dashd) which are used by benchmarks.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+
+__all__ = ('MockServer', 'MockExchange', 'MockDashd', 'make_ticker', 'make_trades')
+
+
+def make_ticker(size: int) -> list:
+    return [
+        {
+            'min_order_amount': '0.00000010',
+            'ask': '0.{:08d}'.format(3300 + i),
+            'bid': '0.{:08d}'.format(2905 + i),
+            'last': '0.{:08d}'.format(2905 + i),
+            'lastDayAgo': '0.00003094',
+            'vol': '{}.35219464'.format(2665 + i),
+            'spread': '0',
+            'buy_fee_percent': '0',
+            'sell_fee_percent': '0',
+            'market_name': 'C{}_BTC'.format(i),
+            'updated_time': 1520779505 + i,
+            'server_time': 1520779505 + i
+        } for i in range(size)
+    ]
+
+
+def make_trades(size: int) -> dict:
+    return {
+        'success': 1,
+        'result': [
+            {
+                'id': 1000000 - i,
+                'timestamp': 1523479914 - i,
+                'quantity': '{}.85310747'.format(i % 100),
+                'price': '0.{:08d}'.format(3251 + i % 1000),
+                'type': 'SELL' if i % 2 else 'BUY'
+            } for i in range(size)
+        ]
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately, delayed ACK would add tens of milliseconds to every response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, body: bytes, status: int=200):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+    def do_GET(self):
+        self.server.owner.handle_get(self)
+
+    def do_POST(self):
+        self.server.owner.handle_post(self, self._read_body())
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    # `http.server.ThreadingHTTPServer` is not available before Python 3.7
+    daemon_threads = True
+
+
+class MockServer(object):
+    """
+    HTTP server on a free local port running in background thread, usable as context manager.
+    """
+
+    def __init__(self):
+        super(MockServer, self).__init__()
+        self._server = _ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.owner = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return 'http://127.0.0.1:{}'.format(self._server.server_address[1])
+
+    def handle_get(self, handler: _Handler):
+        handler._respond(b'{}', status=404)
+
+    def handle_post(self, handler: _Handler, body: bytes):
+        handler._respond(b'{}', status=404)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class MockExchange(MockServer):
+    """
+    Stand-in for Stocks.Exchange API: public `ticker` and `trades` with payloads of configurable size and private
+    methods which require signed requests. Base URL for requests is `base_url`.
+    """
+
+    def __init__(self, ticker_size: int=100, trades_size: int=1000):
+        super(MockExchange, self).__init__()
+        self.responses = {
+            '/api2/ticker': json.dumps(make_ticker(ticker_size)).encode('utf-8'),
+            '/api2/trades': json.dumps(make_trades(trades_size)).encode('utf-8')
+        }
+        self.private_response = json.dumps({'success': 1, 'data': {'funds': {'BTC': '1.5'}}}).encode('utf-8')
+
+    @property
+    def base_url(self) -> str:
+        return self.url + '/api2/{method}'
+
+    def handle_get(self, handler: _Handler):
+        # e.g. /api2/trades/BTC/USDT is served by /api2/trades
+        body = self.responses.get('/'.join(handler.path.split('?', 1)[0].split('/')[:3]))
+
+        if body is None:
+            return super(MockExchange, self).handle_get(handler)
+
+        handler._respond(body)
+
+    def handle_post(self, handler: _Handler, body: bytes):
+        if not handler.headers.get('Key') or not handler.headers.get('Sign'):
+            return handler._respond(b'{"success": 0, "error": "Not signed"}')
+
+        handler._respond(self.private_response)
+
+
+class MockDashd(MockServer):
+    """
+    Stand-in for Dash JSON-RPC server which answers every call (single or batch) with `result` of `getinfo`.
+    """
+
+    result = {
+        'version': 1010000,
+        'protocolversion': 70210,
+        'blocks': 131248,
+        'connections': 17,
+        'difficulty': 38.5859083016134,
+        'errors': ''
+    }
+
+    def handle_post(self, handler: _Handler, body: bytes):
+        calls = json.loads(body.decode('utf-8'))
+
+        if isinstance(calls, list):
+            response = [{'result': self.result, 'error': None, 'id': call['id']} for call in calls]
+        else:
+            response = {'result': self.result, 'error': None, 'id': calls['id']}
+
+        handler._respond(json.dumps(response).encode('utf-8'))
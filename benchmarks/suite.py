@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks and load tests of clients against local mock Stocks.Exchange API and mock dashd.
+
+Cases measure overhead of single call over local HTTP, cache hit path, HMAC signing of private requests, parsing of
+large payloads and throughput of concurrent calls. Results are printed as time per operation and operations per second.
+They can be saved as JSON baseline and later runs compared with it: cases slower than baseline by more than tolerance
+are reported as regressions and the suite exits with status 1.
+
+Usage: python benchmarks/suite.py [--number N] [--filter SUBSTRING] [--workers N] [--save-baseline [PATH]]
+       [--compare [PATH]] [--tolerance FRACTION]
+"""
+
+import argparse
+import io
+import json
+import os.path
+import sys
+import timeit
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_servers import MockExchange, MockDashd  # noqa: E402
+from pycryptoclients.markets.stocks_exchange.api import StocksExchangeAPI  # noqa: E402
+from pycryptoclients.markets.stocks_exchange.response import StocksExchangeResponseParser, TickerParser, \
+    TradeHistoryParser, TradeHistoryColumnsParser  # noqa: E402
+from pycryptoclients.markets.stocks_exchange.request import GetAccountInfoRequest  # noqa: E402
+from pycryptoclients.wallets.dash.api import DashWalletRPCClient  # noqa: E402
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_TOLERANCE = 0.25
+
+TICKER_SIZE = 1000
+TRADES_SIZE = 10000
+DASH_BATCH_SIZE = 500
+
+
+def make_response(content: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(content)
+    return response
+
+
+def make_loaded_response(content: bytes) -> requests.Response:
+    response = make_response(content)
+    response._content = content
+    return response
+
+
+class Case(object):
+    """
+    Benchmarked operation: `func` is called `number` times per measurement, every call performs `ops` operations.
+    """
+
+    def __init__(self, name: str, func, ops: int=1, number: int=None):
+        super(Case, self).__init__()
+        self.name = name
+        self.func = func
+        self.ops = ops
+        self.number = number
+
+    def measure(self, number: int, repeat: int) -> float:
+        number = self.number or number
+        return min(timeit.repeat(self.func, number=number, repeat=repeat)) / (number * self.ops)
+
+
+def make_cases(exchange: MockExchange, dashd: MockDashd, workers: int) -> list:
+    base_url = exchange.base_url
+    api = StocksExchangeAPI(ssl_enabled=False, api_key='key', api_secret='secret', pool_maxsize=workers)
+    dash = DashWalletRPCClient(ssl_enabled=False, rpc_user='user', rpc_password='password', rpc_url=dashd.url,
+                               pool_maxsize=workers)
+
+    ticker = exchange.responses['/api2/ticker']
+    trades = exchange.responses['/api2/trades']
+
+    # response of cache hit path is saved once before measurement
+    api.call('ticker', base_url=base_url, saving_id='bench', saving_time=3600)
+
+    def sign_private_request():
+        GetAccountInfoRequest(base_url=base_url, auth=api._auth).prepare()
+
+    def consume_stream(parser, content: bytes):
+        for _ in parser.parse_stream(make_response(content)):
+            pass
+
+    ticker_calls = [('ticker', {'base_url': base_url, 'saving_time': 0})] * (workers * 10)
+
+    return [
+        Case('call ticker (no cache)', lambda: api.call('ticker', base_url=base_url, saving_time=0)),
+        Case('call ticker (cache hit)', lambda: api.call('ticker', base_url=base_url, saving_id='bench',
+                                                         saving_time=3600)),
+        Case('call get_account_info (signed)', lambda: api.call('get_account_info', base_url=base_url)),
+        Case('prepare signed request', sign_private_request),
+        Case('parse ticker x{} raw'.format(TICKER_SIZE),
+             lambda: StocksExchangeResponseParser.parse(make_loaded_response(ticker)), number=20),
+        Case('parse ticker x{} typed'.format(TICKER_SIZE),
+             lambda: TickerParser.parse(make_loaded_response(ticker)), number=20),
+        Case('parse ticker x{} stream'.format(TICKER_SIZE),
+             lambda: consume_stream(StocksExchangeResponseParser, ticker), number=5),
+        Case('parse trades x{} raw'.format(TRADES_SIZE),
+             lambda: StocksExchangeResponseParser.parse(make_loaded_response(trades)), number=5),
+        Case('parse trades x{} typed'.format(TRADES_SIZE),
+             lambda: TradeHistoryParser.parse(make_loaded_response(trades)), number=5),
+        Case('parse trades x{} columnar'.format(TRADES_SIZE),
+             lambda: TradeHistoryColumnsParser.parse(make_loaded_response(trades)), number=5),
+        Case('call_many ticker x{} ({} workers)'.format(len(ticker_calls), workers),
+             lambda: api.call_many(ticker_calls, max_workers=workers), ops=len(ticker_calls), number=2),
+        Case('dash call getinfo', lambda: dash.call('getinfo', saving_time=0)),
+        Case('dash batch getinfo x{}'.format(DASH_BATCH_SIZE),
+             lambda: dash.batch(['getinfo'] * DASH_BATCH_SIZE), ops=DASH_BATCH_SIZE, number=5),
+    ], (api, dash)
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Returns names of cases which are slower than baseline by more than `tolerance` (fraction of baseline time).
+    """
+    return [name for name, seconds in results.items()
+            if name in baseline and seconds > baseline[name] * (1 + tolerance)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=200, help='calls per measurement of cheap cases')
+    parser.add_argument('--repeat', type=int, default=3, help='measurements per case, the best one is reported')
+    parser.add_argument('--filter', default='', help='run only cases which contain substring')
+    parser.add_argument('--workers', type=int, default=8, help='threads of concurrent calls')
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                        help='save results as JSON baseline (default: benchmarks/baseline.json)')
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                        help='compare results with JSON baseline and exit with status 1 on regression')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed slowdown against baseline as fraction of its time')
+    args = parser.parse_args()
+
+    baseline = None
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = {}
+
+    with MockExchange(ticker_size=TICKER_SIZE, trades_size=TRADES_SIZE) as exchange, MockDashd() as dashd:
+        cases, clients = make_cases(exchange, dashd, args.workers)
+
+        try:
+            print('{:<40} {:>12} {:>12} {:>10}'.format('case', 'us/op', 'ops/s', 'baseline'))
+
+            for case in cases:
+                if args.filter not in case.name:
+                    continue
+
+                seconds = results[case.name] = case.measure(args.number, args.repeat)
+                change = '{:+.0%}'.format(seconds / baseline[case.name] - 1) \
+                    if baseline and case.name in baseline else ''
+                print('{:<40} {:>12.1f} {:>12.0f} {:>10}'.format(case.name, seconds * 1e6, 1 / seconds, change))
+        finally:
+            for client in clients:
+                client.close()
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+
+        if regressions:
+            print('Regressions over {:.0%} against {}: {}'.format(args.tolerance, args.compare,
+                                                                  ', '.join(regressions)))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
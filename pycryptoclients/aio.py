@@ -0,0 +1,442 @@
+import asyncio
+import collections
+import requests
+import time
+from requests.structures import CaseInsensitiveDict
+from typing import Type
+
+from pycryptoclients.api import CCAPI, CCRPC
+from pycryptoclients.delta import DeltaTracker
+from pycryptoclients.exc import CCAPIResponseParsingException
+from pycryptoclients.instrumentation import CACHE_HIT, CACHE_MISS, CACHE_STALE, CACHE_REFRESH
+from pycryptoclients.request import BaseCCRequest
+from pycryptoclients.response import CCAPIResponseParser, CCAPIResponse, DEFAULT_STREAM_CHUNK_SIZE
+from pycryptoclients.utils import ENCODING
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+__all__ = ('AsyncCCAPIMixin', 'AsyncResponseStream', 'AsyncCCAPI', 'AsyncCCRPC', 'DEFAULT_CONCURRENCY')
+
+
+DEFAULT_CONCURRENCY = 100
+DEFAULT_CONNECTOR_LIMIT = 100
+DEFAULT_CONNECTOR_LIMIT_PER_HOST = 0
+
+
+class AsyncCCAPIMixin(object):
+    """
+    Turns API client into asyncio client: `call` and `query` become coroutines which send requests with aiohttp.
+
+    Methods registry, requests and response parsers of client are reused as is, requests are prepared (and signed)
+    by `requests` and parsers get `requests.Response` built from aiohttp response. All calls share one
+    `aiohttp.ClientSession` (it can be passed as `client_session` to share it between clients), number of requests
+    in flight is limited by `concurrency`. Client is closed by `aclose` or used as `async with` context manager.
+
+    Errors of aiohttp are raised as `requests.exceptions.ConnectionError`, so they are retried and counted by circuit
+    breaker like errors of synchronous client. Operations of cache backends which block on disk or network I/O (e.g.
+    SQLite and Redis) are run in default executor of event loop.
+    """
+
+    def __init__(self, *args, concurrency: int=DEFAULT_CONCURRENCY, connector_limit: int=DEFAULT_CONNECTOR_LIMIT,
+                 connector_limit_per_host: int=DEFAULT_CONNECTOR_LIMIT_PER_HOST, client_session=None, **kwargs):
+        if aiohttp is None:
+            raise ImportError('Install aiohttp to use {}'.format(self.__class__.__name__))
+
+        super(AsyncCCAPIMixin, self).__init__(*args, **kwargs)
+        self._concurrency = concurrency
+        self._connector_limit = connector_limit
+        self._connector_limit_per_host = connector_limit_per_host
+        self._client_session = client_session
+        self._owns_client_session = client_session is None
+        self._semaphore = None
+        self._async_flights = {}
+        self._async_refreshes = {}
+
+    def _get_client_session(self):
+        # session and semaphore are created lazily because they have to be bound to running event loop
+        if self._client_session is None or self._client_session.closed:
+            connector = aiohttp.TCPConnector(limit=self._connector_limit, limit_per_host=self._connector_limit_per_host)
+            self._client_session = aiohttp.ClientSession(connector=connector)
+            self._owns_client_session = True
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+
+        return self._client_session
+
+    async def aclose(self):
+        # background refreshes in flight are not waited for
+        for task in list(self._async_refreshes.values()):
+            task.cancel()
+
+        super(AsyncCCAPIMixin, self).close()
+
+        if self._owns_client_session and self._client_session is not None:
+            await self._client_session.close()
+            self._client_session = None
+
+    def __enter__(self):
+        raise TypeError('Use "async with" with {}'.format(self.__class__.__name__))
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    @staticmethod
+    def _make_response(prepared_request: requests.PreparedRequest, resp, content: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = resp.status
+        response.reason = resp.reason
+        response.headers = CaseInsensitiveDict(resp.headers)
+        response.url = str(resp.url)
+        response.encoding = resp.charset
+        response.request = prepared_request
+        response._content = content
+        return response
+
+    async def _send(self, req: requests.Request, stream: bool=False) -> requests.Response:
+        timings = req.timings
+        delay = self._reserve_rate_limit(req)
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if timings is not None:
+            timings.attempts += 1
+            timings.rate_limit += max(delay, 0.0)
+            started = time.perf_counter()
+
+        prepared_request = req.prepare()
+        session = self._get_client_session()
+
+        if timings is not None:
+            timings.prepare += time.perf_counter() - started
+
+        # requests allows header values in bytes (e.g. API key), aiohttp does not
+        headers = {k: v.decode(ENCODING) if isinstance(v, bytes) else v for k, v in prepared_request.headers.items()}
+
+        try:
+            async with self._semaphore:
+                sent = time.perf_counter()
+
+                resp = await session.request(prepared_request.method, prepared_request.url, headers=headers,
+                                             data=prepared_request.body, ssl=None if self._ssl_enabled else False)
+                received = time.perf_counter()
+
+                if timings is not None:
+                    timings.status_code = resp.status
+                    timings.server += received - sent
+
+                if stream and resp.status < 400:
+                    # body of streamed response is read by `AsyncResponseStream`
+                    content = False
+                else:
+                    try:
+                        content = await resp.read()
+                    finally:
+                        resp.release()
+
+                    if timings is not None:
+                        timings.download += time.perf_counter() - received
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # errors of aiohttp are reported in the same way as errors of synchronous client
+            raise requests.exceptions.ConnectionError(e, request=prepared_request) from e
+
+        response = self._make_response(prepared_request, resp, content)
+
+        if content is False:
+            response.raw = resp
+
+        response.raise_for_status()
+        return response
+
+    async def _query(self, req: requests.Request, stream: bool=False) -> requests.Response:
+        attempt = 0
+
+        while True:
+            circuit = self._acquire_circuit(req)
+
+            try:
+                response = await self._send(req, stream=stream)
+            except requests.exceptions.RequestException as e:
+                self._record_circuit(circuit, e)
+                attempt += 1
+                retry_delay = self._get_retry_delay(req, e, attempt)
+
+                if retry_delay is None:
+                    raise
+
+                if req.timings is not None:
+                    req.timings.retries += 1
+                    req.timings.retry_wait += retry_delay
+
+                await asyncio.sleep(retry_delay)
+            except BaseException:
+                # e.g. cancelled coroutine
+                self._release_circuit(circuit)
+                raise
+            else:
+                self._record_circuit(circuit)
+                return response
+
+    async def _run_cache_io(self, func, *args):
+        # operations of disk and network cache backends must not block event loop
+        if not self._cache.blocking_io:
+            return func(*args)
+        return await asyncio.get_event_loop().run_in_executor(None, func, *args)
+
+    async def _save_query(self, parser: Type[CCAPIResponseParser], req: BaseCCRequest, key: str, timestamp: float,
+                          saving_time: float, stale_time: float=0.0) -> CCAPIResponse:
+        response_data = self._parse(parser, req, await self._query(req))
+        await self._run_cache_io(self._save_response, key, response_data, timestamp, saving_time + stale_time)
+        return response_data
+
+    async def _refresh_saved(self, parser: Type[CCAPIResponseParser], req: BaseCCRequest, key: str,
+                             saving_time: float, stale_time: float):
+        exc = None
+
+        try:
+            timestamp = time.time()
+            response_data = self._check_response(self._parse(parser, req, await self._query(req)))
+            await self._run_cache_io(self._save_response, key, response_data, timestamp, saving_time + stale_time)
+        except Exception as e:
+            exc = e
+        finally:
+            if req.timings is not None:
+                self._complete_call(req, exc)
+
+    def _refresh_in_background(self, parser: Type[CCAPIResponseParser], req: BaseCCRequest, key: str,
+                               saving_time: float, stale_time: float):
+        if key in self._async_refreshes:
+            return
+
+        task = self._async_refreshes[key] = asyncio.ensure_future(
+            self._refresh_saved(parser, self._copy_request(req, CACHE_REFRESH), key, saving_time, stale_time))
+        task.add_done_callback(lambda t: self._async_refreshes.pop(key, None))
+
+    async def _query_with_saving(self, parser: Type[CCAPIResponseParser], req: BaseCCRequest, saving_id: str,
+                                 saving_time: float, stale_time: float=None,
+                                 refresh_ahead: float=None) -> CCAPIResponse:
+        if not saving_time:
+            return self._parse(parser, req, await self._query(req))
+
+        unix_timestamp_now = time.time()
+        key = self._make_saving_key(saving_id, req)
+        stale_time, refresh_ahead = self._get_stale_times(saving_time, stale_time, refresh_ahead)
+        response_data, age = await self._run_cache_io(self._get_saved_entry, key, unix_timestamp_now)
+
+        if response_data is not None and age < saving_time + stale_time:
+            if age >= saving_time - refresh_ahead:
+                self._refresh_in_background(parser, req, key, saving_time, stale_time)
+
+            if req.timings is not None:
+                req.timings.cache = CACHE_HIT if age < saving_time else CACHE_STALE
+
+            return response_data
+
+        if req.timings is not None:
+            req.timings.cache = CACHE_MISS
+
+        # concurrent coroutines for the same key wait for single request in flight
+        flight = self._async_flights.get(key)
+
+        if flight is None:
+            flight = self._async_flights[key] = asyncio.ensure_future(
+                self._save_query(parser, req, key, unix_timestamp_now, saving_time, stale_time))
+            flight.add_done_callback(lambda f: self._async_flights.pop(key, None))
+
+        return await asyncio.shield(flight)
+
+    async def _call_safe(self, method: str, kwargs: dict) -> CCAPIResponse:
+        try:
+            return await self.call(method, **kwargs)
+        except Exception as e:
+            return CCAPIResponse(None, exc=e)
+
+    async def call_many(self, calls) -> list:
+        """
+        Executes calls concurrently, number of requests in flight is limited by `concurrency` of client.
+        """
+        return list(await asyncio.gather(*[self._call_safe(method, kwargs)
+                                           for method, kwargs in self._normalize_calls(calls)]))
+
+    def iter_call_many(self, calls):
+        """
+        Executes calls concurrently and returns iterator of awaitables which resolve to pairs of (index of call,
+        response) in order of completion.
+        """
+        async def indexed_call(i, method, kwargs):
+            return i, await self._call_safe(method, kwargs)
+
+        return asyncio.as_completed([indexed_call(i, method, kwargs)
+                                     for i, (method, kwargs) in enumerate(self._normalize_calls(calls))])
+
+    async def query_delta(self, tracker: DeltaTracker, parser: Type[CCAPIResponseParser], req: Type[BaseCCRequest],
+                          **kwargs) -> CCAPIResponse:
+        _req = self._make_request(req, **kwargs)
+
+        try:
+            response = await self._query(_req)
+
+            if tracker.is_unchanged(response.content):
+                cc_resp = CCAPIResponse(tracker.update(None, response.content))
+            else:
+                cc_resp = self._check_response(self._parse(parser, _req, response))
+                cc_resp.data = tracker.update(cc_resp.data, response.content)
+        except Exception as e:
+            if _req.timings is not None:
+                self._complete_call(_req, e)
+            raise
+
+        if _req.timings is not None:
+            self._complete_call(_req)
+
+        return cc_resp
+
+    def query_stream(self, parser: Type[CCAPIResponseParser], req: Type[BaseCCRequest],
+                     chunk_size: int=DEFAULT_STREAM_CHUNK_SIZE, **kwargs) -> 'AsyncResponseStream':
+        """
+        Returns asynchronous iterator of items of response (see `AsyncResponseStream`), request is sent when the first
+        item is awaited.
+        """
+        return AsyncResponseStream(self, parser.make_stream(), self._make_request(req, **kwargs), chunk_size=chunk_size)
+
+    async def query(self, parser: Type[CCAPIResponseParser], req: Type[BaseCCRequest], saving_id: str=None,
+                    saving_time: float=None, stale_time: float=None, refresh_ahead: float=None,
+                    **kwargs) -> CCAPIResponse:
+        _req = self._make_request(req, **kwargs)
+        saved_error = self._get_saved_error(_req)
+
+        try:
+            if saved_error is not None:
+                raise saved_error
+
+            saving_id = self._get_saving_id(_req, saving_id)
+
+            if saving_id:
+                response = await self._query_with_saving(parser, _req, saving_id, saving_time, stale_time,
+                                                         refresh_ahead)
+            else:
+                response = self._parse(parser, _req, await self._query(_req))
+
+            response = self._check_response(response)
+        except Exception as e:
+            if saved_error is None:
+                self._save_error(_req, e)
+
+            if _req.timings is not None:
+                self._complete_call(_req, e)
+            raise
+
+        if _req.timings is not None:
+            self._complete_call(_req)
+
+        return response
+
+
+class AsyncResponseStream(object):
+    """
+    Asynchronous iterator of items of streamed response (`async for item in api.call_stream(...)`): chunks of body
+    are fed to incremental parser of response (see `CCAPIResponseParser.make_stream`) while they are received.
+    Connection is released when response is consumed, iteration fails or iterator is closed by `aclose` (or used as
+    `async with` context manager).
+    """
+
+    def __init__(self, client: AsyncCCAPIMixin, stream, req: BaseCCRequest, chunk_size: int=DEFAULT_STREAM_CHUNK_SIZE):
+        super(AsyncResponseStream, self).__init__()
+        self.client = client
+        self.stream = stream
+        self.req = req
+        self.chunk_size = chunk_size
+        self._response = None
+        self._items = collections.deque()
+        self._closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            while not self._items:
+                if self._closed:
+                    raise StopAsyncIteration
+
+                self._items.extend(await self._read())
+        except StopAsyncIteration:
+            raise
+        except Exception as e:
+            self._finish(e)
+            raise
+
+        return self._items.popleft()
+
+    async def _read(self) -> list:
+        if self._response is None:
+            self._response = await self.client._query(self.req, stream=True)
+
+        resp = self._response.raw
+        timings = self.req.timings
+
+        try:
+            started = time.perf_counter()
+            chunk = await resp.content.read(self.chunk_size)
+
+            if timings is not None:
+                timings.download += time.perf_counter() - started
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise requests.exceptions.ConnectionError(e, request=self._response.request) from e
+
+        try:
+            if chunk:
+                return self.stream.feed(chunk)
+
+            items = self.stream.close()
+        except ValueError as e:
+            raise CCAPIResponseParsingException(exc=e, response=self._response)
+
+        self._finish()
+        return items
+
+    def _finish(self, exc: Exception=None):
+        if self._closed:
+            return
+
+        self._closed = True
+
+        if self._response is not None:
+            self._response.raw.release()
+
+        # time of streamed call includes processing of items by consumer
+        if self.req.timings is not None:
+            self.client._complete_call(self.req, exc)
+
+    async def aclose(self):
+        self._items.clear()
+        self._finish()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+
+class AsyncCCAPI(AsyncCCAPIMixin, CCAPI):
+    """
+    Asyncio client for cryptocurrency markets/exchanges
+    """
+
+
+class AsyncCCRPC(AsyncCCAPIMixin, CCRPC):
+    """
+    Asyncio RPC client for cryptowallets.
+    """
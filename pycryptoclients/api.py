@@ -1,26 +1,32 @@
+import copy
+import hashlib
 import requests
-import time
 import threading
-import warnings
-from typing import Type
-
-from pycryptoclients.exc import CCAPINoMethodException
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Type, Iterator, Tuple
+
+from pycryptoclients.auth import HmacAuth
+from pycryptoclients.cache import BaseCacheBackend, MemoryCacheBackend
+from pycryptoclients.circuit import CircuitBreaker
+from pycryptoclients.codec import JSONCodec, get_default_codec
+from pycryptoclients.delta import DeltaTracker
+from pycryptoclients.exc import CCAPINoMethodException, CCAPIDataException
+from pycryptoclients.instrumentation import BaseInstrument, CallTimings, CACHE_HIT, CACHE_MISS, CACHE_STALE, \
+    CACHE_REFRESH, CACHE_ERROR, emit
+from pycryptoclients.nonce import NonceGenerator
+from pycryptoclients.ratelimit import RateLimiter
+from pycryptoclients.retry import RetryPolicy
 from pycryptoclients.request import BaseCCRequest
-from pycryptoclients.response import CCAPIResponseParser, CCAPIResponse
-from pycryptoclients.utils import ENCODING
+from pycryptoclients.response import CCAPIResponseParser, CCAPIResponse, DEFAULT_STREAM_CHUNK_SIZE, call_parser, \
+    iter_stream
+from pycryptoclients.session import CCSession
+from pycryptoclients.utils import ENCODING, SingleFlight
 
 
 __all__ = ('APIMethod', 'BaseCCAPI', 'CCAPI', 'CCRPC')
 
 
-try:
-    import cachecontrol
-    cache_adapter = cachecontrol.CacheControlAdapter()
-except ImportError:
-    warnings.warn('Caching is not enabled. Install CacheControl for cache enabling', ImportWarning)
-    cache_adapter = None
-
-
 class APIMethod(object):
 
     def __init__(self, name: str, request: Type[BaseCCRequest], parser: Type[CCAPIResponseParser]):
@@ -30,15 +36,75 @@ class APIMethod(object):
 
 
 ONE_MINUTE = 60.0
+DEFAULT_SAVING_ID = 'default'
+DEFAULT_MAX_WORKERS = 10
+DEFAULT_REFRESH_WORKERS = 4
+DEFAULT_ERROR_SAVING_EXCEPTIONS = (CCAPIDataException, requests.exceptions.HTTPError)
+DEFAULT_MAX_SAVED_ERRORS = 1024
+ERROR_SAVING_ID = 'error'
 
 
 class BaseCCAPI(object):
+    """
+    Base API client.
+
+    All calls of client are sent through single pooled HTTP session, so connections to API host are reused. Pool is
+    configured with `session_kwargs` (see `CCSession`) or the whole `session` can be shared between several clients.
+    Client must be closed with `close()` or used as context manager to release pooled connections, shared session is
+    not closed by clients and has to be closed by its owner.
+
+    Saved responses are kept in `cache` backend (in-memory LRU cache by default, see `pycryptoclients.cache`), its
+    connections are released by `close()` too. With `save_responses` enabled responses of all cacheable requests are
+    saved even if `saving_id` is not passed.
 
-    def __init__(self, ssl_enabled: bool=True, api_methods: dict=None):
+    Saved responses can be served stale: for `stale_time` seconds after `saving_time` expired saved response is still
+    returned immediately while it is refreshed in background by one of `refresh_workers` threads. With `refresh_ahead`
+    set response is refreshed in background already when it is older than `saving_time - refresh_ahead`, so hot
+    responses (e.g. `ticker`) are never served stale. Both can be overridden per call.
+
+    Requests to endpoints which keep failing are rejected at once by `circuit_breaker` if it is set (see
+    `pycryptoclients.circuit`). With `error_saving_time` set, errors of idempotent requests (`error_saving_exceptions`,
+    by default errors reported by API and HTTP errors) are saved in memory and raised again for the same requests
+    (of the same account for private requests) during this time without sending them.
+
+    Requests sent to API (but not saved responses) are throttled by `rate_limiter` if it is set. Requests failed with
+    transient errors are retried according to `retry_policy` if it is set.
+
+    Request bodies and responses are encoded and decoded by `codec`, by default by standard library (see
+    `pycryptoclients.codec`).
+
+    Timings of phases of every call (see `CallTimings`) are passed to `instruments` (callbacks, logging, metrics
+    registry or OpenTelemetry spans, see `pycryptoclients.instrumentation`). Nothing is measured without instruments.
+    """
+
+    def __init__(self, ssl_enabled: bool=True, api_methods: dict=None, session: CCSession=None,
+                 cache: BaseCacheBackend=None, save_responses: bool=False, rate_limiter: RateLimiter=None,
+                 retry_policy: RetryPolicy=None, codec: JSONCodec=None, instruments=None, stale_time: float=0.0,
+                 refresh_ahead: float=0.0, refresh_workers: int=DEFAULT_REFRESH_WORKERS,
+                 circuit_breaker: CircuitBreaker=None, error_saving_time: float=0.0,
+                 error_saving_exceptions=DEFAULT_ERROR_SAVING_EXCEPTIONS, **session_kwargs):
         super(BaseCCAPI, self).__init__()
-        self._lock = threading.RLock()
-        self._saved_data = {}
+        self._codec = codec if codec is not None else get_default_codec()
+        self._instruments = tuple(instruments) if instruments else ()
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        self._cache = cache if cache is not None else MemoryCacheBackend()
+        self._save_responses = save_responses
+        self._flights = SingleFlight()
+        self._stale_time = stale_time
+        self._refresh_ahead = refresh_ahead
+        self._refresh_workers = refresh_workers
+        self._refresh_lock = threading.Lock()
+        self._refreshing = set()
+        self._refresh_executor = None
+        self._circuit_breaker = circuit_breaker
+        self._error_saving_time = error_saving_time
+        self._error_saving_exceptions = tuple(error_saving_exceptions)
+        # errors are kept apart from saved responses, they are not always serializable by shared cache backends
+        self._errors = MemoryCacheBackend(max_entries=DEFAULT_MAX_SAVED_ERRORS) if error_saving_time else None
         self._ssl_enabled = ssl_enabled
+        self._session = session if session is not None else CCSession(**session_kwargs)
+        self._owns_session = session is None
         self._init_default_api_methods()
         if api_methods:
             self.update_api_methods(api_methods)
@@ -52,113 +118,505 @@ class BaseCCAPI(object):
     def get_available_methods(self):
         return self.api_methods.keys()
 
-    def _query(self, req: requests.Request) -> requests.Response:
-        sess = requests.Session()
+    def add_instrument(self, instrument: BaseInstrument):
+        self._instruments += (instrument,)
+
+    def remove_instrument(self, instrument: BaseInstrument):
+        self._instruments = tuple(i for i in self._instruments if i is not instrument)
+
+    def close(self):
+        with self._refresh_lock:
+            executor, self._refresh_executor = self._refresh_executor, None
 
-        if cache_adapter:
-            sess.mount('https://', cache_adapter)
-            sess.mount('http://', cache_adapter)
+        # background refreshes in flight are completed before pooled connections are released
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+        if self._owns_session:
+            self._session.close()
+
+        self._cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _reserve_rate_limit(self, req: BaseCCRequest) -> float:
+        if self._rate_limiter is None:
+            return 0.0
+        return self._rate_limiter.reserve(req.api_method, getattr(req, 'is_private', False),
+                                          self._get_account_key())
+
+    def _get_retry_delay(self, req: BaseCCRequest, exc: Exception, attempt: int) -> float:
+        if self._retry_policy is None:
+            return None
+        return self._retry_policy.get_retry_delay(req, exc, attempt)
+
+    def _acquire_circuit(self, req: BaseCCRequest) -> tuple:
+        if self._circuit_breaker is None:
+            return None
+        return self._circuit_breaker.acquire(req)
+
+    def _record_circuit(self, token: tuple, exc: Exception=None):
+        if token is not None:
+            self._circuit_breaker.record(token, exc)
+
+    def _release_circuit(self, token: tuple):
+        if token is not None:
+            self._circuit_breaker.release(token)
+
+    def _send(self, req: requests.Request, stream: bool=False) -> requests.Response:
+        timings = req.timings
+        delay = self._reserve_rate_limit(req)
+
+        if delay > 0:
+            time.sleep(delay)
+
+        # request is prepared (and signed with new nonce) for every attempt and only after waiting for rate limit
+        if timings is None:
+            prepared_request = req.prepare()
+            response = self._session.send(prepared_request, verify=self._ssl_enabled, stream=stream)
+        else:
+            timings.attempts += 1
+            timings.rate_limit += max(delay, 0.0)
+            started = time.perf_counter()
+            prepared_request = req.prepare()
+            prepared = time.perf_counter()
+            timings.prepare += prepared - started
+            response = self._session.send(prepared_request, verify=self._ssl_enabled, stream=stream)
+            timings.add_response(response, time.perf_counter() - prepared, stream=stream)
+
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError:
+            response.close()
+            raise
 
-        prepared_request = req.prepare()
-        response = sess.send(prepared_request, verify=self._ssl_enabled)
-        response.raise_for_status()
         return response
 
-    def _save_query(self, parser: Type[CCAPIResponseParser], req: BaseCCRequest, saving_id: str,
-                    timestamp: float, has_data_by_id: bool=True) -> CCAPIResponse:
-        with self._lock:
-            response_data = parser.parse(self._query(req))
-            response = {
-                'data': response_data,
-                'time': timestamp
-            }
+    def _query(self, req: requests.Request, stream: bool=False) -> requests.Response:
+        attempt = 0
+
+        while True:
+            # every attempt passes circuit breaker, so retries stop as soon as circuit is opened
+            circuit = self._acquire_circuit(req)
+
+            try:
+                response = self._send(req, stream=stream)
+            except requests.exceptions.RequestException as e:
+                self._record_circuit(circuit, e)
+                attempt += 1
+                retry_delay = self._get_retry_delay(req, e, attempt)
 
-            if has_data_by_id:
-                self._saved_data[saving_id][req.api_method] = response
+                if retry_delay is None:
+                    raise
 
+                if req.timings is not None:
+                    req.timings.retries += 1
+                    req.timings.retry_wait += retry_delay
+
+                time.sleep(retry_delay)
+            except BaseException:
+                self._release_circuit(circuit)
+                raise
             else:
-                self._saved_data[saving_id] = {
-                    req.api_method: response
-                }
+                self._record_circuit(circuit)
+                return response
 
-            return response_data
+    def _parse(self, parser: Type[CCAPIResponseParser], req: BaseCCRequest,
+               response: requests.Response) -> CCAPIResponse:
+        if req.timings is None:
+            return call_parser(parser.parse, response, codec=self._codec)
+
+        started = time.perf_counter()
+
+        try:
+            return call_parser(parser.parse, response, codec=self._codec)
+        finally:
+            req.timings.parse += time.perf_counter() - started
+
+    def _get_account_key(self):
+        return None
+
+    def _make_saving_key(self, saving_id: str, req: BaseCCRequest) -> str:
+        # responses of authenticated requests depend on account, so clients with different credentials never share
+        # them through common cache backend (requests without `is_private` flag, e.g. RPC calls, are authenticated)
+        account = self._get_account_key() if getattr(req, 'is_private', True) else None
+
+        if not account:
+            return '{}:{}'.format(saving_id, req.cache_key())
+
+        if isinstance(account, str):
+            account = bytes(account, encoding=ENCODING)
+
+        return '{}:{}:{}'.format(saving_id, hashlib.sha1(account).hexdigest(), req.cache_key())
+
+    def _get_saved_response(self, key: str, timestamp: float, saving_time: float) -> CCAPIResponse:
+        response = self._cache.get(key)
+
+        if response:
+            prev_record_time = response['time']
+
+            if prev_record_time and (timestamp - prev_record_time) < saving_time:
+                return response['data']
+
+        return None
+
+    def _get_saved_entry(self, key: str, timestamp: float) -> tuple:
+        """
+        Returns pair of saved response and its age in seconds, `(None, None)` if there is no saved response.
+        """
+        response = self._cache.get(key)
+
+        if response and response['time']:
+            return response['data'], timestamp - response['time']
+
+        return None, None
+
+    def _save_response(self, key: str, response_data: CCAPIResponse, timestamp: float, ttl: float):
+        self._cache.set(key, {
+            'data': response_data,
+            'time': timestamp
+        }, ttl=ttl)
+
+    def _save_query(self, parser: Type[CCAPIResponseParser], req: BaseCCRequest, key: str, timestamp: float,
+                    saving_time: float, stale_time: float=0.0) -> CCAPIResponse:
+        # response could be saved by another flight while this one was waiting for its turn
+        response_data = self._get_saved_response(key, timestamp, saving_time)
+
+        if response_data is None:
+            response_data = self._parse(parser, req, self._query(req))
+            self._save_response(key, response_data, timestamp, saving_time + stale_time)
+
+        return response_data
+
+    def _copy_request(self, req: BaseCCRequest, cache: str=None) -> BaseCCRequest:
+        # request of call is copied, so timings of completed call are not changed by background work
+        _req = copy.copy(req)
+        _req.timings = None
+
+        if self._instruments:
+            _req.timings = CallTimings(req.api_method or type(req).__name__)
+            _req.timings.cache = cache
+
+        return _req
+
+    def _refresh_saved(self, parser: Type[CCAPIResponseParser], req: BaseCCRequest, key: str, saving_time: float,
+                       stale_time: float):
+        exc = None
+
+        try:
+            timestamp = time.time()
+            response_data = self._check_response(self._parse(parser, req, self._query(req)))
+            self._save_response(key, response_data, timestamp, saving_time + stale_time)
+        except Exception as e:
+            # stale response is served until it expires, then callers get error of synchronous request
+            exc = e
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+
+            if req.timings is not None:
+                self._complete_call(req, exc)
+
+    def _refresh_in_background(self, parser: Type[CCAPIResponseParser], req: BaseCCRequest, key: str,
+                               saving_time: float, stale_time: float):
+        with self._refresh_lock:
+            # only one refresh of saved response is in flight
+            if key in self._refreshing:
+                return
+
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(max_workers=self._refresh_workers)
+
+            self._refreshing.add(key)
+            self._refresh_executor.submit(self._refresh_saved, parser, self._copy_request(req, CACHE_REFRESH), key,
+                                          saving_time, stale_time)
+
+    def _get_stale_times(self, saving_time: float, stale_time: float=None, refresh_ahead: float=None) -> tuple:
+        stale_time = self._stale_time if stale_time is None else stale_time
+        refresh_ahead = self._refresh_ahead if refresh_ahead is None else refresh_ahead
+        return max(stale_time or 0.0, 0.0), min(max(refresh_ahead or 0.0, 0.0), saving_time)
 
     def _query_with_saving(self, parser: Type[CCAPIResponseParser], req: BaseCCRequest, saving_id: str,
-                           saving_time: float) -> CCAPIResponse:
+                           saving_time: float, stale_time: float=None, refresh_ahead: float=None) -> CCAPIResponse:
         """
         Method enables user to save parsed response for specified time and prevents additional requests in
         this time interval. This method is convenient for ban avoidance in case of too frequent requests to API.
+        Responses are saved by `saving_id` and key of request (see `BaseCCRequest.cache_key`), so calls of the same
+        method with different parameters do not share saved response.
 
-        Reentrant lock ensures thread safety of method.
+        No lock is held during network I/O. Concurrent callers for the same saved response wait for single request
+        in flight, callers for other responses proceed in parallel.
+
+        Response older than `saving_time` is returned for `stale_time` seconds more and refreshed in background,
+        response older than `saving_time - refresh_ahead` is refreshed in background too.
         """
 
-        # TODO: think about data storing backends (e.g. memcached, redis)
+        if not saving_time:
+            return self._parse(parser, req, self._query(req))
+
+        unix_timestamp_now = time.time()
+        key = self._make_saving_key(saving_id, req)
+        stale_time, refresh_ahead = self._get_stale_times(saving_time, stale_time, refresh_ahead)
 
-        with self._lock:
-            unix_timestamp_now = time.time()
+        # get saved values from previous requests if period of saving is set
+        response_data, age = self._get_saved_entry(key, unix_timestamp_now)
 
-            if saving_time:
-                # get saved values from previous requests if period of saving is set
-                saved_data_by_id = self._saved_data.get(saving_id)
+        if response_data is not None and age < saving_time + stale_time:
+            if age >= saving_time - refresh_ahead:
+                self._refresh_in_background(parser, req, key, saving_time, stale_time)
 
-                if saved_data_by_id:
-                    response = saved_data_by_id.get(req.api_method)
+            if req.timings is not None:
+                req.timings.cache = CACHE_HIT if age < saving_time else CACHE_STALE
 
-                    if response:
-                        prev_record_time = response['time']
-                        response_data = response['data']
+            return response_data
 
-                        if not (prev_record_time and (unix_timestamp_now - prev_record_time) < saving_time):
-                            response_data = self._save_query(parser, req, saving_id, unix_timestamp_now)
+        if req.timings is not None:
+            req.timings.cache = CACHE_MISS
 
-                    else:
-                        response_data = self._save_query(parser, req, saving_id, unix_timestamp_now)
+        return self._flights.do(key, self._save_query, parser, req, key, unix_timestamp_now, saving_time, stale_time)
 
-                else:
-                    response_data = self._save_query(parser, req, saving_id, unix_timestamp_now, has_data_by_id=False)
+    def _get_method(self, method: str) -> APIMethod:
+        _method = self.api_methods.get(method)
+
+        if not _method:
+            raise CCAPINoMethodException(method=method)
 
+        return _method
+
+    def _get_request_kwargs(self, method: str, _method: APIMethod, **kwargs) -> dict:
+        return kwargs
+
+    def call(self, method: str, **kwargs) -> CCAPIResponse:
+        raise NotImplementedError
+
+    def call_stream(self, method: str, *args, chunk_size: int=DEFAULT_STREAM_CHUNK_SIZE, **kwargs) -> Iterator:
+        """
+        Calls API method and yields items of response while it is being received (see
+        `CCAPIResponseParser.parse_stream`). Responses of streamed calls are never saved. Asyncio clients return
+        asynchronous iterator instead (see `pycryptoclients.aio.AsyncResponseStream`).
+        """
+        _method = self._get_method(method)
+        kwargs = self._get_request_kwargs(method, _method, *args, **kwargs)
+        return self.query_stream(_method.parser, _method.request, chunk_size=chunk_size, **kwargs)
+
+    def call_delta(self, method: str, tracker: DeltaTracker, *args, **kwargs) -> CCAPIResponse:
+        """
+        Calls API method which returns list of records and returns `Delta` of records since previous call with the same
+        `tracker` as data of response. Responses of such calls are never saved.
+        """
+        _method = self._get_method(method)
+        kwargs = self._get_request_kwargs(method, _method, *args, **kwargs)
+        for key in ('saving_id', 'saving_time', 'stale_time', 'refresh_ahead'):
+            kwargs.pop(key, None)
+        return self.query_delta(tracker, _method.parser, _method.request, **kwargs)
+
+    @staticmethod
+    def _normalize_calls(calls) -> list:
+        normalized = []
+
+        for call in calls:
+            if isinstance(call, str):
+                normalized.append((call, {}))
             else:
-                response_data = parser.parse(self._query(req))
+                method, kwargs = call
+                normalized.append((method, kwargs or {}))
 
-            return response_data
+        return normalized
 
-    def query(self, parser: Type[CCAPIResponseParser], req: Type[BaseCCRequest], saving_id: str=None,
-              saving_time: float=None, **kwargs) -> CCAPIResponse:
-        _req = req(**kwargs)
+    def _call_safe(self, method: str, kwargs: dict) -> CCAPIResponse:
+        try:
+            return self.call(method, **kwargs)
+        except Exception as e:
+            return CCAPIResponse(None, exc=e)
 
-        if saving_id:
-            response = self._query_with_saving(parser, _req, saving_id, saving_time)
-        else:
-            response = parser.parse(self._query(_req))
+    def iter_call_many(self, calls, max_workers: int=DEFAULT_MAX_WORKERS) -> Iterator[Tuple[int, CCAPIResponse]]:
+        """
+        Executes calls in thread pool and yields pairs of (index of call, response) as soon as calls complete.
+
+        :param calls: sequence of method names or (method name, call kwargs) pairs
+        :param max_workers: number of calls executed in parallel
+        """
+        calls = self._normalize_calls(calls)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self._call_safe, method, kwargs): i for i, (method, kwargs) in enumerate(calls)}
+
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def call_many(self, calls, max_workers: int=DEFAULT_MAX_WORKERS) -> list:
+        """
+        Executes calls in thread pool, all calls share pooled session and saved responses of client.
+
+        :return: list of `CCAPIResponse` in order of calls, exception raised by failed call is set as `exc` of its
+            response
+        """
+        calls = self._normalize_calls(calls)
+        responses = [None] * len(calls)
+
+        for i, response in self.iter_call_many(calls, max_workers=max_workers):
+            responses[i] = response
+
+        return responses
+
+    def _get_saving_id(self, req: BaseCCRequest, saving_id: str=None) -> str:
+        if not saving_id and self._save_responses and req.cacheable:
+            return DEFAULT_SAVING_ID
+        return saving_id
 
+    @staticmethod
+    def _check_response(response: CCAPIResponse) -> CCAPIResponse:
         if not isinstance(response, CCAPIResponse):
             raise TypeError('Response parser must return object of CCAPIResponse type')
+        return response
+
+    def _make_request(self, req: Type[BaseCCRequest], **kwargs) -> BaseCCRequest:
+        if not self._instruments:
+            return req(codec=self._codec, **kwargs)
+
+        timings = CallTimings(kwargs.get('method_name') or req.api_method or req.__name__)
+        _req = req(codec=self._codec, **kwargs)
+        _req.timings = timings
+        timings.build = timings.elapsed()
+        return _req
+
+    def _complete_call(self, req: BaseCCRequest, exc: Exception=None):
+        req.timings.complete(exc)
+        emit(self._instruments, req.timings)
+
+    def _get_saved_error(self, req: BaseCCRequest) -> Exception:
+        if self._errors is None or not req.idempotent:
+            return None
+
+        exc = self._errors.get(self._make_saving_key(ERROR_SAVING_ID, req))
+
+        if exc is None:
+            return None
+
+        if req.timings is not None:
+            req.timings.cache = CACHE_ERROR
+
+        # copy is raised, so tracebacks of callers are not chained to the same exception
+        return copy.copy(exc)
+
+    def _save_error(self, req: BaseCCRequest, exc: Exception):
+        if self._errors is not None and req.idempotent and isinstance(exc, self._error_saving_exceptions):
+            # errors of private requests are kept apart for every account like saved responses
+            self._errors.set(self._make_saving_key(ERROR_SAVING_ID, req), exc, ttl=self._error_saving_time)
+
+    def query(self, parser: Type[CCAPIResponseParser], req: Type[BaseCCRequest], saving_id: str=None,
+              saving_time: float=None, stale_time: float=None, refresh_ahead: float=None, **kwargs) -> CCAPIResponse:
+        _req = self._make_request(req, **kwargs)
+        saved_error = self._get_saved_error(_req)
+
+        try:
+            if saved_error is not None:
+                raise saved_error
+
+            saving_id = self._get_saving_id(_req, saving_id)
+
+            if saving_id:
+                response = self._query_with_saving(parser, _req, saving_id, saving_time, stale_time, refresh_ahead)
+            else:
+                response = self._parse(parser, _req, self._query(_req))
+
+            response = self._check_response(response)
+        except Exception as e:
+            if saved_error is None:
+                self._save_error(_req, e)
+
+            if _req.timings is not None:
+                self._complete_call(_req, e)
+            raise
+
+        if _req.timings is not None:
+            self._complete_call(_req)
 
         return response
 
+    def query_delta(self, tracker: DeltaTracker, parser: Type[CCAPIResponseParser], req: Type[BaseCCRequest],
+                    **kwargs) -> CCAPIResponse:
+        _req = self._make_request(req, **kwargs)
+
+        try:
+            response = self._query(_req)
+
+            # unchanged body is neither decoded nor compared
+            if tracker.is_unchanged(response.content):
+                cc_resp = CCAPIResponse(tracker.update(None, response.content))
+            else:
+                cc_resp = self._check_response(self._parse(parser, _req, response))
+                cc_resp.data = tracker.update(cc_resp.data, response.content)
+        except Exception as e:
+            if _req.timings is not None:
+                self._complete_call(_req, e)
+            raise
+
+        if _req.timings is not None:
+            self._complete_call(_req)
+
+        return cc_resp
+
+    def query_stream(self, parser: Type[CCAPIResponseParser], req: Type[BaseCCRequest],
+                     chunk_size: int=DEFAULT_STREAM_CHUNK_SIZE, **kwargs) -> Iterator:
+        _req = self._make_request(req, **kwargs)
+        exc = None
+
+        try:
+            response = self._query(_req, stream=True)
+
+            try:
+                if _req.timings is None:
+                    yield from parser.parse_stream(response, chunk_size=chunk_size)
+                else:
+                    chunks = _req.timings.iter_downloaded(response.iter_content(chunk_size=chunk_size))
+                    yield from iter_stream(parser.make_stream(), chunks, response)
+            finally:
+                response.close()
+        except Exception as e:
+            exc = e
+            raise
+        finally:
+            # time of streamed call includes processing of items by consumer
+            if _req.timings is not None:
+                self._complete_call(_req, exc)
+
 
 class CCAPI(BaseCCAPI):
     """
     Client for cryptocurrency markets/exchanges
     """
 
-    def __init__(self, ssl_enabled: bool=True, api_key: str='', api_secret: str='', api_methods: dict=None):
-        super(CCAPI, self).__init__(ssl_enabled, api_methods)
+    auth_class = HmacAuth
+
+    def __init__(self, ssl_enabled: bool=True, api_key: str='', api_secret: str='', api_methods: dict=None,
+                 nonce_generator: NonceGenerator=None, **kwargs):
+        super(CCAPI, self).__init__(ssl_enabled, api_methods, **kwargs)
         self._api_key = bytes(api_key, encoding=ENCODING)
         self._api_secret = bytes(api_secret, encoding=ENCODING)
+        self._auth = self.auth_class(api_key=self._api_key, api_secret=self._api_secret,
+                                     nonce_generator=nonce_generator, codec=self._codec)
 
-    def call(self, method: str, saving_id: str=None, saving_time: float=ONE_MINUTE, **kwargs) -> CCAPIResponse:
-        _method = self.api_methods.get(method)
-
-        if not _method:
-            raise CCAPINoMethodException(method=method)
+    def _get_account_key(self):
+        return self._api_key
 
+    def _get_request_kwargs(self, method: str, _method: APIMethod, **kwargs) -> dict:
         if _method.request.is_private:
             kwargs.update({
                 'api_key': self._api_key,
-                'api_secret': self._api_secret
+                'api_secret': self._api_secret,
+                'auth': self._auth
             })
 
+        return kwargs
+
+    def call(self, method: str, saving_id: str=None, saving_time: float=ONE_MINUTE, **kwargs) -> CCAPIResponse:
+        _method = self._get_method(method)
+        kwargs = self._get_request_kwargs(method, _method, **kwargs)
         return self.query(_method.parser, _method.request, saving_id=saving_id, saving_time=saving_time, **kwargs)
 
 
@@ -168,19 +626,16 @@ class CCRPC(BaseCCAPI):
     """
 
     def __init__(self, ssl_enabled: bool=True, rpc_user: str='', rpc_password: str='', api_methods: dict=None,
-                 rpc_url: str=''):
-        super(CCRPC, self).__init__(ssl_enabled, api_methods)
+                 rpc_url: str='', **kwargs):
+        super(CCRPC, self).__init__(ssl_enabled, api_methods, **kwargs)
         self._rpc_user = rpc_user
         self._rpc_password = rpc_password
         self._rpc_url = rpc_url
 
-    def call(self, method: str, call_args: tuple=(), saving_id: str=None, saving_time: float=ONE_MINUTE,
-             **kwargs) -> CCAPIResponse:
-        _method = self.api_methods.get(method)
-
-        if not _method:
-            raise CCAPINoMethodException(method=method)
+    def _get_account_key(self):
+        return self._rpc_user
 
+    def _get_request_kwargs(self, method: str, _method: APIMethod, call_args: tuple=(), **kwargs) -> dict:
         if not call_args or not isinstance(call_args, (list, tuple)):
             call_args = ()
 
@@ -193,4 +648,10 @@ class CCRPC(BaseCCAPI):
             'method_name': method
         })
 
+        return kwargs
+
+    def call(self, method: str, call_args: tuple=(), saving_id: str=None, saving_time: float=ONE_MINUTE,
+             **kwargs) -> CCAPIResponse:
+        _method = self._get_method(method)
+        kwargs = self._get_request_kwargs(method, _method, call_args, **kwargs)
         return self.query(_method.parser, _method.request, saving_id=saving_id, saving_time=saving_time, **kwargs)
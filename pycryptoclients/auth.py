@@ -1,26 +1,48 @@
-import json
 import hmac
 import hashlib
 from requests import PreparedRequest
 from requests.auth import AuthBase
 
-from pycryptoclients.utils import make_nonce, ENCODING
+from pycryptoclients.codec import JSONCodec, get_default_codec
+from pycryptoclients.nonce import NonceGenerator, get_nonce_generator
+from pycryptoclients.utils import ENCODING
 
 
 class HmacAuth(AuthBase):
+    """
+    Signs body of request with HMAC-SHA512 of API secret. Body of private request is built once with
+    `encode_body` (which injects nonce) and then signed as is, keyed HMAC object is computed once and copied for
+    every request.
 
-    def __init__(self, api_key, api_secret):
+    Nonces are taken from `nonce_generator`, by default from generator shared by all requests with the same API key.
+    Body is encoded with `codec`, by default with the fastest installed JSON library.
+    """
+
+    def __init__(self, api_key, api_secret, nonce_generator: NonceGenerator=None, codec: JSONCodec=None):
         self.api_key = api_key
         self.api_secret = api_secret
+        self.nonce_generator = nonce_generator if nonce_generator is not None else get_nonce_generator(api_key)
+        self.codec = codec if codec is not None else get_default_codec()
+        self._hmac = hmac.new(api_secret, digestmod=hashlib.sha512)
+
+    def encode_body(self, data: dict) -> bytes:
+        data = dict(data)
+        data['nonce'] = self.nonce_generator()
+        return self.codec.dumps(data)
+
+    def sign(self, body: bytes) -> str:
+        signature = self._hmac.copy()
+        signature.update(body)
+        return signature.hexdigest()
 
     def __call__(self, request: PreparedRequest):
-        data = json.loads(request.body)
-        data['nonce'] = make_nonce()
-        signdata = json.dumps(data)
-        sign = hmac.new(self.api_secret, bytearray(signdata, encoding=ENCODING), hashlib.sha512).hexdigest()
+        body = request.body
+
+        if isinstance(body, str):
+            body = bytes(body, encoding=ENCODING)
+
         request.headers.update({
             'Key': self.api_key,
-            'Sign': sign
+            'Sign': self.sign(body or b'')
         })
-        request.body = signdata
         return request
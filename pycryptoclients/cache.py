@@ -0,0 +1,240 @@
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+__all__ = ('BaseCacheBackend', 'MemoryCacheBackend', 'SQLiteCacheBackend', 'RedisCacheBackend',
+           'DEFAULT_MAX_ENTRIES', 'DEFAULT_TOUCH_INTERVAL')
+
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TOUCH_INTERVAL = 10.0
+
+
+class BaseCacheBackend(object):
+    """
+    Storage of saved responses. Values are stored by string keys, `ttl` is the time in seconds after which backend
+    may evict value (`None` means that value is kept until it is evicted by other constraints of backend).
+    """
+
+    # whether operations wait for disk or network, asyncio clients run them in thread pool then
+    blocking_io = True
+
+    def get(self, key: str):
+        raise NotImplementedError
+
+    def set(self, key: str, value, ttl: float=None):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Releases connections of backend, backend can still be used after it and connects again on demand.
+        """
+        pass
+
+
+class MemoryCacheBackend(BaseCacheBackend):
+    """
+    In-memory LRU cache bounded by number of entries and (optionally) by approximate size of pickled values.
+    """
+
+    blocking_io = False
+
+    def __init__(self, max_entries: int=DEFAULT_MAX_ENTRIES, max_bytes: int=None):
+        super(MemoryCacheBackend, self).__init__()
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self._size = 0
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    def __len__(self):
+        return len(self._data)
+
+    def _pop(self, key):
+        value, expires, size = self._data.pop(key)
+        self._size -= size
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+
+            if item is None:
+                return None
+
+            value, expires, _ = item
+
+            if expires is not None and expires <= time.monotonic():
+                self._pop(key)
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: float=None):
+        expires = time.monotonic() + ttl if ttl is not None else None
+        size = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL)) if self.max_bytes else 0
+
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+
+            if self.max_bytes and size > self.max_bytes:
+                return
+
+            self._data[key] = (value, expires, size)
+            self._size += size
+
+            while (self.max_entries and len(self._data) > self.max_entries) or \
+                    (self.max_bytes and self._size > self.max_bytes):
+                self._pop(next(iter(self._data)))
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+
+class SQLiteCacheBackend(BaseCacheBackend):
+    """
+    On-disk cache in SQLite database which can be shared by several worker processes on the same host. Values are
+    pickled, so database file has to be writable only by trusted processes: loading of tampered entry executes
+    arbitrary code.
+
+    Time of last use of entry (which orders eviction) is written at most once per `touch_interval` seconds, so reads
+    of hot entries do not write to database.
+    """
+
+    def __init__(self, path: str, max_entries: int=DEFAULT_MAX_ENTRIES, timeout: float=5.0,
+                 touch_interval: float=DEFAULT_TOUCH_INTERVAL):
+        super(SQLiteCacheBackend, self).__init__()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections = []
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.touch_interval = touch_interval
+
+        with self._connection() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS responses '
+                         '(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL, used REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS responses_used ON responses (used)')
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+
+        if conn is None:
+            # connection is used only by thread which opened it, but it is closed by `close` from any thread
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+
+            with self._lock:
+                self._connections.append(conn)
+
+        return conn
+
+    def get(self, key: str):
+        now = time.time()
+
+        with self._connection() as conn:
+            row = conn.execute('SELECT value, expires, used FROM responses WHERE key = ?', (key,)).fetchone()
+
+            if row is None:
+                return None
+
+            value, expires, used = row
+
+            if expires is not None and expires <= now:
+                conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                return None
+
+            if now - used >= self.touch_interval:
+                conn.execute('UPDATE responses SET used = ? WHERE key = ?', (now, key))
+
+        return pickle.loads(value)
+
+    def set(self, key: str, value, ttl: float=None):
+        now = time.time()
+        expires = now + ttl if ttl is not None else None
+
+        with self._connection() as conn:
+            conn.execute('INSERT OR REPLACE INTO responses (key, value, expires, used) VALUES (?, ?, ?, ?)',
+                         (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires, now))
+
+            if self.max_entries:
+                conn.execute('DELETE FROM responses WHERE expires <= ?', (now,))
+                conn.execute('DELETE FROM responses WHERE key IN '
+                             '(SELECT key FROM responses ORDER BY used DESC LIMIT -1 OFFSET ?)', (self.max_entries,))
+
+    def delete(self, key: str):
+        with self._connection() as conn:
+            conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+
+    def clear(self):
+        with self._connection() as conn:
+            conn.execute('DELETE FROM responses')
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+
+        for conn in connections:
+            conn.close()
+
+
+class RedisCacheBackend(BaseCacheBackend):
+    """
+    Cache in Redis server. Accepts any client compatible with `redis.Redis`, if client is not passed then it is
+    created from `url` (requires redis package). Values are pickled, so Redis server (and `prefix` in it) has to be
+    writable only by trusted clients: loading of tampered entry executes arbitrary code.
+    """
+
+    def __init__(self, client=None, url: str='redis://localhost:6379/0', prefix: str='pycryptoclients:'):
+        super(RedisCacheBackend, self).__init__()
+        self._owns_client = client is None
+
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError('Install redis to use {}'.format(self.__class__.__name__)) from e
+            client = redis.Redis.from_url(url)
+
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str):
+        value = self.client.get(self.prefix + key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key: str, value, ttl: float=None):
+        px = max(int(ttl * 1000), 1) if ttl is not None else None
+        self.client.set(self.prefix + key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), px=px)
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+
+        if keys:
+            self.client.delete(*keys)
+
+    def close(self):
+        # client passed to backend is closed by its owner
+        if self._owns_client:
+            self.client.connection_pool.disconnect()
@@ -0,0 +1,193 @@
+import requests
+import threading
+import time
+from urllib.parse import urlsplit
+
+from pycryptoclients.exc import CCAPICircuitOpenException
+from pycryptoclients.request import BaseCCRequest
+from pycryptoclients.retry import DEFAULT_RETRY_STATUSES, DEFAULT_RETRY_EXCEPTIONS
+
+
+__all__ = ('Circuit', 'CircuitBreaker', 'CLOSED', 'OPEN', 'HALF_OPEN')
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class Circuit(object):
+    """
+    State of circuit of one endpoint. Circuit is opened after `failure_threshold` consecutive failures and rejects
+    requests for `recovery_timeout` seconds. Then it is half-open: at most `half_open_max_calls` probing requests are
+    let through at once, circuit is closed after `success_threshold` successful probes and opened again after failed
+    one.
+    """
+
+    def __init__(self, failure_threshold: int=5, recovery_timeout: float=30.0, half_open_max_calls: int=1,
+                 success_threshold: int=1):
+        super(Circuit, self).__init__()
+        self._lock = threading.Lock()
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.success_threshold = success_threshold
+        self._state = CLOSED
+        self._failures = 0
+        self._successes = 0
+        self._probes = 0
+        self._opened_at = None
+
+    def _update_state(self, now: float):
+        if self._state == OPEN and now - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._successes = 0
+            self._probes = 0
+
+    def _open(self, now: float):
+        self._state = OPEN
+        self._opened_at = now
+        self._probes = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._update_state(time.monotonic())
+            return self._state
+
+    def get_retry_after(self) -> float:
+        """
+        Returns time in seconds until open circuit becomes half-open.
+        """
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(self._opened_at + self.recovery_timeout - time.monotonic(), 0.0)
+
+    def acquire(self) -> tuple:
+        """
+        Returns pair of (whether request is allowed, whether it is probing request of half-open circuit).
+        """
+        with self._lock:
+            self._update_state(time.monotonic())
+
+            if self._state == CLOSED:
+                return True, False
+
+            if self._state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True, True
+
+            return False, False
+
+    def record_success(self, probe: bool=False):
+        with self._lock:
+            if probe:
+                self._probes = max(self._probes - 1, 0)
+
+            if self._state == CLOSED:
+                self._failures = 0
+            elif self._state == HALF_OPEN and probe:
+                self._successes += 1
+
+                if self._successes >= self.success_threshold:
+                    self._state = CLOSED
+                    self._failures = 0
+
+    def record_failure(self, probe: bool=False):
+        with self._lock:
+            now = time.monotonic()
+
+            if self._state == CLOSED:
+                self._failures += 1
+
+                if self._failures >= self.failure_threshold:
+                    self._open(now)
+            elif self._state == HALF_OPEN and probe:
+                self._open(now)
+
+    def release(self, probe: bool=False):
+        # request was interrupted, so its outcome tells nothing about endpoint
+        if probe:
+            with self._lock:
+                self._probes = max(self._probes - 1, 0)
+
+
+class CircuitBreaker(object):
+    """
+    Client-side circuit breaker of API endpoints: while circuit of endpoint is open, requests to it fail at once with
+    `CCAPICircuitOpenException` instead of waiting for timeouts of unavailable API (see `Circuit`).
+
+    Endpoint is host and API method of request (e.g. `ticker`, `GetInfo`), or only host if `per_method` is disabled.
+    Connection errors, timeouts and responses with `failure_statuses` are failures, other responses (including errors
+    reported by API in successful responses) prove that endpoint is available.
+    """
+
+    def __init__(self, failure_threshold: int=5, recovery_timeout: float=30.0, half_open_max_calls: int=1,
+                 success_threshold: int=1, per_method: bool=True, failure_statuses=DEFAULT_RETRY_STATUSES,
+                 failure_exceptions=DEFAULT_RETRY_EXCEPTIONS):
+        super(CircuitBreaker, self).__init__()
+
+        if failure_threshold < 1:
+            raise ValueError('failure_threshold must be positive number. Currently: {} {}'.format(
+                failure_threshold, type(failure_threshold)))
+
+        self._lock = threading.Lock()
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.success_threshold = success_threshold
+        self.per_method = per_method
+        self.failure_statuses = frozenset(failure_statuses)
+        self.failure_exceptions = tuple(failure_exceptions)
+        self._circuits = {}
+
+    def get_key(self, req: BaseCCRequest) -> tuple:
+        host = urlsplit(req.url).netloc
+        return (host, req.api_method) if self.per_method else (host,)
+
+    def get_circuit(self, req: BaseCCRequest) -> Circuit:
+        key = self.get_key(req)
+
+        with self._lock:
+            circuit = self._circuits.get(key)
+
+            if circuit is None:
+                circuit = self._circuits[key] = Circuit(self.failure_threshold, self.recovery_timeout,
+                                                        self.half_open_max_calls, self.success_threshold)
+
+            return circuit
+
+    def is_failure(self, exc: Exception) -> bool:
+        response = getattr(exc, 'response', None)
+
+        if isinstance(exc, requests.exceptions.HTTPError) and response is not None:
+            return response.status_code in self.failure_statuses
+
+        return isinstance(exc, self.failure_exceptions)
+
+    def acquire(self, req: BaseCCRequest) -> tuple:
+        """
+        Returns pair of (circuit, whether request is probing one) which has to be passed to `record` or `release`
+        after request, raises `CCAPICircuitOpenException` if request is rejected.
+        """
+        circuit = self.get_circuit(req)
+        allowed, probe = circuit.acquire()
+
+        if not allowed:
+            raise CCAPICircuitOpenException(endpoint='/'.join(str(part) for part in self.get_key(req)),
+                                            retry_after=circuit.get_retry_after())
+
+        return circuit, probe
+
+    def record(self, token: tuple, exc: Exception=None):
+        circuit, probe = token
+
+        if exc is not None and self.is_failure(exc):
+            circuit.record_failure(probe)
+        else:
+            circuit.record_success(probe)
+
+    def release(self, token: tuple):
+        circuit, probe = token
+        circuit.release(probe)
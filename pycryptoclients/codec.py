@@ -0,0 +1,84 @@
+import json
+
+from pycryptoclients.utils import ENCODING
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+__all__ = ('JSONCodec', 'OrjsonCodec', 'UjsonCodec', 'get_default_codec')
+
+
+class JSONCodec(object):
+    """
+    Encoder and decoder of JSON bodies based on standard library. Bodies are encoded in compact form.
+    """
+
+    name = 'json'
+
+    def dumps(self, obj) -> bytes:
+        return bytes(json.dumps(obj, separators=(',', ':')), encoding=ENCODING)
+
+    def loads(self, data):
+        if isinstance(data, bytes):
+            data = data.decode(ENCODING)
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    Codec based on orjson, the fastest one. Integers wider than 64 bits can not be encoded or decoded by it (decoding
+    of response fails), so it is used only if it is passed as `codec` of client.
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        super(OrjsonCodec, self).__init__()
+
+        if orjson is None:
+            raise ImportError('Install orjson to use {}'.format(self.__class__.__name__))
+
+    def dumps(self, obj) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+class UjsonCodec(JSONCodec):
+    """
+    Codec based on ujson, it is used only if it is passed as `codec` of client.
+    """
+
+    name = 'ujson'
+
+    def __init__(self):
+        super(UjsonCodec, self).__init__()
+
+        if ujson is None:
+            raise ImportError('Install ujson to use {}'.format(self.__class__.__name__))
+
+    def dumps(self, obj) -> bytes:
+        return bytes(ujson.dumps(obj, ensure_ascii=False), encoding=ENCODING)
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+
+_default_codec = JSONCodec()
+
+
+def get_default_codec() -> JSONCodec:
+    """
+    Returns codec of standard library which is shared by clients without `codec`. Faster codecs (`OrjsonCodec`,
+    `UjsonCodec`) are not selected automatically, since they do not decode every response as standard library does.
+    """
+    return _default_codec
@@ -0,0 +1,69 @@
+import array
+import calendar
+import time
+from decimal import Decimal
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+__all__ = ('INT8', 'INT64', 'FLOAT64', 'to_float', 'to_scaled_int', 'to_timestamp', 'make_columns')
+
+
+# type codes of `array.array`, numpy arrays get the same dtypes
+INT8 = 'b'
+INT64 = 'q'
+FLOAT64 = 'd'
+
+DEFAULT_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def to_float(value) -> float:
+    return float(value) if value is not None else float('nan')
+
+
+def to_scaled_int(scale: int):
+    """
+    Returns converter of decimal strings to integers in units of `1 / scale` (e.g. satoshis with scale 10 ** 8).
+    """
+    def convert(value) -> int:
+        return int((Decimal(value if isinstance(value, (str, int)) else str(value)) * scale).to_integral_value())
+    return convert
+
+
+def to_timestamp(value, datetime_format: str=DEFAULT_DATETIME_FORMAT) -> int:
+    # dates of API are in UTC
+    if isinstance(value, str) and not value.isdigit():
+        return calendar.timegm(time.strptime(value, datetime_format))
+    return int(value)
+
+
+def make_columns(items, columns, use_numpy: bool=None) -> dict:
+    """
+    Builds column arrays in one pass over items, items are consumed one by one, so they can be yielded by generator.
+
+    :param items: iterable of dicts
+    :param columns: sequence of (column name, key in item, type code, converter)
+    :param use_numpy: whether to return numpy arrays instead of `array.array`, by default numpy is used if installed
+    :return: dict of arrays by column names
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    elif use_numpy and numpy is None:
+        raise ImportError('Install numpy to get columns as numpy arrays')
+
+    arrays = [array.array(typecode) for _, _, typecode, _ in columns]
+    appenders = [(arr.append, key, converter) for arr, (_, key, _, converter) in zip(arrays, columns)]
+
+    for item in items:
+        for append, key, converter in appenders:
+            append(converter(item.get(key)))
+
+    if use_numpy:
+        # arrays are wrapped without copying
+        arrays = [numpy.frombuffer(arr, dtype=numpy.dtype(arr.typecode)) if len(arr) else
+                  numpy.empty(0, dtype=numpy.dtype(arr.typecode)) for arr in arrays]
+
+    return {name: arr for arr, (name, _, _, _) in zip(arrays, columns)}
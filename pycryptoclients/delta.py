@@ -0,0 +1,83 @@
+__all__ = ('Delta', 'DeltaTracker', 'DEFAULT_DELTA_KEY')
+
+
+DEFAULT_DELTA_KEY = 'market_name'
+
+
+class Delta(object):
+    """
+    Records which were added, changed or removed since previous response of API method.
+    """
+
+    def __init__(self, added: list=None, changed: list=None, removed: list=None):
+        super(Delta, self).__init__()
+        self.added = added if added is not None else []
+        self.changed = changed if changed is not None else []
+        self.removed = removed if removed is not None else []
+
+    def __len__(self):
+        return len(self.added) + len(self.changed) + len(self.removed)
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+    def __repr__(self):
+        return '{}(added={!r}, changed={!r}, removed={!r})'.format(self.__class__.__name__, self.added, self.changed,
+                                                                   self.removed)
+
+
+class DeltaTracker(object):
+    """
+    Tracks records of successive responses of API method which returns list of records (e.g. `ticker` or `prices`)
+    by `key` (name of field, attribute of typed record or callable) and computes deltas between them.
+
+    If raw body of response is passed and it is identical to previous one, empty delta is returned without decoding
+    and comparison of records.
+    """
+
+    def __init__(self, key=DEFAULT_DELTA_KEY):
+        super(DeltaTracker, self).__init__()
+        self.key = key
+        self.records = {}
+        self._content = None
+
+    def _get_key(self, record):
+        if callable(self.key):
+            return self.key(record)
+        return record.get(self.key) if isinstance(record, dict) else getattr(record, self.key)
+
+    def is_unchanged(self, content: bytes) -> bool:
+        return content is not None and self._content is not None and content == self._content
+
+    def update(self, records: list, content: bytes=None) -> Delta:
+        if self.is_unchanged(content):
+            return Delta()
+
+        if not isinstance(records, list):
+            raise TypeError('Deltas can be computed only for lists of records, got {}'.format(type(records)))
+
+        old_records = self.records
+        new_records = {}
+        delta = Delta()
+
+        for record in records:
+            key = self._get_key(record)
+            new_records[key] = record
+            old_record = old_records.get(key)
+
+            if old_record is None:
+                delta.added.append(record)
+            elif old_record != record:
+                delta.changed.append(record)
+
+        delta.removed.extend(record for key, record in old_records.items() if key not in new_records)
+
+        self.records = new_records
+        self._content = content
+        return delta
+
+    def snapshot(self) -> Delta:
+        """
+        Returns delta with all current records added, e.g. for consumer which has not seen previous deltas.
+        """
+        return Delta(added=list(self.records.values()))
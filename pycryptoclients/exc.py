@@ -3,7 +3,8 @@ import requests
 import warnings
 
 
-__all__ = ('CCAPIResponseParsingException', 'CCAPIDataException', 'CCAPINoMethodException', 'CCAPIBaseException')
+__all__ = ('CCAPIResponseParsingException', 'CCAPIDataException', 'CCAPINoMethodException', 'CCAPIBaseException',
+           'CCAPICircuitOpenException')
 
 
 class CCAPIBaseException(requests.exceptions.RequestException):
@@ -56,3 +57,13 @@ class CCAPIResponseParsingException(CCAPIBaseException):
 
 class CCAPIDataException(CCAPIBaseException):
     error_code = '05'
+
+
+class CCAPICircuitOpenException(CCAPIBaseException):
+    error_code = '06'
+
+    def __init__(self, endpoint, retry_after: float=None, exc=None, *args, **kwargs):
+        msg = 'Circuit of <{}> is open, requests are rejected'.format(endpoint)
+        super(CCAPICircuitOpenException, self).__init__(msg=msg, exc=exc, *args, **kwargs)
+        self.endpoint = endpoint
+        self.retry_after = retry_after
@@ -0,0 +1,299 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+
+__all__ = ('CallTimings', 'BaseInstrument', 'CallbackInstrument', 'LoggingInstrument', 'MetricsRegistry',
+           'OpenTelemetryInstrument', 'CACHE_HIT', 'CACHE_MISS', 'CACHE_STALE', 'CACHE_REFRESH', 'CACHE_ERROR',
+           'PHASES', 'DEFAULT_BUCKETS')
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_HIT = 'hit'
+CACHE_MISS = 'miss'
+CACHE_STALE = 'stale'
+CACHE_REFRESH = 'refresh'
+CACHE_ERROR = 'error'
+
+# phases of call in order, all of them are in seconds
+PHASES = ('build', 'rate_limit', 'prepare', 'sign', 'server', 'download', 'retry_wait', 'parse')
+
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+
+
+class CallTimings(object):
+    """
+    Timings of single call of API method, passed to instruments of client when call is completed.
+
+    Time of all attempts is summed up: `build` of request object, waiting for `rate_limit`, `prepare` of request
+    (encoding of body and signing, `sign` is the part spent on authentication), `server` time until response headers
+    are received (including connection setup, requests does not report DNS, connect and TLS times separately),
+    `download` of response body, `retry_wait` between attempts and `parse` of response. `download` of streamed
+    response is measured while its items are consumed, parsing of them is not measured separately. `cache` is `hit`
+    for responses served from cache, `stale` for expired responses served while they are refreshed, `refresh` for
+    background refresh of saved response, `error` for saved errors raised again, `miss` for saved calls which sent
+    request and `None` for calls without saving.
+    """
+
+    __slots__ = ('method', 'started', 'duration', 'cache', 'attempts', 'retries', 'status_code', 'exc',
+                 '_clock') + PHASES
+
+    def __init__(self, method: str=None):
+        self.method = method
+        self.started = time.time()
+        self._clock = time.perf_counter()
+        self.duration = 0.0
+        self.cache = None
+        self.attempts = 0
+        self.retries = 0
+        self.status_code = None
+        self.exc = None
+
+        for phase in PHASES:
+            setattr(self, phase, 0.0)
+
+    @property
+    def ok(self) -> bool:
+        return self.exc is None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._clock
+
+    def complete(self, exc: Exception=None):
+        self.duration = self.elapsed()
+        self.exc = exc
+
+    def add_response(self, response, sent: float, stream: bool=False):
+        # `elapsed` of requests is measured from sending of request until headers are parsed, body of streamed
+        # response is not read yet, its download is added while it is consumed (see `iter_downloaded`)
+        self.status_code = response.status_code
+        server = response.elapsed.total_seconds()
+        self.server += server
+
+        if not stream:
+            self.download += max(sent - server, 0.0)
+
+    def iter_downloaded(self, chunks):
+        """
+        Yields chunks of streamed body and adds time of their reading to `download`.
+        """
+        chunks = iter(chunks)
+
+        while True:
+            started = time.perf_counter()
+
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                return
+            finally:
+                self.download += time.perf_counter() - started
+
+            yield chunk
+
+    def to_dict(self) -> dict:
+        return {attr: getattr(self, attr) for attr in self.__slots__ if not attr.startswith('_')}
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__,
+                               ', '.join('{}={!r}'.format(k, v) for k, v in self.to_dict().items()))
+
+
+def emit(instruments, timings: CallTimings):
+    # failure of instrument never fails call
+    for instrument in instruments:
+        try:
+            instrument.on_call(timings)
+        except Exception:
+            logger.exception('Instrument %r failed', instrument)
+
+
+class BaseInstrument(object):
+    """
+    Base of instruments which get `CallTimings` of every completed call of API client.
+    """
+
+    def on_call(self, timings: CallTimings):
+        raise NotImplementedError
+
+
+class CallbackInstrument(BaseInstrument):
+
+    def __init__(self, callback):
+        super(CallbackInstrument, self).__init__()
+        self.callback = callback
+
+    def on_call(self, timings: CallTimings):
+        self.callback(timings)
+
+
+class LoggingInstrument(BaseInstrument):
+    """
+    Logs timings of every call with `logger` (`pycryptoclients.instrumentation` by default), failed calls are logged
+    with `error_level`.
+    """
+
+    def __init__(self, logger: logging.Logger=None, level: int=logging.DEBUG, error_level: int=logging.WARNING):
+        super(LoggingInstrument, self).__init__()
+        self.logger = logger if logger is not None else logging.getLogger(__name__)
+        self.level = level
+        self.error_level = error_level
+
+    def on_call(self, timings: CallTimings):
+        level = self.level if timings.ok else self.error_level
+
+        if not self.logger.isEnabledFor(level):
+            return
+
+        self.logger.log(level, '%s %.1fms cache=%s retries=%d status=%s %s%s', timings.method,
+                        timings.duration * 1000, timings.cache, timings.retries, timings.status_code,
+                        ' '.join('{}={:.1f}ms'.format(phase, getattr(timings, phase) * 1000)
+                                 for phase in PHASES if getattr(timings, phase)),
+                        '' if timings.ok else ' error={!r}'.format(timings.exc))
+
+
+class _Histogram(object):
+
+    def __init__(self, buckets: tuple):
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class MetricsRegistry(BaseInstrument):
+    """
+    In-memory registry of metrics of calls in the style of Prometheus: counters of calls (by method, cache and status)
+    and retries, histograms of duration of calls and their phases. Metrics are exposed in Prometheus text format by
+    `render`, e.g. to be served by HTTP endpoint of application.
+    """
+
+    def __init__(self, prefix: str='pycryptoclients', buckets: tuple=DEFAULT_BUCKETS):
+        super(MetricsRegistry, self).__init__()
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self.calls = {}
+        self.retries = {}
+        self.durations = {}
+
+    def _observe(self, key: tuple, value: float):
+        histogram = self.durations.get(key)
+
+        if histogram is None:
+            histogram = self.durations[key] = _Histogram(self.buckets)
+
+        histogram.counts[bisect_left(self.buckets, value)] += 1
+        histogram.sum += value
+        histogram.count += 1
+
+    def on_call(self, timings: CallTimings):
+        status = 'ok' if timings.ok else 'error'
+        call_key = (timings.method, timings.cache or '', status)
+
+        with self._lock:
+            self.calls[call_key] = self.calls.get(call_key, 0) + 1
+
+            if timings.retries:
+                self.retries[timings.method] = self.retries.get(timings.method, 0) + timings.retries
+
+            self._observe((timings.method, 'total'), timings.duration)
+
+            # phases which did not happen during call (e.g. signing of public request) are not observed
+            for phase in PHASES:
+                value = getattr(timings, phase)
+
+                if value:
+                    self._observe((timings.method, phase), value)
+
+    @staticmethod
+    def _format_labels(**labels) -> str:
+        return ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"'))
+                        for k, v in sorted(labels.items()))
+
+    def render(self) -> str:
+        lines = []
+
+        with self._lock:
+            lines.append('# TYPE {}_calls_total counter'.format(self.prefix))
+
+            for (method, cache, status), value in sorted(self.calls.items()):
+                lines.append('{}_calls_total{{{}}} {}'.format(
+                    self.prefix, self._format_labels(method=method, cache=cache, status=status), value))
+
+            lines.append('# TYPE {}_retries_total counter'.format(self.prefix))
+
+            for method, value in sorted(self.retries.items()):
+                lines.append('{}_retries_total{{{}}} {}'.format(self.prefix, self._format_labels(method=method), value))
+
+            lines.append('# TYPE {}_call_seconds histogram'.format(self.prefix))
+
+            for (method, phase), histogram in sorted(self.durations.items()):
+                cumulative = 0
+
+                for bound, count in zip(self.buckets + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    lines.append('{}_call_seconds_bucket{{{}}} {}'.format(
+                        self.prefix, self._format_labels(method=method, phase=phase, le=bound), cumulative))
+
+                labels = self._format_labels(method=method, phase=phase)
+                lines.append('{}_call_seconds_sum{{{}}} {!r}'.format(self.prefix, labels, histogram.sum))
+                lines.append('{}_call_seconds_count{{{}}} {}'.format(self.prefix, labels, histogram.count))
+
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        with self._lock:
+            self.calls.clear()
+            self.retries.clear()
+            self.durations.clear()
+
+
+class OpenTelemetryInstrument(BaseInstrument):
+    """
+    Records every call as OpenTelemetry span (named after method) with timings of phases as attributes. Spans are
+    created with `tracer` or with tracer of global tracer provider.
+    """
+
+    def __init__(self, tracer=None, attribute_prefix: str='pycryptoclients'):
+        super(OpenTelemetryInstrument, self).__init__()
+
+        if tracer is None:
+            if trace is None:
+                raise ImportError('Install opentelemetry-api to use {}'.format(self.__class__.__name__))
+            tracer = trace.get_tracer('pycryptoclients')
+
+        self.tracer = tracer
+        self.attribute_prefix = attribute_prefix
+
+    def on_call(self, timings: CallTimings):
+        prefix = self.attribute_prefix
+        attributes = {'{}.method'.format(prefix): timings.method, '{}.retries'.format(prefix): timings.retries}
+
+        if timings.cache is not None:
+            attributes['{}.cache'.format(prefix)] = timings.cache
+
+        if timings.status_code is not None:
+            attributes['http.status_code'] = timings.status_code
+
+        for phase in PHASES:
+            attributes['{}.{}_seconds'.format(prefix, phase)] = getattr(timings, phase)
+
+        # span is recorded after call, so its times are set explicitly (in nanoseconds)
+        start_time = int(timings.started * 1e9)
+        span = self.tracer.start_span(timings.method, start_time=start_time, attributes=attributes)
+
+        if not timings.ok:
+            span.record_exception(timings.exc)
+
+            if trace is not None:
+                span.set_status(trace.Status(trace.StatusCode.ERROR, str(timings.exc)))
+
+        span.end(end_time=start_time + int(timings.duration * 1e9))
@@ -1,6 +1,9 @@
+from pycryptoclients.aio import AsyncCCAPIMixin
 from pycryptoclients.api import APIMethod, CCAPI
 from pycryptoclients.markets.stocks_exchange.request import *
-from pycryptoclients.markets.stocks_exchange.response import StocksExchangeResponseParser
+from pycryptoclients.markets.stocks_exchange.request import DEFAULT_COUNT, DEFAULT_ORDER
+from pycryptoclients.markets.stocks_exchange.response import *
+from pycryptoclients.pagination import iter_pages, AsyncPageIterator
 
 
 DEFAULT_STOCKS_EXCHANGE_API_METHODS = (
@@ -33,8 +36,159 @@ DEFAULT_STOCKS_EXCHANGE_API_METHODS = (
     APIMethod(name='reply_ticket', request=ReplyTicketRequest, parser=StocksExchangeResponseParser),
 )
 
+# public methods which return typed records instead of raw responses
+TYPED_STOCKS_EXCHANGE_API_METHODS = (
+    APIMethod(name='ticker', request=TickerRequest, parser=TickerParser),
+    APIMethod(name='prices', request=PricesRequest, parser=PricesParser),
+    APIMethod(name='markets', request=MarketsRequest, parser=MarketsParser),
+    APIMethod(name='market_summary', request=MarketSummaryRequest, parser=MarketsParser),
+    APIMethod(name='trade_history', request=TradeHistoryRequest, parser=TradeHistoryParser),
+    APIMethod(name='orderbook', request=OrderbookRequest, parser=OrderbookParser),
+    APIMethod(name='grafic', request=GraficPublicRequest, parser=GraficParser),
+)
+
+# methods of candles and trades which return column arrays instead of raw responses
+COLUMNAR_STOCKS_EXCHANGE_API_METHODS = (
+    APIMethod(name='trade_history', request=TradeHistoryRequest, parser=TradeHistoryColumnsParser),
+    APIMethod(name='grafic', request=GraficPublicRequest, parser=GraficColumnsParser),
+    APIMethod(name='private_grafic', request=GraficPrivateRequest, parser=GraficColumnsParser),
+)
+
+MAX_GRAFIC_COUNT = 100
+
 
 class StocksExchangeAPI(CCAPI):
+    """
+    Client for Stocks.Exchange API. With `typed_records` enabled market data methods return typed records (see
+    `TYPED_STOCKS_EXCHANGE_API_METHODS`) instead of raw responses. With `columnar` enabled candles and trades are
+    returned as column arrays (see `COLUMNAR_STOCKS_EXCHANGE_API_METHODS`), it takes precedence over `typed_records`.
+    """
+
+    def __init__(self, *args, typed_records: bool=False, columnar: bool=False, **kwargs):
+        self._typed_records = typed_records
+        self._columnar = columnar
+        super(StocksExchangeAPI, self).__init__(*args, **kwargs)
 
     def _init_default_api_methods(self):
         self.api_methods = {method.name: method for method in DEFAULT_STOCKS_EXCHANGE_API_METHODS}
+
+        if self._typed_records:
+            self.update_api_methods({method.name: method for method in TYPED_STOCKS_EXCHANGE_API_METHODS})
+
+        if self._columnar:
+            self.update_api_methods({method.name: method for method in COLUMNAR_STOCKS_EXCHANGE_API_METHODS})
+
+    ######################################################
+    # Pagination of private methods
+    ######################################################
+
+    def _call_raw(self, method: str, **kwargs) -> dict:
+        # pages are always parsed as raw responses, regardless of typed or columnar parsers of method
+        _method = self._get_method(method)
+        kwargs = self._get_request_kwargs(method, _method, **kwargs)
+        return self.query(StocksExchangeResponseParser, _method.request, **kwargs).data.get('data')
+
+    def _iter_pages(self, method: str, make_kwargs, make_page, key, prefetch: bool):
+        # `make_kwargs` returns arguments of method for cursor, `make_page` turns data of response into pair of
+        # (items, next cursor), see `iter_pages`
+        def fetch_page(cursor):
+            return make_page(cursor, self._call_raw(method, **make_kwargs(cursor)))
+
+        return iter_pages(fetch_page, key=key, prefetch=prefetch)
+
+    def _iter_by_id(self, method: str, count: int, order: str, prefetch: bool, **kwargs):
+        descending = order.upper() == 'DESC'
+
+        def make_kwargs(cursor):
+            page_kwargs = dict(kwargs, count=count, order=order)
+
+            if cursor is not None:
+                page_kwargs['end_id' if descending else 'from_id'] = cursor
+
+            return page_kwargs
+
+        def make_page(cursor, data):
+            if not data:
+                return [], None
+
+            items = sorted((dict(item, id=int(_id)) for _id, item in data.items()), key=lambda item: item['id'],
+                           reverse=descending)
+            last_id = items[-1]['id']
+            return items, (last_id - 1 if descending else last_id + 1) if len(items) >= count else None
+
+        return self._iter_pages(method, make_kwargs, make_page, key=lambda item: item['id'], prefetch=prefetch)
+
+    def iter_active_orders(self, count: int=DEFAULT_COUNT, order: str=DEFAULT_ORDER, prefetch: bool=True, **kwargs):
+        """
+        Yields all active orders (dicts with `id` of order added) page by page using `end_id`/`from_id` cursors.
+        Next page is requested in background while current one is consumed if `prefetch` is set.
+        """
+        return self._iter_by_id('get_active_orders', count, order, prefetch, **kwargs)
+
+    def iter_private_trade_history(self, count: int=DEFAULT_COUNT, order: str=DEFAULT_ORDER, prefetch: bool=True,
+                                   **kwargs):
+        """
+        Yields all orders of private trade history (dicts with `id` of order added), see `iter_active_orders`.
+        """
+        return self._iter_by_id('private_trade_history', count, order, prefetch, **kwargs)
+
+    def iter_transactions_history(self, count: int=DEFAULT_COUNT, order: str=DEFAULT_ORDER, prefetch: bool=True,
+                                  **kwargs):
+        """
+        Yields all deposits and withdrawals (dicts with `id` and `type` of transaction added) page by page using
+        `_from` offset.
+        """
+        def make_kwargs(offset):
+            return dict(kwargs, _from=offset, count=count, order=order)
+
+        def make_page(offset, data):
+            if not data:
+                return [], None
+
+            items = []
+            page_size = 0
+
+            for _type, transactions in data.items():
+                transactions = transactions or {}
+                page_size = max(page_size, len(transactions))
+                items.extend(dict(item, id=int(_id), type=_type) for _id, item in transactions.items())
+
+            return items, (offset or 0) + count if page_size >= count else None
+
+        return self._iter_pages('transactions_history', make_kwargs, make_page,
+                                key=lambda item: (item['type'], item['id']), prefetch=prefetch)
+
+    def iter_private_grafic(self, count: int=MAX_GRAFIC_COUNT, prefetch: bool=True, **kwargs):
+        """
+        Yields all candles of private grafic page by page using `page` parameter.
+        """
+        def make_kwargs(page):
+            return dict(kwargs, page=page or 1, count=count)
+
+        def make_page(page, data):
+            if not data:
+                return [], None
+
+            page = page or 1
+            return data.get('graf') or [], page + 1 if page < int(data.get('count_pages') or 0) else None
+
+        return self._iter_pages('private_grafic', make_kwargs, make_page, key=lambda item: item.get('date'),
+                                prefetch=prefetch)
+
+
+class AsyncStocksExchangeAPI(AsyncCCAPIMixin, StocksExchangeAPI):
+    """
+    Asyncio variant of `StocksExchangeAPI`, usage: `await api.call('ticker')`. Paginated `iter_*` methods return
+    asynchronous iterators (see `pycryptoclients.pagination.AsyncPageIterator`).
+    """
+
+    async def _call_raw(self, method: str, **kwargs) -> dict:
+        _method = self._get_method(method)
+        kwargs = self._get_request_kwargs(method, _method, **kwargs)
+        return (await self.query(StocksExchangeResponseParser, _method.request, **kwargs)).data.get('data')
+
+    def _iter_pages(self, method: str, make_kwargs, make_page, key, prefetch: bool):
+        async def fetch_page(cursor):
+            return make_page(cursor, await self._call_raw(method, **make_kwargs(cursor)))
+
+        return AsyncPageIterator(fetch_page, key=key, prefetch=prefetch)
@@ -0,0 +1,214 @@
+import sqlite3
+import threading
+
+from pycryptoclients.codec import JSONCodec, get_default_codec
+from pycryptoclients.markets.stocks_exchange.request import DEFAULT_COUNT, DEFAULT_TYPE
+
+
+__all__ = ('HistoryStore', 'HistorySync')
+
+
+TRADES = 'trades'
+TRANSACTIONS = 'transactions'
+
+
+class HistoryStore(object):
+    """
+    Local append-only store of private trade and transaction history in SQLite database. Records are never updated,
+    they are kept as compact JSON with indexed time, so history can be queried by time range without requests to
+    exchange. Last synced id and timestamp are kept per stream (e.g. pair of trades) in the same transaction as records.
+    """
+
+    def __init__(self, path: str, timeout: float=5.0, codec: JSONCodec=None):
+        super(HistoryStore, self).__init__()
+        self._local = threading.local()
+        self.path = path
+        self.timeout = timeout
+        self.codec = codec if codec is not None else get_default_codec()
+
+        with self._connection() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS trades '
+                         '(id INTEGER PRIMARY KEY, pair TEXT, timestamp INTEGER, data BLOB NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS trades_pair_timestamp ON trades (pair, timestamp)')
+            conn.execute('CREATE INDEX IF NOT EXISTS trades_timestamp ON trades (timestamp)')
+            conn.execute('CREATE TABLE IF NOT EXISTS transactions '
+                         '(type TEXT NOT NULL, id INTEGER NOT NULL, currency TEXT, timestamp INTEGER, '
+                         'data BLOB NOT NULL, PRIMARY KEY (type, id))')
+            conn.execute('CREATE INDEX IF NOT EXISTS transactions_currency_timestamp '
+                         'ON transactions (currency, timestamp)')
+            conn.execute('CREATE INDEX IF NOT EXISTS transactions_timestamp ON transactions (timestamp)')
+            conn.execute('CREATE TABLE IF NOT EXISTS sync_state '
+                         '(stream TEXT PRIMARY KEY, last_id INTEGER, last_timestamp INTEGER)')
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=self.timeout)
+
+        return conn
+
+    @staticmethod
+    def make_stream(*parts) -> str:
+        return ':'.join(str(part) for part in parts)
+
+    def get_state(self, stream: str) -> tuple:
+        """
+        Returns pair of (last id, last timestamp) of stream, `(None, None)` if stream was never synced.
+        """
+        row = self._connection().execute('SELECT last_id, last_timestamp FROM sync_state WHERE stream = ?',
+                                          (stream,)).fetchone()
+        return row if row is not None else (None, None)
+
+    @staticmethod
+    def _update_state(conn: sqlite3.Connection, stream: str, last_id: int, last_timestamp: int):
+        conn.execute('INSERT OR IGNORE INTO sync_state (stream) VALUES (?)', (stream,))
+        conn.execute('UPDATE sync_state SET last_id = MAX(COALESCE(last_id, ?), ?), '
+                     'last_timestamp = MAX(COALESCE(last_timestamp, ?), ?) WHERE stream = ?',
+                     (last_id, last_id, last_timestamp, last_timestamp, stream))
+
+    def add_trades(self, stream: str, trades: list) -> int:
+        """
+        Appends trades (dicts with `id`) and updates state of stream, returns number of new trades.
+        """
+        if not trades:
+            return 0
+
+        with self._connection() as conn:
+            added = conn.executemany('INSERT OR IGNORE INTO trades (id, pair, timestamp, data) VALUES (?, ?, ?, ?)',
+                                     [(trade['id'], trade.get('pair'), trade.get('timestamp'), self.codec.dumps(trade))
+                                      for trade in trades]).rowcount
+            self._update_state(conn, stream, max(trade['id'] for trade in trades),
+                               max(trade.get('timestamp') or 0 for trade in trades))
+
+        return added
+
+    def add_transactions(self, stream: str, transactions: list) -> int:
+        """
+        Appends transactions (dicts with `id` and `type`) and updates state of stream for every type of transaction,
+        returns number of new transactions.
+        """
+        if not transactions:
+            return 0
+
+        with self._connection() as conn:
+            added = conn.executemany('INSERT OR IGNORE INTO transactions (type, id, currency, timestamp, data) '
+                                     'VALUES (?, ?, ?, ?, ?)',
+                                     [(item['type'], item['id'], item.get('Currency'), item.get('Date'),
+                                       self.codec.dumps(item)) for item in transactions]).rowcount
+
+            for _type in set(item['type'] for item in transactions):
+                items = [item for item in transactions if item['type'] == _type]
+                self._update_state(conn, self.make_stream(stream, _type), max(item['id'] for item in items),
+                                   max(item.get('Date') or 0 for item in items))
+
+        return added
+
+    @staticmethod
+    def _make_range_query(query: str, column: str, value, since: int, until: int) -> tuple:
+        conditions, params = [], []
+
+        if value is not None:
+            conditions.append('{} = ?'.format(column))
+            params.append(value)
+
+        if since is not None:
+            conditions.append('timestamp >= ?')
+            params.append(since)
+
+        if until is not None:
+            conditions.append('timestamp < ?')
+            params.append(until)
+
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+
+        return query + ' ORDER BY timestamp, id', params
+
+    def get_trades(self, pair: str=None, since: int=None, until: int=None) -> list:
+        """
+        Returns stored trades in order of time, `since` is inclusive and `until` is exclusive unix timestamp.
+        """
+        query, params = self._make_range_query('SELECT data FROM trades', 'pair', pair, since, until)
+        return [self.codec.loads(data) for data, in self._connection().execute(query, params)]
+
+    def get_transactions(self, currency: str=None, since: int=None, until: int=None) -> list:
+        query, params = self._make_range_query('SELECT data FROM transactions', 'currency', currency, since, until)
+        return [self.codec.loads(data) for data, in self._connection().execute(query, params)]
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class HistorySync(object):
+    """
+    Incremental synchronization of private history of `StocksExchangeAPI` client into `HistoryStore`: only records
+    newer than the last synced ones are requested, they are appended page by page.
+    """
+
+    def __init__(self, api, store: HistoryStore, page_size: int=DEFAULT_COUNT):
+        super(HistorySync, self).__init__()
+        self.api = api
+        self.store = store
+        self.page_size = page_size
+
+    def sync_trades(self, pair: str=DEFAULT_TYPE, **kwargs) -> int:
+        """
+        Fetches trades of pair (all pairs by default) with ids greater than the last synced one, returns number of
+        new trades.
+        """
+        stream = self.store.make_stream(TRADES, pair)
+        last_id, _ = self.store.get_state(stream)
+
+        if last_id is not None:
+            kwargs['from_id'] = last_id + 1
+
+        added = 0
+        page = []
+
+        for trade in self.api.iter_private_trade_history(count=self.page_size, order='ASC', pair=pair, **kwargs):
+            if last_id is not None and trade['id'] <= last_id:
+                continue
+
+            page.append(trade)
+
+            if len(page) >= self.page_size:
+                added += self.store.add_trades(stream, page)
+                page = []
+
+        return added + self.store.add_trades(stream, page)
+
+    def sync_transactions(self, currency: str=DEFAULT_TYPE, **kwargs) -> int:
+        """
+        Fetches deposits and withdrawals of currency (all currencies by default) from the newest ones, returns number
+        of new transactions. Ids of deposits and withdrawals are not comparable, so there is no single cursor: fetching
+        stops after at least one page when already synced transactions are reached for every type seen.
+        """
+        stream = self.store.make_stream(TRANSACTIONS, currency)
+        last_ids = {}
+        synced_types = set()
+        new_transactions = []
+        consumed = 0
+
+        for item in self.api.iter_transactions_history(count=self.page_size, order='DESC', currency=currency,
+                                                       **kwargs):
+            consumed += 1
+            _type = item['type']
+
+            if _type not in last_ids:
+                last_ids[_type], _ = self.store.get_state(self.store.make_stream(stream, _type))
+
+            if last_ids[_type] is not None and item['id'] <= last_ids[_type]:
+                synced_types.add(_type)
+            elif _type not in synced_types:
+                new_transactions.append(item)
+
+            if consumed >= self.page_size and synced_types.issuperset(last_ids):
+                break
+
+        # transactions are appended at once, so interrupted sync does not move state past missing records
+        return self.store.add_transactions(stream, new_transactions)
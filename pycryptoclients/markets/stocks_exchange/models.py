@@ -0,0 +1,91 @@
+from pycryptoclients.models import Record, slots_of, to_decimal, to_bool, records_of
+
+
+__all__ = ('Ticker', 'Price', 'Market', 'Trade', 'OrderbookEntry', 'Orderbook', 'Candle')
+
+
+class Ticker(Record):
+    fields = (
+        ('market_name', 'market_name', str),
+        ('ask', 'ask', to_decimal),
+        ('bid', 'bid', to_decimal),
+        ('last', 'last', to_decimal),
+        ('last_day_ago', 'lastDayAgo', to_decimal),
+        ('vol', 'vol', to_decimal),
+        ('spread', 'spread', to_decimal),
+        ('min_order_amount', 'min_order_amount', to_decimal),
+        ('buy_fee_percent', 'buy_fee_percent', to_decimal),
+        ('sell_fee_percent', 'sell_fee_percent', to_decimal),
+        ('updated_time', 'updated_time', int),
+        ('server_time', 'server_time', int)
+    )
+    __slots__ = slots_of(fields)
+
+
+class Price(Record):
+    fields = (
+        ('market_name', 'market_name', str),
+        ('buy', 'buy', to_decimal),
+        ('sell', 'sell', to_decimal),
+        ('updated_time', 'updated_time', int),
+        ('server_time', 'server_time', int)
+    )
+    __slots__ = slots_of(fields)
+
+
+class Market(Record):
+    fields = (
+        ('market_name', 'market_name', str),
+        ('currency', 'currency', str),
+        ('partner', 'partner', str),
+        ('currency_long', 'currency_long', str),
+        ('partner_long', 'partner_long', str),
+        ('min_order_amount', 'min_order_amount', to_decimal),
+        ('min_buy_price', 'min_buy_price', to_decimal),
+        ('min_sell_price', 'min_sell_price', to_decimal),
+        ('buy_fee_percent', 'buy_fee_percent', to_decimal),
+        ('sell_fee_percent', 'sell_fee_percent', to_decimal),
+        ('active', 'active', to_bool),
+        ('currency_precision', 'currency_precision', int),
+        ('partner_precision', 'partner_precision', int)
+    )
+    __slots__ = slots_of(fields)
+
+
+class Trade(Record):
+    fields = (
+        ('id', 'id', int),
+        ('timestamp', 'timestamp', int),
+        ('quantity', 'quantity', to_decimal),
+        ('price', 'price', to_decimal),
+        ('type', 'type', str)
+    )
+    __slots__ = slots_of(fields)
+
+
+class OrderbookEntry(Record):
+    fields = (
+        ('quantity', 'Quantity', to_decimal),
+        ('rate', 'Rate', to_decimal)
+    )
+    __slots__ = slots_of(fields)
+
+
+class Orderbook(Record):
+    fields = (
+        ('buy', 'buy', records_of(OrderbookEntry)),
+        ('sell', 'sell', records_of(OrderbookEntry))
+    )
+    __slots__ = slots_of(fields)
+
+
+class Candle(Record):
+    fields = (
+        ('date', 'date', str),
+        ('open', 'open', to_decimal),
+        ('high', 'high', to_decimal),
+        ('low', 'low', to_decimal),
+        ('close', 'close', to_decimal),
+        ('volume', 'volume', to_decimal)
+    )
+    __slots__ = slots_of(fields)
@@ -0,0 +1,273 @@
+from bisect import bisect_left, bisect_right
+from decimal import Decimal
+
+from pycryptoclients.markets.stocks_exchange.models import Orderbook
+from pycryptoclients.models import Record, slots_of, to_decimal
+
+
+__all__ = ('OrderBook', 'OrderBookDiff', 'LevelChange', 'BIDS', 'ASKS')
+
+
+BIDS = 'bids'
+ASKS = 'asks'
+
+# sides of order book by keys of orderbook response
+_SNAPSHOT_SIDES = ((BIDS, 'buy'), (ASKS, 'sell'))
+
+
+class LevelChange(Record):
+    """
+    Change of price level: `old_quantity` is `None` for added level, `quantity` is `None` for removed one.
+    """
+
+    fields = (
+        ('side', 'side', str),
+        ('price', 'price', to_decimal),
+        ('quantity', 'quantity', to_decimal),
+        ('old_quantity', 'old_quantity', to_decimal)
+    )
+    __slots__ = slots_of(fields)
+
+    @property
+    def is_added(self) -> bool:
+        return self.old_quantity is None
+
+    @property
+    def is_removed(self) -> bool:
+        return self.quantity is None
+
+
+class OrderBookDiff(object):
+    """
+    Changes of price levels between two snapshots of order book, bids first, each side from the best price.
+    """
+
+    def __init__(self, changes: list=None):
+        super(OrderBookDiff, self).__init__()
+        self.changes = changes if changes is not None else []
+
+    @property
+    def bids(self) -> list:
+        return [change for change in self.changes if change.side == BIDS]
+
+    @property
+    def asks(self) -> list:
+        return [change for change in self.changes if change.side == ASKS]
+
+    def __iter__(self):
+        return iter(self.changes)
+
+    def __len__(self):
+        return len(self.changes)
+
+    def __bool__(self):
+        return bool(self.changes)
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, self.changes)
+
+
+class _BookSide(object):
+    """
+    Price levels of one side. Prices are kept in sorted list of keys from the best price (bid prices are negated), so
+    the best level is the first one and levels are found with bisect. Cumulative quantities are rebuilt lazily after
+    changes.
+    """
+
+    def __init__(self, side: str):
+        super(_BookSide, self).__init__()
+        self.side = side
+        self._sign = -1 if side == BIDS else 1
+        self.quantities = {}
+        self._keys = []
+        self._cumulative = None
+
+    def key(self, price: Decimal) -> Decimal:
+        return price * self._sign
+
+    def price(self, key: Decimal) -> Decimal:
+        return key * self._sign
+
+    def __len__(self):
+        return len(self._keys)
+
+    def best(self) -> tuple:
+        if not self._keys:
+            return None
+        price = self.price(self._keys[0])
+        return price, self.quantities[price]
+
+    def levels(self, limit: int=None) -> list:
+        keys = self._keys if limit is None else self._keys[:limit]
+        return [(self.price(key), self.quantities[self.price(key)]) for key in keys]
+
+    def cumulative(self) -> list:
+        if self._cumulative is None:
+            total = Decimal(0)
+            cumulative = []
+
+            for key in self._keys:
+                total += self.quantities[self.price(key)]
+                cumulative.append(total)
+
+            self._cumulative = cumulative
+
+        return self._cumulative
+
+    def count_levels(self, price: Decimal) -> int:
+        # number of levels with price equal to or better than `price`
+        return bisect_right(self._keys, self.key(price))
+
+    def depth(self, price: Decimal) -> Decimal:
+        count = self.count_levels(price)
+        return self.cumulative()[count - 1] if count else Decimal(0)
+
+    def price_for_quantity(self, quantity: Decimal) -> Decimal:
+        cumulative = self.cumulative()
+        index = bisect_left(cumulative, quantity)
+        return self.price(self._keys[index]) if index < len(cumulative) else None
+
+    def update(self, quantities: dict) -> list:
+        changes = []
+        old_quantities = self.quantities
+
+        for price, quantity in quantities.items():
+            old_quantity = old_quantities.get(price)
+
+            if old_quantity != quantity:
+                changes.append(LevelChange(side=self.side, price=price, quantity=quantity, old_quantity=old_quantity))
+
+        for price, old_quantity in old_quantities.items():
+            if price not in quantities:
+                changes.append(LevelChange(side=self.side, price=price, quantity=None, old_quantity=old_quantity))
+
+        if changes:
+            if any(change.is_added or change.is_removed for change in changes):
+                self._keys = sorted(self.key(price) for price in quantities)
+
+            self.quantities = quantities
+            self._cumulative = None
+            changes.sort(key=lambda change: self.key(change.price))
+
+        return changes
+
+    def apply(self, changes: list):
+        for change in changes:
+            if change.is_removed:
+                # removal of level which is already absent (e.g. diff applied twice) changes nothing
+                if self.quantities.pop(change.price, None) is not None:
+                    del self._keys[bisect_left(self._keys, self.key(change.price))]
+            else:
+                if change.price not in self.quantities:
+                    self._keys.insert(bisect_left(self._keys, self.key(change.price)), self.key(change.price))
+                self.quantities[change.price] = change.quantity
+
+        self._cumulative = None
+
+
+class OrderBook(object):
+    """
+    Local order book of currency pair maintained from successive snapshots of `orderbook` method.
+
+    Every snapshot is compared with current state and resulting `OrderBookDiff` is returned, so only changes can be
+    propagated downstream (replicas apply them with `apply_diff`). Best bid/ask are found in O(1), depth queries in
+    O(log n) after the first query following update.
+    """
+
+    def __init__(self, currency1: str=None, currency2: str=None):
+        super(OrderBook, self).__init__()
+        self.currency1 = currency1
+        self.currency2 = currency2
+        self._sides = {BIDS: _BookSide(BIDS), ASKS: _BookSide(ASKS)}
+
+    @staticmethod
+    def _get_quantities(entries) -> dict:
+        quantities = {}
+
+        for entry in entries or ():
+            if isinstance(entry, dict):
+                price, quantity = to_decimal(entry['Rate']), to_decimal(entry['Quantity'])
+            else:
+                price, quantity = entry.rate, entry.quantity
+
+            # levels with the same rate are merged
+            quantities[price] = quantities.get(price, Decimal(0)) + quantity
+
+        return {price: quantity for price, quantity in quantities.items() if quantity}
+
+    def update(self, snapshot) -> OrderBookDiff:
+        """
+        Replaces state of order book with snapshot and returns changes.
+
+        :param snapshot: data of `orderbook` response (raw response, its `result` or `Orderbook` record)
+        """
+        if isinstance(snapshot, dict) and 'result' in snapshot:
+            snapshot = snapshot['result']
+
+        changes = []
+
+        for side, key in _SNAPSHOT_SIDES:
+            entries = getattr(snapshot, key) if isinstance(snapshot, Orderbook) else snapshot.get(key)
+            changes.extend(self._sides[side].update(self._get_quantities(entries)))
+
+        return OrderBookDiff(changes)
+
+    def refresh(self, api, **kwargs) -> OrderBookDiff:
+        """
+        Requests snapshot of order book with `api` client and applies it.
+        """
+        kwargs.setdefault('saving_time', 0)
+        response = api.call('orderbook', currency1=self.currency1, currency2=self.currency2, **kwargs)
+        return self.update(response.data)
+
+    def apply_diff(self, diff: OrderBookDiff):
+        for side in (BIDS, ASKS):
+            self._sides[side].apply([change for change in diff if change.side == side])
+
+    @property
+    def bids(self) -> list:
+        return self._sides[BIDS].levels()
+
+    @property
+    def asks(self) -> list:
+        return self._sides[ASKS].levels()
+
+    def levels(self, side: str, limit: int=None) -> list:
+        """
+        Returns (price, quantity) pairs of side from the best price.
+        """
+        return self._sides[side].levels(limit)
+
+    def best_bid(self) -> tuple:
+        return self._sides[BIDS].best()
+
+    def best_ask(self) -> tuple:
+        return self._sides[ASKS].best()
+
+    def spread(self) -> Decimal:
+        bid, ask = self.best_bid(), self.best_ask()
+        return ask[0] - bid[0] if bid and ask else None
+
+    def get_quantity(self, side: str, price) -> Decimal:
+        return self._sides[side].quantities.get(to_decimal(price))
+
+    def count_levels(self, side: str, price) -> int:
+        """
+        Returns number of levels of side with price equal to or better than `price`.
+        """
+        return self._sides[side].count_levels(to_decimal(price))
+
+    def depth(self, side: str, price) -> Decimal:
+        """
+        Returns total quantity of levels of side with price equal to or better than `price`.
+        """
+        return self._sides[side].depth(to_decimal(price))
+
+    def price_for_quantity(self, side: str, quantity) -> Decimal:
+        """
+        Returns the worst price of levels needed to fill `quantity` or `None` if side is not deep enough.
+        """
+        return self._sides[side].price_for_quantity(to_decimal(quantity))
+
+    def __len__(self):
+        return len(self._sides[BIDS]) + len(self._sides[ASKS])
@@ -87,16 +87,21 @@ class GraficPublicRequest(StocksExchangeRequest):
 
 class StockExchangePrivateRequest(StocksExchangeRequest):
     is_private = True
+    cacheable = False
 
-    def __init__(self, api_key: str, api_secret: str, **kwargs):
+    def __init__(self, api_key: str=None, api_secret: str=None, auth: HmacAuth=None, **kwargs):
         super(StockExchangePrivateRequest, self).__init__(**kwargs)
-        self.auth = HmacAuth(api_key=api_key, api_secret=api_secret)
+        self.auth = auth if auth is not None else HmacAuth(api_key=api_key, api_secret=api_secret, codec=self.codec)
         self.url = self.base_url.format(method='')
         self.method = 'POST'
         self.json = {
             'method': self.api_method
         }
 
+    def encode_body(self) -> bytes:
+        # body with nonce is serialized once here and signed as is by auth
+        return self.auth.encode_body(self.json)
+
 
 class GetAccountInfoRequest(StockExchangePrivateRequest):
     api_method = 'GetInfo'
@@ -141,6 +146,7 @@ class GetActiveOrdersRequest(StockExchangePrivateRequest):
 
 class TradeRequest(StockExchangePrivateRequest):
     api_method = 'Trade'
+    idempotent = False
 
     def __init__(self, _type: str, currency1: str, currency2: str, amount: float, rate: float, **kwargs):
         super(TradeRequest, self).__init__(**kwargs)
@@ -258,6 +264,7 @@ class DepositRequest(StockExchangePrivateRequest):
 
 class WithdrawRequest(StockExchangePrivateRequest):
     api_method = 'Withdraw'
+    idempotent = False
 
     def __init__(self, currency: str, address: str, amount: float, **kwargs):
         super(WithdrawRequest, self).__init__(**kwargs)
@@ -270,10 +277,12 @@ class WithdrawRequest(StockExchangePrivateRequest):
 
 class GenerateWalletsRequest(DepositRequest):
     api_method = 'GenerateWallets'
+    idempotent = False
 
 
 class TicketRequest(StockExchangePrivateRequest):
     api_method = 'Ticket'
+    idempotent = False
 
     def __init__(self, category: int, subject: str, message: str, currency_name=None, **kwargs):
         super(TicketRequest, self).__init__(**kwargs)
@@ -303,6 +312,7 @@ class GetTicketsRequest(StockExchangePrivateRequest):
 
 class ReplyTicketRequest(StockExchangePrivateRequest):
     api_method = 'ReplyTicket'
+    idempotent = False
 
     def __init__(self, ticket_id: int, message: str, **kwargs):
         super(ReplyTicketRequest, self).__init__(**kwargs)
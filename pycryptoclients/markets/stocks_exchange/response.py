@@ -1,10 +1,214 @@
-from pycryptoclients.response import CCAPIResponseParser
-from pycryptoclients.exc import CCAPIDataException
+import requests
+
+from pycryptoclients.codec import JSONCodec
+from pycryptoclients.columns import INT8, INT64, FLOAT64, make_columns, to_float, to_scaled_int, to_timestamp
+from pycryptoclients.exc import CCAPIDataException, CCAPIResponseParsingException
+from pycryptoclients.markets.stocks_exchange.models import *
+from pycryptoclients.response import CCAPIResponseParser, CCAPIResponse, ResponseStream, BufferedResponseStream
+
+
+__all__ = ('StocksExchangeResponseParser', 'StocksExchangeRecordsParser', 'TickerParser', 'PricesParser',
+           'MarketsParser', 'TradeHistoryParser', 'OrderbookParser', 'GraficParser', 'StocksExchangeColumnsParser',
+           'TradeHistoryColumnsParser', 'GraficColumnsParser', 'DEFAULT_STREAM_BATCH_SIZE')
+
+
+DEFAULT_STREAM_BATCH_SIZE = 10000
 
 
 class StocksExchangeResponseParser(CCAPIResponseParser):
+    stream_items_key = 'result'
 
     @classmethod
     def check_for_errors(cls, data):
         if isinstance(data, dict) and not int(data.get('success')):
             raise CCAPIDataException(msg=data.get('error'))
+
+
+class StocksExchangeRecordsParser(StocksExchangeResponseParser):
+    """
+    Parser which returns typed records (see `pycryptoclients.markets.stocks_exchange.models`) instead of raw response:
+    list of records if `many` is set, single record otherwise. Records are taken from response by `records_path`.
+
+    Streamed records are built while response is received if they are items of top-level array or of array stored
+    by `stream_items_key`, other responses are parsed when they are complete.
+    """
+
+    record_class = None
+    records_path = ()
+    many = True
+
+    @classmethod
+    def parse(cls, response: requests.Response, codec: JSONCodec=None) -> CCAPIResponse:
+        cc_resp = super(StocksExchangeRecordsParser, cls).parse(response, codec=codec)
+        data = cc_resp.data
+
+        try:
+            for key in cls.records_path:
+                data = data[key]
+
+            cc_resp.data = [cls.record_class.from_dict(item) for item in data] if cls.many else \
+                cls.record_class.from_dict(data)
+        except (KeyError, IndexError, TypeError, AttributeError, ArithmeticError, ValueError) as e:
+            raise CCAPIResponseParsingException(exc=e, response=response)
+
+        return cc_resp
+
+    @classmethod
+    def make_stream(cls):
+        if cls.many and cls.records_path in ((), (cls.stream_items_key,)):
+            return ResponseStream(cls, convert=lambda items: [cls.record_class.from_dict(item) for item in items])
+
+        # single record and nested records can not be decoded incrementally
+        return BufferedResponseStream(cls, split=lambda data: data if cls.many else [data])
+
+
+class TickerParser(StocksExchangeRecordsParser):
+    record_class = Ticker
+
+
+class PricesParser(StocksExchangeRecordsParser):
+    record_class = Price
+
+
+class MarketsParser(StocksExchangeRecordsParser):
+    record_class = Market
+
+
+class TradeHistoryParser(StocksExchangeRecordsParser):
+    record_class = Trade
+    records_path = ('result',)
+
+
+class OrderbookParser(StocksExchangeRecordsParser):
+    record_class = Orderbook
+    records_path = ('result',)
+    many = False
+
+
+class GraficParser(StocksExchangeRecordsParser):
+    record_class = Candle
+    records_path = ('data', 'graf')
+
+
+class StocksExchangeColumnsParser(StocksExchangeResponseParser):
+    """
+    Parser which returns items of response as dict of column arrays (numpy arrays if numpy is installed, otherwise
+    `array.array`). Timestamps are int64, prices and amounts are float64 or int64 in units of `1 / price_scale` and
+    `1 / amount_scale` if scales are set.
+
+    Columns are built in one pass over records of response decoded by codec of client, so dicts of records still exist
+    until columns are built: columnar output saves conversion of records in application code and memory of kept data,
+    not time of parsing. Streamed response yields dicts of columns of at most `stream_batch_size` records which are
+    built while response is received if records are items of array stored by `stream_items_key` (e.g. trade history),
+    other responses are parsed when they are complete.
+    """
+
+    records_path = ()
+    price_scale = None
+    amount_scale = None
+    use_numpy = None
+    stream_batch_size = DEFAULT_STREAM_BATCH_SIZE
+
+    @classmethod
+    def get_converter(cls, scale: int=None) -> tuple:
+        return (INT64, to_scaled_int(scale)) if scale else (FLOAT64, to_float)
+
+    @classmethod
+    def get_columns(cls) -> tuple:
+        raise NotImplementedError
+
+    @classmethod
+    def parse(cls, response: requests.Response, codec: JSONCodec=None) -> CCAPIResponse:
+        cc_resp = super(StocksExchangeColumnsParser, cls).parse(response, codec=codec)
+        data = cc_resp.data
+
+        try:
+            for key in cls.records_path:
+                data = data[key]
+
+            cc_resp.data = cls.make_columns(data)
+        except (KeyError, IndexError, TypeError, AttributeError, ArithmeticError, ValueError) as e:
+            raise CCAPIResponseParsingException(exc=e, response=response)
+
+        return cc_resp
+
+    @classmethod
+    def make_columns(cls, records) -> dict:
+        return make_columns(records, cls.get_columns(), use_numpy=cls.use_numpy)
+
+    @classmethod
+    def make_stream(cls):
+        if cls.records_path == (cls.stream_items_key,):
+            return _ColumnsStream(cls)
+        return BufferedResponseStream(cls)
+
+
+class _ColumnsStream(ResponseStream):
+    # collects streamed records into batches of columns
+
+    def __init__(self, parser):
+        super(_ColumnsStream, self).__init__(parser)
+        self._records = []
+
+    def _make_batches(self, records: list, final: bool=False) -> list:
+        self._records.extend(records)
+        size = self.parser.stream_batch_size
+        batches = []
+
+        while len(self._records) >= size or (final and self._records):
+            batches.append(self.parser.make_columns(self._records[:size]))
+            del self._records[:size]
+
+        return batches
+
+    def feed(self, data: bytes) -> list:
+        return self._make_batches(super(_ColumnsStream, self).feed(data))
+
+    def close(self) -> list:
+        return self._make_batches(super(_ColumnsStream, self).close(), final=True)
+
+
+TRADE_SIDES = {'BUY': 1, 'SELL': -1}
+
+
+def _to_side(value) -> int:
+    return TRADE_SIDES[value.upper()]
+
+
+class TradeHistoryColumnsParser(StocksExchangeColumnsParser):
+    """
+    Returns columns `id`, `timestamp`, `price`, `quantity` and `side` (1 for buy, -1 for sell).
+    """
+
+    records_path = ('result',)
+
+    @classmethod
+    def get_columns(cls) -> tuple:
+        price_type, price_converter = cls.get_converter(cls.price_scale)
+        amount_type, amount_converter = cls.get_converter(cls.amount_scale)
+        return (
+            ('id', 'id', INT64, int),
+            ('timestamp', 'timestamp', INT64, int),
+            ('price', 'price', price_type, price_converter),
+            ('quantity', 'quantity', amount_type, amount_converter),
+            ('side', 'type', INT8, _to_side)
+        )
+
+
+class GraficColumnsParser(StocksExchangeColumnsParser):
+    """
+    Returns columns `timestamp` (unix time of candle date), `open`, `high`, `low` and `close`.
+    """
+
+    records_path = ('data', 'graf')
+
+    @classmethod
+    def get_columns(cls) -> tuple:
+        price_type, price_converter = cls.get_converter(cls.price_scale)
+        return (
+            ('timestamp', 'date', INT64, to_timestamp),
+            ('open', 'open', price_type, price_converter),
+            ('high', 'high', price_type, price_converter),
+            ('low', 'low', price_type, price_converter),
+            ('close', 'close', price_type, price_converter)
+        )
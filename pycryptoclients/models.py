@@ -0,0 +1,72 @@
+from decimal import Decimal
+
+
+__all__ = ('Record', 'slots_of', 'to_decimal', 'to_bool', 'records_of')
+
+
+def to_decimal(value) -> Decimal:
+    # floats are converted through str, so 0.002 becomes Decimal('0.002') instead of its binary approximation
+    return value if isinstance(value, Decimal) else Decimal(value if isinstance(value, (str, int)) else str(value))
+
+
+def to_bool(value) -> bool:
+    return bool(int(value)) if isinstance(value, str) else bool(value)
+
+
+def records_of(record_class):
+    """
+    Returns converter of list of dicts to list of records of `record_class`.
+    """
+    def convert(items) -> list:
+        return [record_class.from_dict(item) for item in items]
+    return convert
+
+
+class Record(object):
+    """
+    Compact typed record of market data. Values of response are converted once when record is built from dict, records
+    have no instance `__dict__`, so they take a fraction of memory of source dicts.
+
+    Subclasses declare `fields` as tuples of (attribute, key in response data, converter) and `__slots__` with the
+    same attributes, e.g. `__slots__ = slots_of(fields)`. Missing and null values are set to `None`.
+    """
+
+    __slots__ = ()
+    fields = ()
+
+    def __init__(self, **kwargs):
+        for attr, _, _ in self.fields:
+            setattr(self, attr, kwargs.get(attr))
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        record = cls.__new__(cls)
+
+        for attr, key, converter in cls.fields:
+            value = data.get(key)
+            setattr(record, attr, converter(value) if value is not None else None)
+
+        return record
+
+    def to_dict(self) -> dict:
+        return {attr: getattr(self, attr) for attr, _, _ in self.fields}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, attr) == getattr(other, attr) for attr, _, _ in self.fields)
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__,
+                               ', '.join('{}={!r}'.format(attr, getattr(self, attr)) for attr, _, _ in self.fields))
+
+    def __getstate__(self):
+        return tuple(getattr(self, attr) for attr, _, _ in self.fields)
+
+    def __setstate__(self, state):
+        for (attr, _, _), value in zip(self.fields, state):
+            setattr(self, attr, value)
+
+
+def slots_of(fields) -> tuple:
+    return tuple(attr for attr, _, _ in fields)
@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+__all__ = ('NonceGenerator', 'FileNonceGenerator', 'get_nonce_generator', 'DEFAULT_MAKEWEIGHT')
+
+
+DEFAULT_MAKEWEIGHT = 1000000
+
+
+class NonceGenerator(object):
+    """
+    Thread-safe generator of strictly increasing nonces. Nonce is current time multiplied by `makeweight` (i.e.
+    microseconds by default) or previous nonce plus one if time has not advanced enough.
+    """
+
+    def __init__(self, makeweight: int=DEFAULT_MAKEWEIGHT):
+        super(NonceGenerator, self).__init__()
+
+        if not isinstance(makeweight, int) or makeweight < 0:
+            raise ValueError(makeweight)
+
+        self._lock = threading.Lock()
+        self._last = 0
+        self.makeweight = makeweight
+
+    def _next(self, last: int) -> int:
+        return max(int(time.time() * self.makeweight), last + 1)
+
+    def __call__(self) -> int:
+        with self._lock:
+            self._last = self._next(self._last)
+            return self._last
+
+
+class FileNonceGenerator(NonceGenerator):
+    """
+    Generator which keeps last nonce in file locked with `flock`, so nonces are strictly increasing across worker
+    processes which share the file and across restarts.
+    """
+
+    def __init__(self, path: str, makeweight: int=DEFAULT_MAKEWEIGHT):
+        if fcntl is None:
+            raise ImportError('{} is not supported on this platform'.format(self.__class__.__name__))
+
+        super(FileNonceGenerator, self).__init__(makeweight)
+        self.path = path
+
+    def __call__(self) -> int:
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                state = os.read(fd, 32).strip()
+                nonce = self._next(int(state) if state else 0)
+
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, str(nonce).encode('ascii'))
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+            self._last = nonce
+            return nonce
+
+
+_generators = {}
+_generators_lock = threading.Lock()
+
+
+def get_nonce_generator(key=None) -> NonceGenerator:
+    """
+    Returns generator shared by all users of the same key (e.g. API key) in current process.
+    """
+    with _generators_lock:
+        generator = _generators.get(key)
+
+        if generator is None:
+            generator = _generators[key] = NonceGenerator()
+
+        return generator
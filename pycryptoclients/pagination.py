@@ -0,0 +1,122 @@
+import asyncio
+import collections
+from concurrent.futures import ThreadPoolExecutor
+
+
+__all__ = ('iter_pages', 'AsyncPageIterator')
+
+
+def _select_new_items(items, key, previous_keys: set) -> tuple:
+    # returns items which were not yielded with previous page and keys of all items of page
+    if key is None:
+        return list(items), set()
+
+    page_keys = set()
+    new_items = []
+
+    for item in items:
+        item_key = key(item)
+        page_keys.add(item_key)
+
+        if item_key not in previous_keys:
+            new_items.append(item)
+
+    return new_items, page_keys
+
+
+def iter_pages(fetch_page, cursor=None, key=None, prefetch: bool=True):
+    """
+    Yields items of paginated API method page by page.
+
+    :param fetch_page: callable which gets cursor of page and returns pair of (items of page, cursor of next page or
+        `None` if page is the last one)
+    :param cursor: cursor of the first page
+    :param key: callable which returns identity of item, items already yielded with previous page are skipped and
+        iteration stops at page without new items
+    :param prefetch: whether to request next page in background thread while items of current page are consumed
+    """
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    future = None
+    previous_keys = set()
+
+    try:
+        while True:
+            items, cursor = future.result() if future is not None else fetch_page(cursor)
+            future = None
+
+            if executor is not None and cursor is not None and items:
+                future = executor.submit(fetch_page, cursor)
+
+            new_items, previous_keys = _select_new_items(items, key, previous_keys)
+            yield from new_items
+
+            if cursor is None or not new_items:
+                return
+    finally:
+        if future is not None:
+            future.cancel()
+
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+class AsyncPageIterator(object):
+    """
+    Asynchronous variant of `iter_pages`, usage: `async for item in AsyncPageIterator(fetch_page)`. `fetch_page` is
+    coroutine function, next page is requested in background task if `prefetch` is set. Task of next page is
+    cancelled by `aclose` if iteration is stopped before the last page.
+    """
+
+    def __init__(self, fetch_page, cursor=None, key=None, prefetch: bool=True):
+        super(AsyncPageIterator, self).__init__()
+        self.fetch_page = fetch_page
+        self.key = key
+        self.prefetch = prefetch
+        self._cursor = cursor
+        self._items = collections.deque()
+        self._previous_keys = set()
+        self._future = None
+        self._done = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            while not self._items:
+                if self._done:
+                    raise StopAsyncIteration
+
+                await self._next_page()
+        except StopAsyncIteration:
+            raise
+        except BaseException:
+            self._stop()
+            raise
+
+        return self._items.popleft()
+
+    async def _next_page(self):
+        future, self._future = self._future, None
+        items, cursor = await (future if future is not None else self.fetch_page(self._cursor))
+        self._cursor = cursor
+
+        if self.prefetch and cursor is not None and items:
+            self._future = asyncio.ensure_future(self.fetch_page(cursor))
+
+        new_items, self._previous_keys = _select_new_items(items, self.key, self._previous_keys)
+        self._items.extend(new_items)
+
+        if cursor is None or not new_items:
+            self._stop()
+
+    def _stop(self):
+        self._done = True
+
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    async def aclose(self):
+        self._items.clear()
+        self._stop()
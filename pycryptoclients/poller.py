@@ -0,0 +1,332 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pycryptoclients.api import BaseCCAPI, DEFAULT_MAX_WORKERS
+from pycryptoclients.delta import DeltaTracker
+from pycryptoclients.response import CCAPIResponse
+
+
+__all__ = ('Subscription', 'Poller', 'AsyncPoller')
+
+
+class Subscription(object):
+    """
+    Subscription to results of polled API method, returned by `subscribe` and used to `unsubscribe`.
+    """
+
+    def __init__(self, job, callback=None, queue=None, only_changed: bool=True):
+        super(Subscription, self).__init__()
+        self.job = job
+        self.callback = callback
+        self.queue = queue
+        self.only_changed = only_changed
+        self.delivered = False
+
+    @property
+    def method(self) -> str:
+        return self.job.method
+
+    @property
+    def kwargs(self) -> dict:
+        return self.job.kwargs
+
+    def deliver(self, response: CCAPIResponse):
+        # errors do not count, so the next successful result is delivered even if data did not change
+        if response.exc is None:
+            self.delivered = True
+
+        if self.callback is not None:
+            self.callback(self, response)
+
+        if self.queue is not None:
+            self.queue.put_nowait((self, response))
+
+
+class _Job(object):
+    # polling of one method with the same arguments, shared by all its subscriptions
+
+    def __init__(self, method: str, kwargs: dict, next_run: float, tracker: DeltaTracker=None):
+        self.method = method
+        self.kwargs = kwargs
+        self.tracker = tracker
+        self.subscriptions = []
+        self.next_run = next_run
+        self.running = False
+        self.last_data = None
+        self.has_data = False
+
+    @property
+    def interval(self) -> float:
+        return min(interval for _, interval in self.subscriptions)
+
+
+def _is_changed(old_data, new_data) -> bool:
+    try:
+        return bool(old_data != new_data)
+    except ValueError:
+        # e.g. arrays which have no single truth value
+        return True
+
+
+class BasePoller(object):
+    """
+    Base of pollers which call API methods periodically and deliver results to subscribers.
+
+    Subscriptions to the same method with the same arguments are coalesced into one job polled with the shortest
+    interval of its subscriptions. With `stagger` enabled the first run of every job is delayed randomly within its
+    interval, so jobs do not fire together, and requests are still throttled by rate limiter of client. Results are
+    delivered only when data changed (unless subscription is made with `only_changed=False`), errors are delivered as
+    responses with `exc` set.
+
+    Subscriptions with `delta_key` get `Delta` of records instead of full responses (see `BaseCCAPI.call_delta`), the
+    first successful delivery to every subscriber contains all current records as added.
+    """
+
+    def __init__(self, api: BaseCCAPI, stagger: bool=True):
+        super(BasePoller, self).__init__()
+        self.api = api
+        self.stagger = stagger
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    @staticmethod
+    def _make_key(method: str, kwargs: dict, delta_key=None) -> str:
+        return json.dumps([method, kwargs, delta_key], sort_keys=True, default=str)
+
+    def _wakeup(self):
+        pass
+
+    def subscribe(self, method: str, interval: float, callback=None, queue=None, only_changed: bool=True,
+                  delta_key=None, **kwargs) -> Subscription:
+        """
+        Subscribes to results of API method called with `kwargs` every `interval` seconds.
+
+        :param callback: callable which gets subscription and response
+        :param queue: queue (e.g. `queue.Queue` or `asyncio.Queue`) which gets pairs of (subscription, response)
+        :param delta_key: key of records (e.g. `market_name`) to deliver deltas of records instead of responses
+        """
+        if interval <= 0:
+            raise ValueError('interval must be positive number. Currently: {} {}'.format(interval, type(interval)))
+
+        # saved responses would hide changes of data
+        kwargs.setdefault('saving_time', 0)
+        key = self._make_key(method, kwargs, delta_key)
+
+        with self._lock:
+            job = self._jobs.get(key)
+
+            if job is None:
+                delay = random.uniform(0, interval) if self.stagger else 0.0
+                tracker = DeltaTracker(delta_key) if delta_key is not None else None
+                job = self._jobs[key] = _Job(method, kwargs, time.monotonic() + delay, tracker=tracker)
+
+            subscription = Subscription(job, callback=callback, queue=queue, only_changed=only_changed)
+            job.subscriptions.append((subscription, interval))
+
+        self._wakeup()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            job = subscription.job
+            job.subscriptions = [(s, interval) for s, interval in job.subscriptions if s is not subscription]
+
+            if not job.subscriptions:
+                self._jobs = {key: j for key, j in self._jobs.items() if j is not job}
+
+        self._wakeup()
+
+    def _take_due_jobs(self) -> tuple:
+        """
+        Marks jobs which are due as running and returns them with time in seconds until the next due job.
+        """
+        now = time.monotonic()
+        due_jobs = []
+        timeout = None
+
+        with self._lock:
+            for job in self._jobs.values():
+                if job.running:
+                    continue
+
+                if job.next_run <= now:
+                    job.running = True
+                    due_jobs.append(job)
+                else:
+                    timeout = job.next_run - now if timeout is None else min(timeout, job.next_run - now)
+
+        return due_jobs, timeout
+
+    def _complete(self, job: _Job, started: float, response: CCAPIResponse):
+        with self._lock:
+            job.running = False
+            subscriptions = [subscription for subscription, _ in job.subscriptions]
+
+            if subscriptions:
+                # keep cadence of job, but never schedule runs in the past after slow requests
+                job.next_run = max(started + job.interval, time.monotonic())
+
+            if response.exc is not None:
+                changed = True
+            elif job.tracker is not None:
+                changed = bool(response.data)
+            else:
+                changed = not job.has_data or _is_changed(job.last_data, response.data)
+                job.last_data = response.data
+                job.has_data = True
+
+        for subscription in subscriptions:
+            if job.tracker is not None and not subscription.delivered and response.exc is None:
+                subscription.deliver(CCAPIResponse(job.tracker.snapshot()))
+            elif changed or not subscription.only_changed or not subscription.delivered:
+                subscription.deliver(response)
+
+        self._wakeup()
+
+
+class Poller(BasePoller):
+    """
+    Poller which runs jobs in shared thread pool of `max_workers` threads, scheduled by background thread. Callbacks
+    are called from threads of pool. Usage:
+
+        with Poller(api) as poller:
+            poller.subscribe('ticker', interval=5.0, callback=on_ticker)
+    """
+
+    def __init__(self, api: BaseCCAPI, max_workers: int=DEFAULT_MAX_WORKERS, stagger: bool=True):
+        super(Poller, self).__init__(api, stagger=stagger)
+        self.max_workers = max_workers
+        self._condition = threading.Condition()
+        self._stopped = True
+        self._woken = False
+        self._thread = None
+        self._executor = None
+
+    def _wakeup(self):
+        with self._condition:
+            self._woken = True
+            self._condition.notify_all()
+
+    def _poll(self, job: _Job) -> CCAPIResponse:
+        if job.tracker is None:
+            return self.api._call_safe(job.method, job.kwargs)
+
+        try:
+            return self.api.call_delta(job.method, job.tracker, **job.kwargs)
+        except Exception as e:
+            return CCAPIResponse(None, exc=e)
+
+    def _run_job(self, job: _Job):
+        started = time.monotonic()
+        self._complete(job, started, self._poll(job))
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._stopped:
+                    return
+                self._woken = False
+
+            due_jobs, timeout = self._take_due_jobs()
+
+            for job in due_jobs:
+                self._executor.submit(self._run_job, job)
+
+            with self._condition:
+                # changes of jobs made after they were checked wake up scheduler immediately
+                if not self._stopped and not due_jobs and not self._woken:
+                    self._condition.wait(timeout)
+
+    def start(self):
+        with self._condition:
+            if not self._stopped:
+                return
+            self._stopped = False
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._thread = threading.Thread(target=self._run, name='pycryptoclients-poller', daemon=True)
+        self._thread.start()
+
+    def stop(self, wait: bool=True):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class AsyncPoller(BasePoller):
+    """
+    Poller of asyncio client which runs jobs as tasks of event loop, number of requests in flight is limited by
+    `concurrency` of client. Subscriptions must be made from thread of event loop. Usage:
+    `asyncio.ensure_future(poller.run())` and `poller.stop()`.
+    """
+
+    def __init__(self, api: BaseCCAPI, stagger: bool=True):
+        super(AsyncPoller, self).__init__(api, stagger=stagger)
+        self._event = None
+        self._stopped = False
+        self._tasks = set()
+
+    def _wakeup(self):
+        if self._event is not None:
+            self._event.set()
+
+    async def _poll(self, job: _Job) -> CCAPIResponse:
+        if job.tracker is None:
+            return await self.api._call_safe(job.method, job.kwargs)
+
+        try:
+            return await self.api.call_delta(job.method, job.tracker, **job.kwargs)
+        except Exception as e:
+            return CCAPIResponse(None, exc=e)
+
+    async def _run_job(self, job: _Job):
+        started = time.monotonic()
+        self._complete(job, started, await self._poll(job))
+
+    async def run(self):
+        self._event = asyncio.Event()
+        self._stopped = False
+
+        try:
+            while not self._stopped:
+                self._event.clear()
+                due_jobs, timeout = self._take_due_jobs()
+
+                for job in due_jobs:
+                    task = asyncio.ensure_future(self._run_job(job))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+
+                if not due_jobs:
+                    try:
+                        await asyncio.wait_for(self._event.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            for task in list(self._tasks):
+                task.cancel()
+
+            self._event = None
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup()
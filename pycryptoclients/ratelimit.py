@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+__all__ = ('TokenBucket', 'FileTokenBucket', 'RateLimiter')
+
+
+class TokenBucket(object):
+    """
+    Thread-safe token bucket which allows `rate` requests per second on average with bursts up to `capacity`.
+
+    Callers are never rejected: each caller reserves its tokens and waits until they are refilled, so bursts are
+    queued and sent with the highest allowed rate.
+    """
+
+    def __init__(self, rate: float, capacity: float=None):
+        super(TokenBucket, self).__init__()
+
+        if rate <= 0:
+            raise ValueError('rate must be positive number. Currently: {} {}'.format(rate, type(rate)))
+
+        self._lock = threading.Lock()
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else max(self.rate, 1.0)
+        self._tokens = self.capacity
+        self._timestamp = time.monotonic()
+
+    def _take(self, tokens: float, stored_tokens: float, timestamp: float, now: float) -> tuple:
+        stored_tokens = min(self.capacity, stored_tokens + (now - timestamp) * self.rate) - tokens
+        delay = -stored_tokens / self.rate if stored_tokens < 0 else 0.0
+        return delay, stored_tokens
+
+    def reserve(self, tokens: float=1) -> float:
+        """
+        Takes tokens from bucket and returns time in seconds which caller has to wait before sending request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            delay, self._tokens = self._take(tokens, self._tokens, self._timestamp, now)
+            self._timestamp = now
+            return delay
+
+    def acquire(self, tokens: float=1):
+        delay = self.reserve(tokens)
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket which keeps its state in file locked with `flock`, so it can be shared by several processes.
+    """
+
+    def __init__(self, path: str, rate: float, capacity: float=None):
+        if fcntl is None:
+            raise ImportError('{} is not supported on this platform'.format(self.__class__.__name__))
+
+        super(FileTokenBucket, self).__init__(rate, capacity)
+        self.path = path
+
+    def reserve(self, tokens: float=1) -> float:
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                now = time.time()
+                state = os.read(fd, 64).split()
+                stored_tokens, timestamp = (float(state[0]), float(state[1])) if len(state) == 2 else \
+                    (self.capacity, now)
+
+                delay, stored_tokens = self._take(tokens, stored_tokens, timestamp, now)
+
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, '{!r} {!r}'.format(stored_tokens, now).encode('ascii'))
+            finally:
+                os.close(fd)
+
+            return delay
+
+
+class RateLimiter(object):
+    """
+    Client-side rate limiter of API requests. Request has to acquire tokens from every bucket which applies to it:
+
+    :param methods: buckets by API method of request (e.g. `ticker`, `GetInfo`)
+    :param public: bucket shared by all public requests
+    :param private: bucket shared by all private requests
+    :param key_bucket_factory: callable which creates bucket for every API key, allows to share limiter by clients
+        with different keys
+    """
+
+    def __init__(self, methods: dict=None, public: TokenBucket=None, private: TokenBucket=None,
+                 key_bucket_factory=None):
+        super(RateLimiter, self).__init__()
+        self._lock = threading.Lock()
+        self.methods = methods or {}
+        self.public = public
+        self.private = private
+        self.key_bucket_factory = key_bucket_factory
+        self._key_buckets = {}
+
+    def _get_key_bucket(self, api_key) -> TokenBucket:
+        with self._lock:
+            bucket = self._key_buckets.get(api_key)
+
+            if bucket is None:
+                bucket = self._key_buckets[api_key] = self.key_bucket_factory()
+
+            return bucket
+
+    def get_buckets(self, api_method: str, is_private: bool=False, api_key=None) -> list:
+        buckets = []
+
+        method_bucket = self.methods.get(api_method)
+        if method_bucket is not None:
+            buckets.append(method_bucket)
+
+        class_bucket = self.private if is_private else self.public
+        if class_bucket is not None:
+            buckets.append(class_bucket)
+
+        if self.key_bucket_factory is not None and api_key:
+            buckets.append(self._get_key_bucket(api_key))
+
+        return buckets
+
+    def reserve(self, api_method: str, is_private: bool=False, api_key=None) -> float:
+        delays = [bucket.reserve() for bucket in self.get_buckets(api_method, is_private, api_key)]
+        return max(delays) if delays else 0.0
+
+    def acquire(self, api_method: str, is_private: bool=False, api_key=None):
+        delay = self.reserve(api_method, is_private, api_key)
+
+        if delay > 0:
+            time.sleep(delay)
@@ -1,29 +1,150 @@
-from requests import Request
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from requests import Request, PreparedRequest
 from requests.structures import CaseInsensitiveDict
 
+from pycryptoclients.codec import JSONCodec, get_default_codec
+from pycryptoclients.utils import ENCODING
+
 
 __all__ = ('CCAPIRequest', 'BaseCCRequest', 'DEFAULT_USER_AGENT')
 
 
 DEFAULT_USER_AGENT = 'pycryptoclients'
+DEFAULT_MAX_TEMPLATES = 1024
+
+
+# LRU of prepared requests without body and authentication by (HTTP method, URL, query parameters, headers)
+_templates = OrderedDict()
+_templates_lock = threading.Lock()
 
 
 class BaseCCRequest(Request):
     api_method = None
     default_base_url = ''
 
-    def __init__(self, base_url: str=None, **kwargs):
+    # whether response can be saved when saving of responses is enabled for all calls of API
+    cacheable = False
+
+    # fields of JSON body which differ for every request and do not affect response (e.g. nonce)
+    volatile_fields = ('nonce',)
+
+    # whether request can be safely retried after transient failure
+    idempotent = True
+
+    # whether request without body and authentication is prepared once and then copied from template
+    use_templates = True
+
+    # `CallTimings` of instrumented call which sends request
+    timings = None
+
+    def __init__(self, base_url: str=None, codec: JSONCodec=None, **kwargs):
         super(BaseCCRequest, self).__init__()
         self.base_url = base_url if base_url else self.default_base_url
+        self.codec = codec if codec is not None else get_default_codec()
         self.headers = CaseInsensitiveDict({
             'User-Agent': DEFAULT_USER_AGENT
         })
         self.method = 'GET'
 
+    def encode_body(self) -> bytes:
+        if self.json is not None:
+            return self.codec.dumps(self.json)
+        return self.data
+
+    def _get_template_key(self) -> tuple:
+        # hooks are copied from template, so requests with them are prepared every time
+        if self.json is not None or self.data or self.files or self.auth is not None or self.cookies or \
+                any(self.hooks.values()):
+            return None
+
+        params = tuple(sorted(self.params.items())) if isinstance(self.params, dict) else self.params
+        key = (self.method, self.url, params, tuple(self.headers.items()))
+
+        try:
+            hash(key)
+        except TypeError:
+            # e.g. list values of query parameters
+            return None
+
+        return key
+
+    def prepare(self) -> PreparedRequest:
+        """
+        Returns prepared request. Requests without body and authentication (e.g. public `ticker`) are prepared once,
+        then parsing of URL, encoding of parameters and validation of headers are skipped by copying the template.
+        """
+        key = self._get_template_key() if self.use_templates else None
+
+        if key is None:
+            return self._prepare()
+
+        with _templates_lock:
+            template = _templates.get(key)
+
+            if template is not None:
+                _templates.move_to_end(key)
+
+        if template is None:
+            template = self._prepare()
+
+            with _templates_lock:
+                _templates[key] = template
+
+                if len(_templates) > DEFAULT_MAX_TEMPLATES:
+                    _templates.popitem(last=False)
+
+        # template is copied because session and adapters may modify headers of sent request
+        return template.copy()
+
+    def _prepare(self) -> PreparedRequest:
+        # JSON body is encoded by codec of request instead of requests
+        p = PreparedRequest()
+        p.prepare(
+            method=self.method,
+            url=self.url,
+            headers=self.headers,
+            files=self.files,
+            data=self.encode_body(),
+            params=self.params,
+            cookies=self.cookies,
+            hooks=self.hooks
+        )
+
+        # authentication (e.g. signing of body) is applied separately, so its time can be recorded
+        if self.auth is not None:
+            if self.timings is None:
+                p.prepare_auth(self.auth)
+            else:
+                started = time.perf_counter()
+                p.prepare_auth(self.auth)
+                self.timings.sign += time.perf_counter() - started
+
+        return p
+
+    def cache_key(self) -> str:
+        """
+        Stable key of request which is used for saving of its response. Key is built from HTTP method, URL, query
+        parameters and JSON body without volatile fields, authentication and headers are not taken into account.
+        """
+        body = self.json
+
+        if isinstance(body, dict) and self.volatile_fields:
+            body = {k: v for k, v in body.items() if k not in self.volatile_fields}
+
+        params = sorted(self.params.items()) if isinstance(self.params, dict) else self.params
+        canonical = json.dumps([self.method, self.url, params, body, self.data], sort_keys=True,
+                               separators=(',', ':'), default=str)
+        return hashlib.sha1(bytes(canonical, encoding=ENCODING)).hexdigest()
+
 
 class CCAPIRequest(BaseCCRequest):
 
     is_private = False
+    cacheable = True
 
     def __init__(self, **kwargs):
         super(CCAPIRequest, self).__init__(**kwargs)
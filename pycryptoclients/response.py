@@ -1,7 +1,18 @@
+import codecs
+import inspect
+import json
 import requests
 import warnings
+from functools import lru_cache
+from requests.utils import guess_json_utf
+from typing import Iterator
 
+from pycryptoclients.codec import JSONCodec, get_default_codec
 from pycryptoclients.exc import CCAPIResponseParsingException
+from pycryptoclients.utils import ENCODING
+
+
+DEFAULT_STREAM_CHUNK_SIZE = 64 * 1024
 
 
 class CCAPIResponse(object):
@@ -11,18 +22,309 @@ class CCAPIResponse(object):
         self.exc = exc
 
 
+# states of JSONStreamDecoder
+_START = 0
+_ARRAY_FIRST = 1
+_ARRAY_NEXT = 2
+_ARRAY_VALUE = 3
+_OBJECT_FIRST = 4
+_OBJECT_KEY = 5
+_OBJECT_COLON = 6
+_OBJECT_VALUE = 7
+_OBJECT_NEXT = 8
+_SCALAR = 9
+_END = 10
+
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CONTINUATION = '.eE+-'
+
+
+class JSONStreamDecoder(object):
+    """
+    Incremental decoder of JSON document which is fed with chunks of bytes and returns items of top-level array as
+    soon as they are complete. If document is an object, items of array stored by `items_key` are returned, other
+    fields of object are collected in `envelope`.
+    """
+
+    def __init__(self, items_key: str=None):
+        super(JSONStreamDecoder, self).__init__()
+        self.items_key = items_key
+        self.envelope = {}
+        self.is_object = False
+        self._text_decoder = codecs.getincrementaldecoder(ENCODING)()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._state = _START
+        self._key = None
+        self._in_items = False
+
+    def _decode_value(self, pos: int, final: bool):
+        try:
+            value, end = self._json_decoder.raw_decode(self._buffer, pos)
+        except ValueError:
+            if final:
+                raise
+            return None, None
+
+        # value which ends with buffer (e.g. number) may be continued by next chunk, as well as number followed only
+        # by beginning of its fraction or exponent
+        if not final and (end >= len(self._buffer) or (
+                isinstance(value, (int, float)) and not isinstance(value, bool) and
+                len(self._buffer) - end <= 2 and not self._buffer[end:].strip(_NUMBER_CONTINUATION))):
+            return None, None
+
+        return value, end
+
+    def _expect(self, pos: int, chars: str):
+        char = self._buffer[pos]
+
+        if char not in chars:
+            raise ValueError('Expected one of {!r} at position {}, got {!r}'.format(chars, pos, char))
+
+        return char
+
+    def _process(self, final: bool=False) -> list:
+        items = []
+        buf = self._buffer
+        pos = 0
+
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+
+            if pos >= len(buf) or self._state == _SCALAR:
+                break
+
+            state = self._state
+
+            if state == _START:
+                char = buf[pos]
+                if char == '[':
+                    self._state = _ARRAY_FIRST
+                    pos += 1
+                elif char == '{':
+                    self.is_object = True
+                    self._state = _OBJECT_FIRST
+                    pos += 1
+                else:
+                    self._state = _SCALAR
+
+            elif state in (_ARRAY_FIRST, _ARRAY_NEXT) and buf[pos] == ']':
+                self._state = _OBJECT_NEXT if self._in_items else _END
+                self._in_items = False
+                pos += 1
+
+            elif state == _ARRAY_NEXT:
+                self._expect(pos, ',')
+                self._state = _ARRAY_VALUE
+                pos += 1
+
+            elif state in (_ARRAY_FIRST, _ARRAY_VALUE):
+                value, end = self._decode_value(pos, final)
+                if end is None:
+                    break
+                items.append(value)
+                self._state = _ARRAY_NEXT
+                pos = end
+
+            elif state == _OBJECT_FIRST and buf[pos] == '}':
+                self._state = _END
+                pos += 1
+
+            elif state in (_OBJECT_FIRST, _OBJECT_KEY):
+                self._expect(pos, '"')
+                key, end = self._decode_value(pos, final)
+                if end is None:
+                    break
+                self._key = key
+                self._state = _OBJECT_COLON
+                pos = end
+
+            elif state == _OBJECT_COLON:
+                self._expect(pos, ':')
+                self._state = _OBJECT_VALUE
+                pos += 1
+
+            elif state == _OBJECT_VALUE:
+                if self._key == self.items_key and buf[pos] == '[':
+                    self._in_items = True
+                    self._state = _ARRAY_FIRST
+                    pos += 1
+                    continue
+
+                value, end = self._decode_value(pos, final)
+                if end is None:
+                    break
+                if self._key == self.items_key:
+                    items.append(value)
+                else:
+                    self.envelope[self._key] = value
+                self._state = _OBJECT_NEXT
+                pos = end
+
+            elif state == _OBJECT_NEXT:
+                char = self._expect(pos, ',}')
+                self._state = _OBJECT_KEY if char == ',' else _END
+                pos += 1
+
+            else:
+                raise ValueError('Extra data at position {}'.format(pos))
+
+        self._buffer = buf[pos:]
+        return items
+
+    def feed(self, data: bytes) -> list:
+        self._buffer += self._text_decoder.decode(data)
+        return self._process()
+
+    def close(self) -> list:
+        self._buffer += self._text_decoder.decode(b'', final=True)
+        items = self._process(final=True)
+
+        if self._state == _SCALAR:
+            items.append(json.loads(self._buffer))
+            self._state = _END
+
+        if self._state != _END:
+            raise ValueError('Unexpected end of JSON document')
+
+        return items
+
+
+@lru_cache(maxsize=None)
+def _accepts_codec(func) -> bool:
+    parameters = inspect.signature(func).parameters.values()
+    return any(p.name == 'codec' or p.kind == inspect.Parameter.VAR_KEYWORD for p in parameters)
+
+
+def call_parser(func, *args, codec: JSONCodec=None):
+    """
+    Calls parsing method of parser (e.g. `parse` or `parse_batch`) with `codec` if method accepts it. Parsers written
+    before codecs were introduced, e.g. `parse(cls, response)`, are called without it and decode with the standard
+    json module.
+    """
+    if codec is not None and _accepts_codec(func):
+        return func(*args, codec=codec)
+    return func(*args)
+
+
+class ResponseStream(object):
+    """
+    Incremental parser of one response: `feed` takes chunks of body and returns items of response which are already
+    complete (see `CCAPIResponseParser.parse_stream`), `close` returns the rest of items and checks other fields of
+    response object for errors. Items are passed through `convert` (e.g. to build typed records) if it is set.
+    """
+
+    def __init__(self, parser, convert=None):
+        super(ResponseStream, self).__init__()
+        self.parser = parser
+        self.convert = convert
+        self._decoder = JSONStreamDecoder(items_key=parser.stream_items_key)
+
+    def _convert(self, items: list) -> list:
+        return self.convert(items) if self.convert is not None and items else items
+
+    def feed(self, data: bytes) -> list:
+        return self._convert(self._decoder.feed(data))
+
+    def close(self) -> list:
+        items = self._convert(self._decoder.close())
+
+        if self._decoder.is_object:
+            self.parser.check_for_errors(self._decoder.envelope)
+
+        return items
+
+
+class BufferedResponseStream(object):
+    """
+    Stream of parsers which can not decode their items incrementally (e.g. items nested deeper than `stream_items_key`
+    or single record): body is collected and parsed by `parse` of parser when it is complete, parsed data is turned
+    into list of items by `split` (by default it is the only item).
+    """
+
+    def __init__(self, parser, split=None):
+        super(BufferedResponseStream, self).__init__()
+        self.parser = parser
+        self.split = split
+        self._chunks = []
+
+    def feed(self, data: bytes) -> list:
+        self._chunks.append(data)
+        return []
+
+    def close(self) -> list:
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b''.join(self._chunks)
+        data = self.parser.parse(response).data
+        return self.split(data) if self.split is not None else [data]
+
+
+def iter_stream(stream, chunks, response: requests.Response=None) -> Iterator:
+    """
+    Feeds chunks of body to `stream` (see `ResponseStream`) and yields parsed items.
+    """
+    try:
+        for chunk in chunks:
+            yield from stream.feed(chunk)
+
+        yield from stream.close()
+    except ValueError as e:
+        raise CCAPIResponseParsingException(exc=e, response=response)
+
+
+def get_json_body(response: requests.Response):
+    """
+    Returns body of response to be decoded by `JSONCodec.loads`: bytes of UTF-8 body as is, text of body in other
+    encoding, which is declared by server or detected as UTF-16/UTF-32 like `requests.Response.json` does.
+    """
+    content = response.content
+    encoding = response.encoding or guess_json_utf(content)
+
+    try:
+        if encoding is None or codecs.lookup(encoding).name == 'utf-8':
+            return content
+    except LookupError:
+        return content
+
+    return str(content, encoding, errors='replace')
+
+
 class CCAPIResponseParser(object):
 
+    # key of array in response object which items are yielded by `parse_stream`
+    stream_items_key = None
+
     @classmethod
-    def parse(cls, response: requests.Response) -> CCAPIResponse:
+    def parse(cls, response: requests.Response, codec: JSONCodec=None) -> CCAPIResponse:
+        codec = codec if codec is not None else get_default_codec()
+
         try:
-            data = response.json()
+            data = codec.loads(get_json_body(response))
         except (ValueError, TypeError) as e:
             raise CCAPIResponseParsingException(exc=e, response=response)
         else:
             cls.check_for_errors(data)
             return CCAPIResponse(data)
 
+    @classmethod
+    def make_stream(cls):
+        """
+        Returns incremental parser of one response (see `ResponseStream`), which is used by `parse_stream` and by
+        streamed calls of asyncio clients.
+        """
+        return ResponseStream(cls)
+
+    @classmethod
+    def parse_stream(cls, response: requests.Response, chunk_size: int=DEFAULT_STREAM_CHUNK_SIZE) -> Iterator:
+        """
+        Yields items of top-level array of response (or of array stored by `stream_items_key` in response object)
+        while body is being received, so the whole response is never kept in memory. Other fields of response object
+        are checked for errors when response is complete.
+        """
+        return iter_stream(cls.make_stream(), response.iter_content(chunk_size=chunk_size), response)
+
     @classmethod
     def check_for_errors(cls, data):
         warnings.warn('{} has no error checking'.format(cls.__name__), stacklevel=2)
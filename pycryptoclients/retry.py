@@ -0,0 +1,89 @@
+import random
+import requests
+import time
+from email.utils import parsedate_to_datetime
+
+from pycryptoclients.request import BaseCCRequest
+
+
+__all__ = ('RetryPolicy', 'DEFAULT_RETRY_STATUSES')
+
+
+DEFAULT_RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+DEFAULT_RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+class RetryPolicy(object):
+    """
+    Policy of retrying requests which failed with transient errors (connection errors, timeouts and responses with
+    `retry_statuses`).
+
+    Delay before n-th retry is `min(backoff_cap, backoff_base * 2 ** (n - 1))`, with `jitter` enabled random delay
+    between zero and this value is used, so workers which failed together do not retry in lockstep. Delay is never
+    shorter than `Retry-After` header of response if `respect_retry_after` is set.
+
+    Non-idempotent requests (e.g. trade or withdraw, see `BaseCCRequest.idempotent`) are never retried.
+    """
+
+    def __init__(self, max_attempts: int=3, backoff_base: float=0.5, backoff_cap: float=30.0, jitter: bool=True,
+                 retry_statuses=DEFAULT_RETRY_STATUSES, retry_exceptions=DEFAULT_RETRY_EXCEPTIONS,
+                 respect_retry_after: bool=True):
+        super(RetryPolicy, self).__init__()
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_exceptions = tuple(retry_exceptions)
+        self.respect_retry_after = respect_retry_after
+
+    def is_retryable(self, req: BaseCCRequest, exc: Exception) -> bool:
+        if not getattr(req, 'idempotent', True):
+            return False
+
+        response = getattr(exc, 'response', None)
+
+        if isinstance(exc, requests.exceptions.HTTPError) and response is not None:
+            return response.status_code in self.retry_statuses
+
+        return isinstance(exc, self.retry_exceptions)
+
+    @staticmethod
+    def get_retry_after(response: requests.Response) -> float:
+        value = response.headers.get('Retry-After') if response is not None else None
+
+        if not value:
+            return None
+
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError, IndexError):
+            return None
+
+    def get_backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def get_retry_delay(self, req: BaseCCRequest, exc: Exception, attempt: int) -> float:
+        """
+        Returns delay in seconds before next attempt of request or `None` if request must not be retried.
+
+        :param attempt: number of failed attempt, starting with 1
+        """
+        if attempt >= self.max_attempts or not self.is_retryable(req, exc):
+            return None
+
+        delay = self.get_backoff(attempt)
+
+        if self.respect_retry_after:
+            retry_after = self.get_retry_after(getattr(exc, 'response', None))
+
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+
+        return delay
@@ -0,0 +1,132 @@
+import queue
+import requests
+import threading
+import time
+import warnings
+from requests.adapters import HTTPAdapter
+
+
+__all__ = ('CCSession', 'DEFAULT_POOL_CONNECTIONS', 'DEFAULT_POOL_MAXSIZE')
+
+
+try:
+    import cachecontrol
+except ImportError:
+    warnings.warn('Caching is not enabled. Install CacheControl for cache enabling', ImportWarning)
+    cachecontrol = None
+
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+
+class CCSession(object):
+    """
+    Long-lived HTTP session with connection pool which is shared by all calls of API client.
+
+    :param pool_connections: number of per-host connection pools to keep
+    :param pool_maxsize: maximum number of connections kept per host
+    :param pool_block: block when all connections to host are busy instead of opening extra ones
+    :param keep_alive: reuse connections between requests
+    :param idle_timeout: seconds after which idle pooled connections are dropped, `None` disables eviction
+    """
+
+    def __init__(self, pool_connections: int=DEFAULT_POOL_CONNECTIONS, pool_maxsize: int=DEFAULT_POOL_MAXSIZE,
+                 pool_block: bool=False, keep_alive: bool=True, idle_timeout: float=None):
+        super(CCSession, self).__init__()
+        self._lock = threading.Lock()
+        self._session = None
+        self._last_used = None
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.idle_timeout = idle_timeout
+
+    def _make_adapter(self) -> HTTPAdapter:
+        kwargs = {
+            'pool_connections': self.pool_connections,
+            'pool_maxsize': self.pool_maxsize,
+            'pool_block': self.pool_block
+        }
+
+        if cachecontrol:
+            return cachecontrol.CacheControlAdapter(**kwargs)
+
+        return HTTPAdapter(**kwargs)
+
+    def _make_session(self) -> requests.Session:
+        sess = requests.Session()
+        adapter = self._make_adapter()
+        sess.mount('https://', adapter)
+        sess.mount('http://', adapter)
+        return sess
+
+    @staticmethod
+    def _drop_idle_connections(adapter: HTTPAdapter):
+        # only connections waiting in pools are closed, requests in flight (e.g. of other clients sharing session) keep
+        # their connections
+        managers = [adapter.poolmanager] + list(adapter.proxy_manager.values())
+
+        for manager in managers:
+            for key in list(manager.pools.keys()):
+                pool = manager.pools.get(key)
+                idle = pool.pool if pool is not None else None
+
+                if idle is None:
+                    continue
+
+                slots = 0
+
+                while True:
+                    try:
+                        conn = idle.get(block=False)
+                    except queue.Empty:
+                        break
+
+                    slots += 1
+
+                    if conn is not None:
+                        conn.close()
+
+                # empty slots let pool open new connections, unless connection in flight was returned meanwhile
+                try:
+                    for _ in range(slots):
+                        idle.put(None, block=False)
+                except queue.Full:
+                    pass
+
+    def _get_session(self) -> requests.Session:
+        with self._lock:
+            now = time.monotonic()
+
+            if self._session is None:
+                self._session = self._make_session()
+
+            elif self.idle_timeout is not None and self._last_used is not None and \
+                    (now - self._last_used) > self.idle_timeout:
+                # drop connections which were idle for too long, server has most likely closed them already
+                for adapter in set(self._session.adapters.values()):
+                    self._drop_idle_connections(adapter)
+
+            self._last_used = now
+            return self._session
+
+    def send(self, prepared_request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if not self.keep_alive:
+            prepared_request.headers['Connection'] = 'close'
+
+        return self._get_session().send(prepared_request, **kwargs)
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+                self._last_used = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
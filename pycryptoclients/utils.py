@@ -1,8 +1,9 @@
 import time
 import random
+import threading
 
 
-__all__ = ('Dotdict', 'make_nonce', 'ENCODING', 'set_not_none_dict_kwargs')
+__all__ = ('Dotdict', 'make_nonce', 'ENCODING', 'set_not_none_dict_kwargs', 'SingleFlight')
 
 
 ENCODING = 'utf-8'
@@ -24,3 +25,50 @@ def set_not_none_dict_kwargs(dictionary: dict, **kwargs):
         for k, v in kwargs.items():
             if v is not None:
                 dictionary[k] = v
+
+
+class _Flight(object):
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exc = None
+
+
+class SingleFlight(object):
+    """
+    Deduplicates concurrent calls by key: the first caller executes function, others wait for its result (or
+    exception) instead of executing function again. Calls with different keys do not block each other.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+
+            if flight.exc is not None:
+                raise flight.exc
+
+            return flight.result
+
+        try:
+            flight.result = func(*args, **kwargs)
+        except BaseException as e:
+            flight.exc = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+        return flight.result
@@ -1,5 +1,10 @@
+import asyncio
+
+from pycryptoclients.aio import AsyncCCAPIMixin
 from pycryptoclients.api import CCRPC, APIMethod
-from pycryptoclients.wallets.dash.request import DashRPCRequest
+from pycryptoclients.exc import CCAPINoMethodException
+from pycryptoclients.response import call_parser
+from pycryptoclients.wallets.dash.request import DashRPCRequest, DashRPCBatchRequest
 from pycryptoclients.wallets.dash.response import DashRPCResponseParser
 
 
@@ -12,11 +17,11 @@ class RPCMethod(APIMethod):
 
 DASH_RPC_METHOD_ARG_NUM_DICT = {
     'getinfo': 0,
-    'getaddressbalance': 0,
-    'getaddressdeltas': 0,
-    'getaddressmempool': 0,
-    'getaddresstxids': 0,
-    'getaddressutxos': 0,
+    'getaddressbalance': 1,
+    'getaddressdeltas': 1,
+    'getaddressmempool': 1,
+    'getaddresstxids': 1,
+    'getaddressutxos': 1,
     'verifymessage': 3,
     'getreceivedbyaddress': 2,
     'signmessage': 2
@@ -27,7 +32,66 @@ DEFAULT_DASH_RPC_METHODS = [RPCMethod(args_num, method_name, DashRPCRequest, Das
                             for method_name, args_num in DASH_RPC_METHOD_ARG_NUM_DICT.items()]
 
 
+DEFAULT_BATCH_SIZE = 500
+
+
 class DashWalletRPCClient(CCRPC):
+    batch_request = DashRPCBatchRequest
+    batch_parser = DashRPCResponseParser
 
     def _init_default_api_methods(self):
         self.api_methods = {method.name: method for method in DEFAULT_DASH_RPC_METHODS}
+
+    def _make_batch_requests(self, calls, batch_size: int):
+        batch_calls = []
+
+        for call in calls:
+            if isinstance(call, str):
+                method, call_args = call, ()
+            else:
+                method, call_args = call[0], call[1] if len(call) > 1 else ()
+
+            _method = self.api_methods.get(method)
+
+            if not _method:
+                raise CCAPINoMethodException(method=method)
+
+            if not call_args or not isinstance(call_args, (list, tuple)):
+                call_args = ()
+
+            batch_calls.append((method, call_args[:_method.args_num]))
+
+        for i in range(0, len(batch_calls), batch_size):
+            yield self.batch_request(rpc_user=self._rpc_user, rpc_password=self._rpc_password,
+                                     base_url=self._rpc_url, calls=batch_calls[i:i + batch_size],
+                                     codec=self._codec)
+
+    def batch(self, calls, batch_size: int=DEFAULT_BATCH_SIZE) -> list:
+        """
+        Sends many calls with JSON-RPC batch requests, at most `batch_size` calls per request.
+
+        :param calls: sequence of method names or (method name, call args) pairs
+        :return: list of `CCAPIResponse` in order of calls, error of failed call is set as `exc` of its response
+        """
+        responses = []
+
+        for req in self._make_batch_requests(calls, batch_size):
+            responses.extend(call_parser(self.batch_parser.parse_batch, self._query(req), req.ids, codec=self._codec))
+
+        return responses
+
+
+class AsyncDashWalletRPCClient(AsyncCCAPIMixin, DashWalletRPCClient):
+    """
+    Asyncio variant of `DashWalletRPCClient`, usage: `await client.call('getinfo')`.
+    """
+
+    async def batch(self, calls, batch_size: int=DEFAULT_BATCH_SIZE) -> list:
+        requests = list(self._make_batch_requests(calls, batch_size))
+        http_responses = await asyncio.gather(*[self._query(req) for req in requests])
+        responses = []
+
+        for req, http_response in zip(requests, http_responses):
+            responses.extend(call_parser(self.batch_parser.parse_batch, http_response, req.ids, codec=self._codec))
+
+        return responses
@@ -1,20 +1,51 @@
 from requests.auth import HTTPBasicAuth
 
+from pycryptoclients.nonce import get_nonce_generator
 from pycryptoclients.request import BaseCCRequest
-from pycryptoclients.utils import make_nonce
 
 
-class DashRPCRequest(BaseCCRequest):
+JSONRPC_VERSION = '1.0'
 
-    def __init__(self, rpc_user, rpc_password, method_name, args_num=0, params=(), **kwargs):
-        super(DashRPCRequest, self).__init__(**kwargs)
+
+class BaseDashRPCRequest(BaseCCRequest):
+
+    def __init__(self, rpc_user, rpc_password, **kwargs):
+        super(BaseDashRPCRequest, self).__init__(**kwargs)
         self.method = 'POST'
         self.url = self.base_url
         self.auth = HTTPBasicAuth(rpc_user, rpc_password)
         self.headers['Content-Type'] = 'text/plain'
+
+
+class DashRPCRequest(BaseDashRPCRequest):
+    volatile_fields = ('id',)
+
+    def __init__(self, rpc_user, rpc_password, method_name, args_num=0, params=(), **kwargs):
+        super(DashRPCRequest, self).__init__(rpc_user, rpc_password, **kwargs)
+        self.api_method = method_name
         self.json = {
             'method': method_name,
-            'jsonrpc': '1.0',
-            'id': str(make_nonce()),
+            'jsonrpc': JSONRPC_VERSION,
+            'id': str(get_nonce_generator(rpc_user)()),
             'params': params[:args_num]
         }
+
+
+class DashRPCBatchRequest(BaseDashRPCRequest):
+    """
+    JSON-RPC batch request: `calls` is a sequence of (method name, params) pairs which are sent as one JSON array.
+    Ids of calls are available in `ids` in the same order as calls.
+    """
+
+    def __init__(self, rpc_user, rpc_password, calls=(), **kwargs):
+        super(DashRPCBatchRequest, self).__init__(rpc_user, rpc_password, **kwargs)
+        batch_id = get_nonce_generator(rpc_user)()
+        self.ids = ['{}-{}'.format(batch_id, i) for i in range(len(calls))]
+        self.json = [
+            {
+                'method': method_name,
+                'jsonrpc': JSONRPC_VERSION,
+                'id': _id,
+                'params': params
+            } for _id, (method_name, params) in zip(self.ids, calls)
+        ]
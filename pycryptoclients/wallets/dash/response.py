@@ -1,18 +1,56 @@
 import requests
-from pycryptoclients.exc import CCAPIDataException
-from pycryptoclients.response import CCAPIResponseParser
+from pycryptoclients.codec import JSONCodec
+from pycryptoclients.exc import CCAPIDataException, CCAPIResponseParsingException
+from pycryptoclients.response import CCAPIResponseParser, CCAPIResponse
 
 
 class DashRPCResponseParser(CCAPIResponseParser):
+    stream_items_key = 'result'
 
     @classmethod
-    def parse(cls, response: requests.Response):
-        cc_resp = super(DashRPCResponseParser, cls).parse(response)
+    def parse(cls, response: requests.Response, codec: JSONCodec=None):
+        cc_resp = super(DashRPCResponseParser, cls).parse(response, codec=codec)
         result = cc_resp.data.get('result')
         cls.check_for_errors(result)
         cc_resp.data = result
         return cc_resp
 
+    @classmethod
+    def parse_batch(cls, response: requests.Response, ids: list, codec: JSONCodec=None) -> list:
+        """
+        Parses response to batch request and returns responses in order of `ids`. Errors of single calls do not
+        raise, they are set as `exc` of corresponding responses.
+        """
+        items = super(DashRPCResponseParser, cls).parse(response, codec=codec).data
+
+        if isinstance(items, dict):
+            cls.check_for_errors(items)
+
+        if not isinstance(items, list):
+            raise CCAPIResponseParsingException(response=response)
+
+        items_by_id = {item.get('id'): item for item in items if isinstance(item, dict)}
+        responses = []
+
+        for _id in ids:
+            item = items_by_id.get(_id)
+
+            if item is None:
+                exc = CCAPIResponseParsingException(msg='No response for call with id {}'.format(_id))
+                responses.append(CCAPIResponse(None, exc=exc))
+                continue
+
+            try:
+                cls.check_for_errors(item)
+                result = item.get('result')
+                cls.check_for_errors(result)
+            except CCAPIDataException as e:
+                responses.append(CCAPIResponse(None, exc=e))
+            else:
+                responses.append(CCAPIResponse(result))
+
+        return responses
+
     @classmethod
     def check_for_errors(cls, data: dict):
         if data and isinstance(data, dict):
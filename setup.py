@@ -21,8 +21,17 @@ setup(
         'requests>=2.19.1'
     ],
     tests_require=[
-        'requests-mock>=1.5.0'
+        'requests-mock>=1.5.0',
+        'fakeredis>=1.0'
     ],
+    extras_require={
+        'redis': ['redis>=2.10.6'],
+        'async': ['aiohttp>=3.0'],
+        'orjson': ['orjson>=2.0'],
+        'ujson': ['ujson>=1.35'],
+        'numpy': ['numpy>=1.14'],
+        'opentelemetry': ['opentelemetry-api>=1.0']
+    },
     packages=find_packages(),
     python_requires='>=3.5',
     classifiers=[
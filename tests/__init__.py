@@ -1,3 +1,5 @@
+import asyncio
+import functools
 import hashlib
 import hmac
 import unittest
@@ -12,8 +14,8 @@ class CCAPITestCase(unittest.TestCase):
         self.shared_secret = 'KW9Wixy1zj9uNyzOjFbPu7YmU4iVJ1n3lEzqVAe5byx93IwugVQdlhoN03MzZW75'
         self.api_key = 'ak9uh9ezAK3w7FivoRdEnIFjBg7Ywjz4sImOpIzE'
 
-    def assertAuth(self, m):
-        req = m.request_history[0]
+    def assertAuth(self, m, index=0):
+        req = m.request_history[index]
         req_signdata = bytearray(req.text, encoding=ENCODING)
         req_sign = bytes(req.headers['Sign'], encoding=ENCODING)
         sign = bytes(hmac.new(bytes(self.shared_secret, encoding=ENCODING), req_signdata, hashlib.sha512).hexdigest(),
@@ -34,3 +36,52 @@ class CCAPITestCase(unittest.TestCase):
         self.assertEqual(req_headers['Content-Type'], content_type)
 
         return req
+
+
+class AsyncTestCase(unittest.TestCase):
+    """
+    Runs coroutine test methods, `asyncSetUp` and `asyncTearDown` in new event loop of every test, like
+    `unittest.IsolatedAsyncioTestCase` which is not available before Python 3.8.
+    """
+
+    def __init__(self, methodName: str='runTest'):
+        super(AsyncTestCase, self).__init__(methodName)
+        test_method = getattr(self, methodName, None)
+
+        if asyncio.iscoroutinefunction(test_method):
+            @functools.wraps(test_method)
+            def run_test_method():
+                return self.loop.run_until_complete(test_method())
+
+            setattr(self, methodName, run_test_method)
+
+    def setUp(self):
+        super(AsyncTestCase, self).setUp()
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.asyncSetUp())
+
+    def tearDown(self):
+        try:
+            self.loop.run_until_complete(self.asyncTearDown())
+
+            # e.g. background refreshes which are not waited for by clients
+            all_tasks = getattr(asyncio, 'all_tasks', None) or asyncio.Task.all_tasks
+            pending = [task for task in all_tasks(self.loop) if not task.done()]
+
+            for task in pending:
+                task.cancel()
+
+            if pending:
+                self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        finally:
+            asyncio.set_event_loop(None)
+            self.loop.close()
+
+        super(AsyncTestCase, self).tearDown()
+
+    async def asyncSetUp(self):
+        pass
+
+    async def asyncTearDown(self):
+        pass
@@ -0,0 +1,280 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import requests
+import threading
+import unittest
+from unittest.mock import patch
+
+from pycryptoclients.aio import aiohttp
+from pycryptoclients.cache import MemoryCacheBackend
+from pycryptoclients.exc import CCAPIDataException, CCAPINoMethodException
+from pycryptoclients.instrumentation import CallbackInstrument, CACHE_HIT, CACHE_MISS
+from pycryptoclients.markets.stocks_exchange.api import AsyncStocksExchangeAPI
+from pycryptoclients.markets.stocks_exchange.models import Trade
+from pycryptoclients.request import DEFAULT_USER_AGENT
+from pycryptoclients.utils import ENCODING
+from pycryptoclients.wallets.dash.api import AsyncDashWalletRPCClient
+from tests import AsyncTestCase, CCAPITestCase
+from tests.test_markets import TICKER_RESPONSE, GET_ACCOUNT_INFO_RESPONSE, TRADE_HISTORY_RESPONSE, \
+    GENERIC_ERROR_RESPONSE
+from tests.test_wallets import DASH_GETINFO_RESPONSE
+
+if aiohttp is not None:
+    from aiohttp import web
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+class TestAsyncClients(CCAPITestCase, AsyncTestCase):
+
+    async def asyncSetUp(self):
+        self.requests = []
+        self.delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        app = web.Application()
+        app.router.add_get('/api2/ticker', self.handle(TICKER_RESPONSE))
+        app.router.add_get('/api2/trades', self.handle(TRADE_HISTORY_RESPONSE))
+        app.router.add_get('/api2/orderbook', self.handle(GENERIC_ERROR_RESPONSE))
+        app.router.add_get('/slow/trades', self.handle_slow)
+        app.router.add_post('/orders/', self.handle_orders)
+        app.router.add_post('/api2/', self.handle(GET_ACCOUNT_INFO_RESPONSE))
+        app.router.add_post('/rpc/', self.handle(DASH_GETINFO_RESPONSE))
+        app.router.add_post('/rpc/batch/', self.handle_batch)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+
+        port = self.runner.addresses[0][1]
+        self.base_url = 'http://127.0.0.1:{}/api2/{{method}}'.format(port)
+        self.rpc_url = 'http://127.0.0.1:{}/rpc/'.format(port)
+
+    async def asyncTearDown(self):
+        await self.runner.cleanup()
+
+    def handle(self, text):
+        async def handler(request):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.requests.append((request, await request.read()))
+            await asyncio.sleep(self.delay)
+            self.in_flight -= 1
+            return web.Response(text=text, content_type='application/json')
+        return handler
+
+    async def handle_slow(self, request):
+        # response which is not complete until client has read its beginning
+        response = web.StreamResponse()
+        await response.prepare(request)
+        await response.write(b'{"success": 1, "result": [{"id": 1}, ')
+        await asyncio.sleep(0.2)
+        return response
+
+    async def handle_orders(self, request):
+        body = await request.json()
+        self.requests.append((request, body))
+        end_id = body.get('end_id') or 12
+
+        # end_id is inclusive, so pages overlap by one order
+        ids = [i for i in range(end_id + 1, 0, -1) if i <= 12][:body['count']]
+        return web.json_response({'success': 1, 'data': {str(i): {'amount': str(i)} for i in ids}})
+
+    async def handle_batch(self, request):
+        calls = await request.json()
+        self.requests.append((request, calls))
+        return web.json_response([{'result': call['params'], 'error': None, 'id': call['id']} for call in calls])
+
+    async def test_public_call(self):
+        async with AsyncStocksExchangeAPI() as api:
+            data = (await api.call('ticker', base_url=self.base_url)).data
+
+        self.assertIsInstance(data, list)
+        self.assertEqual(data, json.loads(TICKER_RESPONSE))
+
+        request, _ = self.requests[0]
+        self.assertEqual(request.method, 'GET')
+        self.assertEqual(request.headers['User-Agent'], DEFAULT_USER_AGENT)
+
+    async def test_instrumentation(self):
+        timings = []
+
+        async with AsyncStocksExchangeAPI(instruments=[CallbackInstrument(timings.append)]) as api:
+            await api.call('ticker', base_url=self.base_url, saving_id='test')
+            await api.call('ticker', base_url=self.base_url, saving_id='test')
+
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual([t.cache for t in timings], [CACHE_MISS, CACHE_HIT])
+        self.assertEqual(timings[0].attempts, 1)
+        self.assertEqual(timings[0].status_code, 200)
+        self.assertGreater(timings[0].server, 0.0)
+        self.assertGreater(timings[0].parse, 0.0)
+
+    async def test_stale_while_revalidate(self):
+        async with AsyncStocksExchangeAPI(stale_time=30.0) as api:
+            with patch('time.time') as time_mock:
+                time_mock.return_value = 100.0
+                await api.call('ticker', base_url=self.base_url, saving_id='test', saving_time=10.0)
+
+                time_mock.return_value = 115.0
+                data = (await api.call('ticker', base_url=self.base_url, saving_id='test', saving_time=10.0)).data
+                self.assertEqual(data, json.loads(TICKER_RESPONSE))
+                self.assertEqual(len(self.requests), 1)
+
+                # refresh runs as task of event loop
+                await asyncio.gather(*api._async_refreshes.values())
+                self.assertEqual(len(self.requests), 2)
+
+                # refreshed response is fresh
+                await api.call('ticker', base_url=self.base_url, saving_id='test', saving_time=10.0, stale_time=0)
+                self.assertEqual(len(self.requests), 2)
+
+    async def test_private_call(self):
+        async with AsyncStocksExchangeAPI(api_key=self.api_key, api_secret=self.shared_secret) as api:
+            data = (await api.call('get_account_info', base_url=self.base_url)).data
+
+        self.assertEqual(data.get('success'), 1)
+
+        request, body = self.requests[0]
+        self.assertEqual(json.loads(body.decode(ENCODING))['method'], 'GetInfo')
+        sign = hmac.new(bytes(self.shared_secret, encoding=ENCODING), body, hashlib.sha512).hexdigest()
+        self.assertEqual(request.headers['Sign'], sign)
+        self.assertEqual(request.headers['Key'], self.api_key)
+
+    async def test_iter_pages(self):
+        base_url = self.base_url.replace('/api2/', '/orders/')
+
+        async with AsyncStocksExchangeAPI(api_key=self.api_key, api_secret=self.shared_secret) as api:
+            for prefetch in (True, False):
+                orders = []
+
+                async for order in api.iter_private_trade_history(count=5, prefetch=prefetch, base_url=base_url):
+                    orders.append(order)
+
+                self.assertEqual([order['id'] for order in orders], list(range(12, 0, -1)))
+
+        self.assertEqual([body.get('end_id') for _, body in self.requests], [None, 7, 3] * 2)
+
+    async def test_saving_single_flight(self):
+        self.delay = 0.05
+
+        async with AsyncStocksExchangeAPI() as api:
+            responses = await asyncio.gather(*[api.call('ticker', saving_id='test', base_url=self.base_url)
+                                               for _ in range(10)])
+            await api.call('ticker', saving_id='test', base_url=self.base_url)
+
+        self.assertEqual(len(self.requests), 1)
+        self.assertTrue(all(r is responses[0] for r in responses))
+
+    async def test_blocking_cache(self):
+        threads = []
+
+        class BlockingCacheBackend(MemoryCacheBackend):
+            blocking_io = True
+
+            def get(self, key: str):
+                threads.append(threading.current_thread())
+                return super(BlockingCacheBackend, self).get(key)
+
+            def set(self, key: str, value, ttl: float=None):
+                threads.append(threading.current_thread())
+                super(BlockingCacheBackend, self).set(key, value, ttl=ttl)
+
+        async with AsyncStocksExchangeAPI(cache=BlockingCacheBackend()) as api:
+            for _ in range(2):
+                await api.call('ticker', saving_id='test', base_url=self.base_url)
+
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(threading.main_thread(), threads)
+
+    async def test_client_errors(self):
+        with patch.object(aiohttp.ClientSession, 'request', side_effect=aiohttp.ClientPayloadError('truncated')):
+            async with AsyncStocksExchangeAPI() as api:
+                with self.assertRaises(requests.exceptions.ConnectionError) as cm:
+                    await api.call('ticker', base_url=self.base_url)
+
+        self.assertIsInstance(cm.exception.__cause__, aiohttp.ClientPayloadError)
+
+    async def test_call_stream(self):
+        async with AsyncStocksExchangeAPI(typed_records=True) as api:
+            kwargs = dict(currency1='BTC', currency2='NXT', base_url=self.base_url)
+            trades = []
+
+            async for trade in api.call_stream('trade_history', chunk_size=16, **kwargs):
+                trades.append(trade)
+
+            with self.assertRaises(CCAPIDataException):
+                async for _ in api.call_stream('orderbook', **kwargs):
+                    pass
+
+        # connection of stream closed before the end is released
+        kwargs['base_url'] = self.base_url.replace('/api2/', '/slow/')
+
+        async with AsyncStocksExchangeAPI() as api:
+            async with api.call_stream('trade_history', **kwargs) as stream:
+                self.assertEqual((await stream.__anext__())['id'], 1)
+                self.assertIsNotNone(stream._response.raw.connection)
+
+            self.assertIsNone(stream._response.raw.connection)
+
+        self.assertEqual([trade.id for trade in trades],
+                         [item['id'] for item in json.loads(TRADE_HISTORY_RESPONSE)['result']])
+        self.assertIsInstance(trades[0], Trade)
+
+    async def test_concurrency_limit(self):
+        self.delay = 0.02
+
+        async with AsyncStocksExchangeAPI(concurrency=3) as api:
+            await asyncio.gather(*[api.call('ticker', base_url=self.base_url) for _ in range(10)])
+
+        self.assertEqual(len(self.requests), 10)
+        self.assertEqual(self.max_in_flight, 3)
+
+    async def test_call_many(self):
+        async with AsyncStocksExchangeAPI(concurrency=2) as api:
+            responses = await api.call_many([('ticker', {'base_url': self.base_url}), 'karabas'] * 3)
+
+            results = [await f for f in api.iter_call_many([('ticker', {'base_url': self.base_url})] * 2)]
+
+        self.assertEqual(len(responses), 6)
+        self.assertEqual(responses[0].data, json.loads(TICKER_RESPONSE))
+        self.assertIsInstance(responses[1].exc, CCAPINoMethodException)
+        self.assertEqual(sorted(i for i, _ in results), [0, 1])
+        self.assertEqual(len(self.requests), 5)
+
+    async def test_rpc_call(self):
+        async with AsyncDashWalletRPCClient(rpc_user='test_user', rpc_password='test_1', rpc_url=self.rpc_url) as c:
+            data = (await c.call('getinfo')).data
+
+        self.assertDictEqual(json.loads(DASH_GETINFO_RESPONSE)['result'], data)
+
+        request, body = self.requests[0]
+        self.assertEqual(json.loads(body.decode(ENCODING))['method'], 'getinfo')
+        self.assertTrue(request.headers['Authorization'].startswith('Basic '))
+
+    async def test_rpc_batch(self):
+        async with AsyncDashWalletRPCClient(rpc_user='test_user', rpc_password='test_1',
+                                            rpc_url=self.rpc_url + 'batch/') as client:
+            responses = await client.batch([('getreceivedbyaddress', ('addr{}'.format(i), i)) for i in range(5)],
+                                           batch_size=2)
+
+        self.assertEqual(len(self.requests), 3)
+        self.assertEqual([r.data for r in responses], [['addr{}'.format(i), i] for i in range(5)])
+
+    async def test_close(self):
+        api = AsyncStocksExchangeAPI()
+
+        with self.assertRaises(TypeError):
+            with api:
+                pass
+
+        self.assertEqual((await api.call('ticker', base_url=self.base_url)).data, json.loads(TICKER_RESPONSE))
+        await api.aclose()
+        self.assertIsNone(api._client_session)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,20 @@
 import json
 import requests
 import requests_mock
+import threading
+import time
 import unittest
+from collections import OrderedDict
 from unittest.mock import patch
 
 from pycryptoclients.api import CCAPI, APIMethod
+from pycryptoclients.cache import MemoryCacheBackend
+from pycryptoclients.codec import JSONCodec
+from pycryptoclients import request
 from pycryptoclients.exc import CCAPINoMethodException
 from pycryptoclients.request import CCAPIRequest, DEFAULT_USER_AGENT
-from pycryptoclients.response import CCAPIResponseParser
+from pycryptoclients.response import CCAPIResponseParser, CCAPIResponse, call_parser
+from pycryptoclients.session import CCSession
 from tests import CCAPITestCase
 
 
@@ -60,6 +67,21 @@ class TestCCAPI(CCAPITestCase):
         self.assertPublicMethod(method_name, m, url, user_agent=DEFAULT_USER_AGENT)
         self.assertIsInstance(response, requests.Response)
 
+    @requests_mock.Mocker()
+    def test_parser_without_codec(self, m):
+        m.register_uri('GET', base_url.format(method=method_name), text=test_response)
+
+        class OldParser(CCAPIResponseParser):
+
+            @classmethod
+            def parse(cls, response: requests.Response) -> CCAPIResponse:
+                return CCAPIResponse(json.loads(response.text))
+
+        api = TestAPI(api_methods={method_name: APIMethod(method_name, TestRequest, OldParser)}, codec=JSONCodec())
+        self.assertEqual(api.call(method_name).data, json.loads(test_response))
+        self.assertEqual(call_parser(CCAPIResponseParser.parse, api._query(TestRequest()), codec=JSONCodec()).data,
+                         json.loads(test_response))
+
     @requests_mock.Mocker()
     def test_public_query(self, m):
         # test with predefined ticker request
@@ -91,6 +113,59 @@ class TestCCAPI(CCAPITestCase):
             self.assertEqual(m.call_count, 3)
             self.assertTrue(data)
 
+    @requests_mock.Mocker()
+    def test_session_reuse(self, m):
+        url = base_url.format(method=method_name)
+        m.register_uri('GET', url, text=test_response)
+
+        session = self.api._session._get_session()
+        self.api.call(method_name)
+        self.api.call(method_name)
+        self.assertEqual(m.call_count, 2)
+        self.assertIs(self.api._session._get_session(), session)
+
+    @requests_mock.Mocker()
+    def test_close(self, m):
+        url = base_url.format(method=method_name)
+        m.register_uri('GET', url, text=test_response)
+
+        with TestAPI(pool_maxsize=2) as api:
+            api.call(method_name)
+            session = api._session._session
+            self.assertIsNotNone(session)
+
+        self.assertIsNone(api._session._session)
+
+        # closed client opens new session on demand
+        api.call(method_name)
+        self.assertIsNot(api._session._session, session)
+        self.assertEqual(m.call_count, 2)
+
+        # connections of cache backend are released too
+        cache = MemoryCacheBackend()
+
+        with patch.object(cache, 'close') as close_mock:
+            TestAPI(cache=cache).close()
+
+        close_mock.assert_called_once_with()
+
+    @requests_mock.Mocker()
+    def test_shared_session(self, m):
+        m.register_uri('GET', base_url.format(method=method_name), text=test_response)
+
+        with CCSession() as session:
+            with TestAPI(session=session) as first, TestAPI(session=session) as second:
+                first.call(method_name)
+                sess = session._session
+
+            # clients do not close session which they do not own
+            self.assertIs(session._session, sess)
+            second.call(method_name)
+            self.assertIs(session._session, sess)
+
+        self.assertIsNone(session._session)
+        self.assertEqual(m.call_count, 2)
+
     def test_get_available_methods(self):
         available_methods = self.api.get_available_methods()
         self.assertIn('get_info', available_methods)
@@ -124,15 +199,15 @@ class TestCCAPI(CCAPITestCase):
         saving_id = 'test'
         saving_time = 60.0
 
-        self.assertDictEqual(self.api._saved_data, {})
+        key = self.api._make_saving_key(saving_id, TestRequest())
+        self.assertIsNone(self.api._cache.get(key))
 
         data = self.api._query_with_saving(CCAPIResponseParser, TestRequest(), saving_id, saving_time).data
         self.assertTrue(m.called)
         self.assertEqual(m.call_count, 1)
         self.assertTrue(data)
 
-        self.assertIn(saving_id, self.api._saved_data)
-        self.assertIn(method_name, self.api._saved_data[saving_id])
+        self.assertIsNotNone(self.api._cache.get(key))
 
         time_mock.return_value = 140.0
         data = self.api._query_with_saving(CCAPIResponseParser, TestRequest(), saving_id, saving_time).data
@@ -155,8 +230,241 @@ class TestCCAPI(CCAPITestCase):
         self.assertEqual(m.call_count, 3)
         self.assertTrue(data)
 
-        self.assertIn(saving_id_2, self.api._saved_data)
-        self.assertIn(method_name, self.api._saved_data[saving_id_2])
+        self.assertIsNotNone(self.api._cache.get(self.api._make_saving_key(saving_id_2, TestRequest())))
+
+    @patch('time.time')
+    @requests_mock.Mocker()
+    def test_stale_while_revalidate(self, time_mock, m):
+        url = base_url.format(method=method_name)
+        m.register_uri('GET', url, [{'text': json.dumps([1])}, {'text': json.dumps([2])}, {'text': json.dumps([3])}])
+        api = TestAPI(stale_time=30.0)
+        time_mock.return_value = 100.0
+
+        self.assertEqual(api.call(method_name, saving_id='test', saving_time=10.0).data, [1])
+        self.assertEqual(m.call_count, 1)
+
+        # expired response is returned at once and refreshed in background
+        time_mock.return_value = 115.0
+        self.assertEqual(api.call(method_name, saving_id='test', saving_time=10.0).data, [1])
+        api.close()
+        self.assertEqual(m.call_count, 2)
+        self.assertEqual(api.call(method_name, saving_id='test', saving_time=10.0).data, [2])
+        self.assertEqual(m.call_count, 2)
+
+        # response older than saving and stale time is requested synchronously
+        time_mock.return_value = 200.0
+        self.assertEqual(api.call(method_name, saving_id='test', saving_time=10.0).data, [3])
+        self.assertEqual(m.call_count, 3)
+
+        # stale responses are not served without stale time
+        time_mock.return_value = 215.0
+        api.call(method_name, saving_id='test', saving_time=10.0, stale_time=0)
+        self.assertEqual(m.call_count, 4)
+
+        api.close()
+
+    @patch('time.time')
+    @requests_mock.Mocker()
+    def test_refresh_ahead(self, time_mock, m):
+        url = base_url.format(method=method_name)
+        release = threading.Event()
+
+        def callback(request, context):
+            release.wait(5)
+            return json.dumps([m.call_count])
+
+        m.register_uri('GET', url, [{'text': json.dumps([1])}, {'text': callback}])
+        api = TestAPI(refresh_ahead=2.0)
+        time_mock.return_value = 100.0
+        api.call(method_name, saving_id='test', saving_time=10.0)
+
+        time_mock.return_value = 105.0
+        api.call(method_name, saving_id='test', saving_time=10.0)
+        self.assertEqual(m.call_count, 1)
+
+        # response which is about to expire is refreshed once in background
+        time_mock.return_value = 109.0
+
+        for _ in range(3):
+            self.assertEqual(api.call(method_name, saving_id='test', saving_time=10.0).data, [1])
+
+        release.set()
+        api.close()
+        self.assertEqual(m.call_count, 2)
+        self.assertEqual(api.call(method_name, saving_id='test', saving_time=10.0).data, [2])
+
+    @requests_mock.Mocker()
+    def test_cache_backend(self, m):
+        url = base_url.format(method=method_name)
+        m.register_uri('GET', url, text=test_response)
+
+        cache = MemoryCacheBackend(max_entries=1)
+        api = TestAPI(cache=cache)
+        api.call(method_name, saving_id='test')
+        self.assertEqual(len(cache), 1)
+
+        api.call(method_name, saving_id='test_2')
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(m.call_count, 2)
+
+        api.call(method_name, saving_id='test')  # evicted by newer response
+        self.assertEqual(m.call_count, 3)
+
+    @requests_mock.Mocker()
+    def test_save_responses(self, m):
+        url = base_url.format(method=method_name)
+        m.register_uri('GET', url, text=test_response)
+
+        api = TestAPI(save_responses=True)
+        api.call(method_name)
+        api.call(method_name)
+        self.assertEqual(m.call_count, 1)
+
+        api.call(method_name, saving_time=None)
+        self.assertEqual(m.call_count, 2)
+
+        # saving is disabled by default
+        self.api.call(method_name)
+        self.api.call(method_name)
+        self.assertEqual(m.call_count, 4)
+
+    @requests_mock.Mocker()
+    def test_query_with_saving_concurrent(self, m):
+        url = base_url.format(method=method_name)
+        release = threading.Event()
+        in_flight = threading.Event()
+
+        def slow_response(request, context):
+            in_flight.set()
+            release.wait(5)
+            return test_response
+
+        m.register_uri('GET', url, text=slow_response)
+
+        results = []
+
+        def call(saving_id):
+            results.append(self.api._query_with_saving(CCAPIResponseParser, TestRequest(), saving_id, 60.0))
+
+        threads = [threading.Thread(target=call, args=('test',)) for _ in range(5)]
+        threads[0].start()
+        in_flight.wait(5)
+        for t in threads[1:]:
+            t.start()
+
+        # saved response for another id is not blocked by request in flight
+        self.api._cache.set(self.api._make_saving_key('cached', TestRequest()), {'data': 'saved', 'time': time.time()})
+        self.assertEqual(self.api._query_with_saving(CCAPIResponseParser, TestRequest(), 'cached', 60.0), 'saved')
+
+        release.set()
+        for t in threads:
+            t.join(5)
+
+        self.assertEqual(m.call_count, 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(r is results[0] for r in results))
+
+    @requests_mock.Mocker()
+    def test_call_many(self, m):
+        url = base_url.format(method=method_name)
+        m.register_uri('GET', url, text=test_response)
+
+        calls = [method_name, ('karabas', {}), (method_name, {'saving_id': 'test'}), (method_name, None)] * 3
+        responses = self.api.call_many(calls, max_workers=4)
+
+        self.assertEqual(len(responses), len(calls))
+        for i, response in enumerate(responses):
+            if i % 4 == 1:
+                self.assertIsNone(response.data)
+                self.assertIsInstance(response.exc, CCAPINoMethodException)
+            else:
+                self.assertIsNone(response.exc)
+                self.assertEqual(response.data, json.loads(test_response))
+
+        self.assertEqual(m.call_count, 7)  # responses with saving id are saved
+
+    def test_call_many_parallel(self):
+        lock = threading.Lock()
+        in_flight = []
+        max_in_flight = []
+
+        def call(method, **kwargs):
+            with lock:
+                in_flight.append(method)
+                max_in_flight.append(len(in_flight))
+            time.sleep(0.02)
+            with lock:
+                in_flight.pop()
+            return kwargs['i']
+
+        with patch.object(self.api, 'call', side_effect=call):
+            responses = self.api.call_many([(method_name, {'i': i}) for i in range(12)], max_workers=4)
+
+        self.assertEqual(responses, list(range(12)))
+        self.assertEqual(max(max_in_flight), 4)
+
+    @requests_mock.Mocker()
+    def test_iter_call_many(self, m):
+        url = base_url.format(method=method_name)
+        m.register_uri('GET', url, text=test_response)
+
+        results = list(self.api.iter_call_many([method_name, 'karabas', method_name], max_workers=2))
+        self.assertEqual(sorted(i for i, _ in results), [0, 1, 2])
+        self.assertIsInstance(dict(results)[1].exc, CCAPINoMethodException)
+
+
+    def test_prepared_templates(self):
+        class ParamsRequest(TestRequest):
+            def __init__(self, pair=None, **kwargs):
+                super(ParamsRequest, self).__init__(**kwargs)
+                self.params.update(pair=pair)
+
+        first = ParamsRequest(pair='BTC_USDT').prepare()
+        first.headers['Connection'] = 'close'
+
+        with patch('requests.PreparedRequest.prepare') as prepare_mock:
+            second = ParamsRequest(pair='BTC_USDT').prepare()
+            prepare_mock.assert_not_called()
+
+        # template is not affected by modifications of prepared requests
+        self.assertEqual(second.url, 'http://example.com/get_info?pair=BTC_USDT')
+        self.assertEqual(second.headers['User-Agent'], DEFAULT_USER_AGENT)
+        self.assertNotIn('Connection', second.headers)
+
+        self.assertEqual(ParamsRequest(pair='ETH_BTC').prepare().url, 'http://example.com/get_info?pair=ETH_BTC')
+
+        # requests with hooks are prepared every time
+        def hook(response, **kwargs):
+            return response
+
+        with_hooks = ParamsRequest(pair='BTC_USDT')
+        with_hooks.register_hook('response', hook)
+        self.assertEqual(with_hooks.prepare().hooks['response'], [hook])
+        self.assertEqual(ParamsRequest(pair='BTC_USDT').prepare().hooks['response'], [])
+
+        # requests with body are prepared every time
+        with_body = TestRequest()
+        with_body.method = 'POST'
+        with_body.json = {'nonce': 1}
+        self.assertEqual(with_body.prepare().body, b'{"nonce":1}')
+        with_body.json = {'nonce': 2}
+        self.assertEqual(with_body.prepare().body, b'{"nonce":2}')
+
+    @patch('pycryptoclients.request.DEFAULT_MAX_TEMPLATES', 2)
+    @patch('pycryptoclients.request._templates', OrderedDict())
+    def test_templates_lru(self):
+        class ParamsRequest(TestRequest):
+            def __init__(self, pair=None, **kwargs):
+                super(ParamsRequest, self).__init__(**kwargs)
+                self.params.update(pair=pair)
+
+        ParamsRequest(pair='A').prepare()
+        ParamsRequest(pair='B').prepare()
+        ParamsRequest(pair='A').prepare()
+        ParamsRequest(pair='C').prepare()
+
+        # the least recently used template is evicted, others are kept
+        self.assertEqual([dict(key[2])['pair'] for key in request._templates], ['A', 'C'])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,53 @@
+import hashlib
+import hmac
+import json
+from unittest import TestCase
+from unittest.mock import patch
+
+from pycryptoclients.auth import HmacAuth
+from pycryptoclients.markets.stocks_exchange.request import GetAccountInfoRequest
+
+
+class TestHmacAuth(TestCase):
+
+    def setUp(self):
+        super(TestHmacAuth, self).setUp()
+        self.auth = HmacAuth(api_key=b'key', api_secret=b'secret')
+
+    def test_encode_body(self):
+        data = {'method': 'GetInfo'}
+        auth = HmacAuth(api_key=b'key', api_secret=b'secret', nonce_generator=lambda: 42)
+        body = auth.encode_body(data)
+
+        self.assertEqual(body, b'{"method":"GetInfo","nonce":42}')
+        self.assertNotIn('nonce', data)
+
+    def test_nonce_generator(self):
+        # requests with the same key share generator
+        self.assertIs(self.auth.nonce_generator, HmacAuth(api_key=b'key', api_secret=b'secret').nonce_generator)
+        self.assertIsNot(self.auth.nonce_generator, HmacAuth(api_key=b'other', api_secret=b'').nonce_generator)
+
+        nonces = [json.loads(self.auth.encode_body({}).decode())['nonce'] for _ in range(100)]
+        self.assertEqual(nonces, sorted(set(nonces)))
+
+    def test_sign(self):
+        body = b'{"method":"GetInfo","nonce":42}'
+        expected = hmac.new(b'secret', body, hashlib.sha512).hexdigest()
+        self.assertEqual(self.auth.sign(body), expected)
+        self.assertEqual(self.auth.sign(body), expected)  # keyed HMAC object is not consumed
+
+    def test_private_request(self):
+        req = GetAccountInfoRequest(auth=self.auth)
+
+        with patch('json.loads') as loads_mock:
+            prepared = req.prepare()
+            self.assertFalse(loads_mock.called)
+
+        self.assertIsInstance(prepared.body, bytes)
+        self.assertEqual(json.loads(prepared.body.decode())['method'], 'GetInfo')
+        self.assertEqual(prepared.headers['Key'], b'key')
+        self.assertEqual(prepared.headers['Sign'], hmac.new(b'secret', prepared.body, hashlib.sha512).hexdigest())
+
+        # request data is not changed by preparation, so every preparation gets new nonce
+        self.assertNotIn('nonce', req.json)
+        self.assertNotEqual(prepared.body, req.prepare().body)
@@ -0,0 +1,222 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+
+from pycryptoclients.cache import MemoryCacheBackend, SQLiteCacheBackend, RedisCacheBackend
+from pycryptoclients.response import CCAPIResponse
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+class CacheBackendTestMixin(object):
+
+    def make_backend(self, **kwargs):
+        raise NotImplementedError
+
+    def test_get_set(self):
+        cache = self.make_backend()
+        self.assertIsNone(cache.get('a'))
+
+        cache.set('a', {'data': CCAPIResponse([1, 2]), 'time': 10.0})
+        value = cache.get('a')
+        self.assertEqual(value['time'], 10.0)
+        self.assertEqual(value['data'].data, [1, 2])
+
+        cache.set('a', {'data': CCAPIResponse([3]), 'time': 11.0})
+        self.assertEqual(cache.get('a')['data'].data, [3])
+
+        cache.delete('a')
+        self.assertIsNone(cache.get('a'))
+
+    def test_clear(self):
+        cache = self.make_backend()
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.clear()
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+
+
+class TestMemoryCacheBackend(CacheBackendTestMixin, TestCase):
+
+    def make_backend(self, **kwargs):
+        return MemoryCacheBackend(**kwargs)
+
+    def test_lru(self):
+        cache = self.make_backend(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_max_bytes(self):
+        cache = self.make_backend(max_entries=None, max_bytes=250)
+        cache.set('a', 'x' * 100)
+        cache.set('b', 'x' * 100)
+        cache.set('c', 'x' * 100)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 2)
+
+        cache.set('d', 'x' * 1000)  # value larger than cache is not saved at all
+        self.assertIsNone(cache.get('d'))
+        self.assertEqual(len(cache), 2)
+
+    @patch('time.monotonic')
+    def test_ttl(self, time_mock):
+        cache = self.make_backend()
+        time_mock.return_value = 100.0
+        cache.set('a', 1, ttl=10.0)
+        cache.set('b', 2)
+
+        time_mock.return_value = 109.0
+        self.assertEqual(cache.get('a'), 1)
+
+        time_mock.return_value = 110.0
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 2)
+        self.assertEqual(len(cache), 1)
+
+
+class TestSQLiteCacheBackend(CacheBackendTestMixin, TestCase):
+
+    def setUp(self):
+        super(TestSQLiteCacheBackend, self).setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'cache.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+        super(TestSQLiteCacheBackend, self).tearDown()
+
+    def make_backend(self, **kwargs):
+        return SQLiteCacheBackend(self.path, **kwargs)
+
+    def test_shared(self):
+        self.make_backend().set('a', 1)
+        self.assertEqual(self.make_backend().get('a'), 1)
+
+    def test_max_entries(self):
+        cache = self.make_backend(max_entries=2)
+        with patch('time.time') as time_mock:
+            for i, key in enumerate('abc'):
+                time_mock.return_value = 100.0 + i
+                cache.set(key, i)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 1)
+        self.assertEqual(cache.get('c'), 2)
+
+    @patch('time.time')
+    def test_ttl(self, time_mock):
+        cache = self.make_backend()
+        time_mock.return_value = 100.0
+        cache.set('a', 1, ttl=10.0)
+
+        time_mock.return_value = 109.0
+        self.assertEqual(cache.get('a'), 1)
+
+        time_mock.return_value = 110.0
+        self.assertIsNone(cache.get('a'))
+
+    @patch('time.time')
+    def test_touch_interval(self, time_mock):
+        cache = self.make_backend(max_entries=2, touch_interval=10.0)
+        time_mock.return_value = 100.0
+        cache.set('a', 1)
+        time_mock.return_value = 101.0
+        cache.set('b', 2)
+
+        # reads within interval do not write time of use
+        time_mock.return_value = 105.0
+        cache.get('a')
+        time_mock.return_value = 106.0
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('a'))
+
+        time_mock.return_value = 112.0
+        cache.get('b')
+        time_mock.return_value = 113.0
+        cache.set('d', 4)
+        self.assertEqual(cache.get('b'), 2)
+        self.assertIsNone(cache.get('c'))
+
+    def test_close(self):
+        cache = self.make_backend()
+        cache.set('a', 1)
+        thread = threading.Thread(target=cache.get, args=('a',))
+        thread.start()
+        thread.join()
+        connections = list(cache._connections)
+        self.assertEqual(len(connections), 2)
+
+        cache.close()
+        self.assertEqual(cache._connections, [])
+
+        for conn in connections:
+            self.assertRaises(sqlite3.ProgrammingError, conn.execute, 'SELECT 1')
+
+        # backend connects again on demand
+        self.assertEqual(cache.get('a'), 1)
+
+
+@skipIf(fakeredis is None, 'fakeredis is not installed')
+class TestRedisCacheBackend(CacheBackendTestMixin, TestCase):
+
+    def setUp(self):
+        super(TestRedisCacheBackend, self).setUp()
+        # fake server behind real redis client, so values pass through Redis protocol
+        self.client = fakeredis.FakeRedis()
+        self.client.flushall()
+
+    def make_backend(self, **kwargs):
+        return RedisCacheBackend(client=self.client, **kwargs)
+
+    def test_prefix(self):
+        cache = self.make_backend(prefix='test:')
+        cache.set('a', 1, ttl=0.5)
+        self.client.set('other', b'2')
+        self.assertEqual(self.client.keys('test:*'), [b'test:a'])
+        self.assertTrue(400 < self.client.pttl('test:a') <= 500)
+
+        cache.clear()
+        self.assertIsNone(self.client.get('test:a'))
+        self.assertEqual(self.client.get('other'), b'2')
+
+    def test_ttl(self):
+        cache = self.make_backend()
+        cache.set('a', 1, ttl=0.05)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(self.client.ttl('pycryptoclients:b'), -1)
+
+        time.sleep(0.1)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 2)
+
+    def test_close(self):
+        with patch('redis.Redis.from_url', return_value=self.client):
+            cache = RedisCacheBackend(url='redis://localhost:6379/1')
+
+        cache.set('a', 1)
+
+        with patch.object(self.client.connection_pool, 'disconnect') as disconnect_mock:
+            self.make_backend().close()
+            self.assertFalse(disconnect_mock.called)
+
+            cache.close()
+            self.assertEqual(disconnect_mock.call_count, 1)
+
+        self.assertEqual(cache.get('a'), 1)
@@ -0,0 +1,216 @@
+import requests
+import requests_mock
+from unittest import TestCase
+from unittest.mock import patch
+
+from pycryptoclients.circuit import Circuit, CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+from pycryptoclients.exc import CCAPICircuitOpenException, CCAPIDataException
+from pycryptoclients.markets.stocks_exchange.api import StocksExchangeAPI
+from pycryptoclients.markets.stocks_exchange.request import STOCKS_EXCHANGE_BASE_URL, TickerRequest
+from pycryptoclients.retry import RetryPolicy
+from tests.test_markets import TICKER_RESPONSE, PRICES_RESPONSE, GENERIC_ERROR_RESPONSE
+
+
+TICKER_URL = STOCKS_EXCHANGE_BASE_URL.format(method='ticker')
+PRICES_URL = STOCKS_EXCHANGE_BASE_URL.format(method='prices')
+PRIVATE_URL = STOCKS_EXCHANGE_BASE_URL.format(method='')
+
+
+@patch('time.monotonic')
+class TestCircuit(TestCase):
+
+    def test_open(self, time_mock):
+        time_mock.return_value = 100.0
+        circuit = Circuit(failure_threshold=2, recovery_timeout=10.0)
+
+        circuit.record_failure()
+        circuit.record_success()
+        circuit.record_failure()
+        self.assertEqual(circuit.state, CLOSED)  # failures are not consecutive
+
+        circuit.record_failure()
+        self.assertEqual(circuit.state, OPEN)
+        self.assertEqual(circuit.acquire(), (False, False))
+
+        time_mock.return_value = 105.0
+        self.assertEqual(circuit.get_retry_after(), 5.0)
+
+    def test_half_open(self, time_mock):
+        time_mock.return_value = 100.0
+        circuit = Circuit(failure_threshold=1, recovery_timeout=10.0, success_threshold=2)
+        circuit.record_failure()
+
+        # only one probe at once
+        time_mock.return_value = 110.0
+        self.assertEqual(circuit.state, HALF_OPEN)
+        self.assertEqual(circuit.acquire(), (True, True))
+        self.assertEqual(circuit.acquire(), (False, False))
+
+        circuit.record_success(probe=True)
+        self.assertEqual(circuit.state, HALF_OPEN)
+        self.assertEqual(circuit.acquire(), (True, True))
+
+        # interrupted probe frees its slot
+        circuit.release(probe=True)
+        self.assertEqual(circuit.acquire(), (True, True))
+        circuit.record_success(probe=True)
+        self.assertEqual(circuit.state, CLOSED)
+        self.assertEqual(circuit.acquire(), (True, False))
+
+    def test_failed_probe(self, time_mock):
+        time_mock.return_value = 100.0
+        circuit = Circuit(failure_threshold=1, recovery_timeout=10.0)
+        circuit.record_failure()
+
+        time_mock.return_value = 110.0
+        _, probe = circuit.acquire()
+
+        # late failure of request sent while circuit was closed does not affect probing
+        circuit.record_failure()
+        self.assertEqual(circuit.state, HALF_OPEN)
+
+        circuit.record_failure(probe)
+        self.assertEqual(circuit.state, OPEN)
+        self.assertEqual(circuit.get_retry_after(), 10.0)
+
+
+class TestCircuitBreaker(TestCase):
+
+    def setUp(self):
+        super(TestCircuitBreaker, self).setUp()
+        self.breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60.0)
+
+    def test_is_failure(self):
+        response = requests.Response()
+        response.status_code = 503
+        self.assertTrue(self.breaker.is_failure(requests.exceptions.HTTPError(response=response)))
+        self.assertTrue(self.breaker.is_failure(requests.exceptions.ConnectTimeout()))
+
+        response.status_code = 404
+        self.assertFalse(self.breaker.is_failure(requests.exceptions.HTTPError(response=response)))
+        self.assertFalse(self.breaker.is_failure(CCAPIDataException(msg='Invalid request')))
+
+    def test_get_key(self):
+        self.assertEqual(self.breaker.get_key(TickerRequest()), ('app.stocks.exchange', 'ticker'))
+        self.assertEqual(CircuitBreaker(per_method=False).get_key(TickerRequest()), ('app.stocks.exchange',))
+
+    @requests_mock.Mocker()
+    def test_fail_fast(self, m):
+        m.register_uri('GET', TICKER_URL, exc=requests.exceptions.ConnectTimeout)
+        m.register_uri('GET', PRICES_URL, text=PRICES_RESPONSE)
+
+        with StocksExchangeAPI(circuit_breaker=self.breaker) as api:
+            for _ in range(2):
+                self.assertRaises(requests.exceptions.ConnectTimeout, api.call, 'ticker')
+
+            with self.assertRaises(CCAPICircuitOpenException) as cm:
+                api.call('ticker')
+
+            self.assertEqual(m.call_count, 2)
+            self.assertEqual(cm.exception.endpoint, 'app.stocks.exchange/ticker')
+            self.assertGreater(cm.exception.retry_after, 0.0)
+
+            # other endpoints are not affected
+            self.assertTrue(api.call('prices').data)
+
+    @requests_mock.Mocker()
+    def test_retries(self, m):
+        m.register_uri('GET', TICKER_URL, status_code=503)
+        api = StocksExchangeAPI(circuit_breaker=self.breaker,
+                                retry_policy=RetryPolicy(max_attempts=5, backoff_base=0.0, jitter=False))
+
+        # retries stop as soon as circuit is opened
+        self.assertRaises(CCAPICircuitOpenException, api.call, 'ticker')
+        self.assertEqual(m.call_count, 2)
+        api.close()
+
+    @patch('time.monotonic')
+    @requests_mock.Mocker()
+    def test_recovery(self, time_mock, m):
+        time_mock.return_value = 100.0
+        m.register_uri('GET', TICKER_URL, [{'status_code': 502}, {'status_code': 502}, {'text': TICKER_RESPONSE}])
+
+        with StocksExchangeAPI(circuit_breaker=self.breaker) as api:
+            for _ in range(2):
+                self.assertRaises(requests.exceptions.HTTPError, api.call, 'ticker')
+
+            self.assertRaises(CCAPICircuitOpenException, api.call, 'ticker')
+
+            time_mock.return_value = 160.0
+            self.assertTrue(api.call('ticker').data)
+            self.assertEqual(self.breaker.get_circuit(TickerRequest()).state, CLOSED)
+            self.assertEqual(m.call_count, 3)
+
+
+class TestErrorSaving(TestCase):
+
+    @requests_mock.Mocker()
+    def test_save_errors(self, m):
+        m.register_uri('POST', PRIVATE_URL, text=GENERIC_ERROR_RESPONSE)
+
+        with StocksExchangeAPI(api_key='key', api_secret='secret', error_saving_time=60.0) as api:
+            self.assertRaises(CCAPIDataException, api.call, 'get_account_info')
+
+            with self.assertRaises(CCAPIDataException) as cm:
+                api.call('get_account_info')
+
+            self.assertEqual(cm.exception.msg, 'Invalid request')
+            self.assertEqual(m.call_count, 1)
+
+            # errors of requests which are not idempotent are never saved
+            for _ in range(2):
+                self.assertRaises(CCAPIDataException, api.call, 'trade', _type='BUY', currency1='BTC',
+                                  currency2='USDT', amount=1, rate=1)
+
+            self.assertEqual(m.call_count, 3)
+
+    @requests_mock.Mocker()
+    def test_accounts(self, m):
+        m.register_uri('POST', PRIVATE_URL, text=GENERIC_ERROR_RESPONSE)
+        m.register_uri('GET', TICKER_URL, status_code=500)
+
+        with StocksExchangeAPI(api_key='key1', api_secret='secret', error_saving_time=60.0) as first, \
+                StocksExchangeAPI(api_key='key2', api_secret='secret', error_saving_time=60.0) as second:
+            # errors are kept apart for every account even in the same store
+            second._errors = first._errors
+
+            self.assertRaises(CCAPIDataException, first.call, 'get_account_info')
+            self.assertRaises(CCAPIDataException, second.call, 'get_account_info')
+            self.assertRaises(CCAPIDataException, first.call, 'get_account_info')
+            self.assertEqual(m.call_count, 2)
+
+            # errors of public requests do not depend on account
+            self.assertRaises(requests.exceptions.HTTPError, first.call, 'ticker')
+            self.assertRaises(requests.exceptions.HTTPError, second.call, 'ticker')
+            self.assertEqual(m.call_count, 3)
+
+    @requests_mock.Mocker()
+    def test_save_http_errors(self, m):
+        m.register_uri('GET', TICKER_URL, status_code=500)
+
+        with StocksExchangeAPI(error_saving_time=60.0) as api:
+            self.assertRaises(requests.exceptions.HTTPError, api.call, 'ticker')
+            self.assertRaises(requests.exceptions.HTTPError, api.call, 'ticker')
+            self.assertEqual(m.call_count, 1)
+
+        with StocksExchangeAPI() as api:
+            self.assertRaises(requests.exceptions.HTTPError, api.call, 'ticker')
+            self.assertEqual(m.call_count, 2)
+
+    @patch('time.monotonic')
+    @requests_mock.Mocker()
+    def test_expiration(self, time_mock, m):
+        time_mock.return_value = 100.0
+        m.register_uri('GET', TICKER_URL, [{'exc': requests.exceptions.ConnectionError}, {'status_code': 500},
+                                           {'text': TICKER_RESPONSE}])
+
+        with StocksExchangeAPI(error_saving_time=5.0) as api:
+            # connection errors are not saved by default
+            self.assertRaises(requests.exceptions.ConnectionError, api.call, 'ticker')
+            self.assertRaises(requests.exceptions.HTTPError, api.call, 'ticker')
+            self.assertRaises(requests.exceptions.HTTPError, api.call, 'ticker')
+            self.assertEqual(m.call_count, 2)
+
+            time_mock.return_value = 106.0
+            self.assertTrue(api.call('ticker').data)
+            self.assertEqual(m.call_count, 3)
@@ -0,0 +1,105 @@
+import json
+import requests_mock
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+
+from pycryptoclients import codec
+from pycryptoclients.codec import JSONCodec, OrjsonCodec, UjsonCodec, get_default_codec
+from pycryptoclients.markets.stocks_exchange.api import StocksExchangeAPI
+
+
+DATA = {'success': 1, 'data': [{'price': '0.1', 'amount': 2}], 'name': 'привет'}
+
+
+class TestJSONCodec(TestCase):
+
+    def _test_codec(self, _codec):
+        encoded = _codec.dumps(DATA)
+        self.assertIsInstance(encoded, bytes)
+        self.assertNotIn(b' ', encoded)
+        self.assertEqual(json.loads(encoded.decode('utf-8')), DATA)
+        self.assertEqual(_codec.loads(encoded), DATA)
+        self.assertEqual(_codec.loads(encoded.decode('utf-8')), DATA)
+
+        with self.assertRaises(ValueError):
+            _codec.loads(b'{"success": ')
+
+    def test_json(self):
+        self._test_codec(JSONCodec())
+
+    @skipIf(codec.orjson is None, 'orjson is not installed')
+    def test_orjson(self):
+        self._test_codec(OrjsonCodec())
+
+    @skipIf(codec.ujson is None, 'ujson is not installed')
+    def test_ujson(self):
+        self._test_codec(UjsonCodec())
+
+    @patch.object(codec, 'ujson', None)
+    @patch.object(codec, 'orjson', None)
+    def test_missing_library(self):
+        with self.assertRaises(ImportError):
+            OrjsonCodec()
+
+        with self.assertRaises(ImportError):
+            UjsonCodec()
+
+    def test_default_codec(self):
+        # faster libraries are used only when they are selected explicitly
+        with patch.object(codec, 'orjson', object()), patch.object(codec, 'ujson', object()):
+            default_codec = get_default_codec()
+
+        self.assertIs(type(default_codec), JSONCodec)
+        self.assertIs(get_default_codec(), default_codec)
+
+
+class TestClientCodec(TestCase):
+
+    class CountingCodec(JSONCodec):
+
+        def __init__(self):
+            super(TestClientCodec.CountingCodec, self).__init__()
+            self.dumps_count = 0
+            self.loads_count = 0
+
+        def dumps(self, obj) -> bytes:
+            self.dumps_count += 1
+            return super(TestClientCodec.CountingCodec, self).dumps(obj)
+
+        def loads(self, data):
+            self.loads_count += 1
+            return super(TestClientCodec.CountingCodec, self).loads(data)
+
+    def test_client_codec(self):
+        _codec = self.CountingCodec()
+        api = StocksExchangeAPI(api_key='key', api_secret='secret', codec=_codec)
+
+        with requests_mock.mock() as m:
+            m.register_uri('POST', 'https://app.stocks.exchange/api2/', text='{"success": 1, "data": {}}')
+            resp = api.call('get_account_info')
+
+        self.assertEqual(resp.data, {'success': 1, 'data': {}})
+        self.assertEqual(_codec.dumps_count, 1)
+        self.assertEqual(_codec.loads_count, 1)
+        self.assertEqual(json.loads(m.request_history[0].body.decode('utf-8'))['method'], 'GetInfo')
+
+    def test_wide_integers(self):
+        api = StocksExchangeAPI()
+
+        with requests_mock.mock() as m:
+            m.register_uri('GET', 'https://app.stocks.exchange/api2/ticker', text='[{"id": 123456789012345678901234}]')
+            resp = api.call('ticker')
+
+        self.assertEqual(resp.data, [{'id': 123456789012345678901234}])
+
+    def test_response_encoding(self):
+        api = StocksExchangeAPI()
+        body = json.dumps([{'name': 'привет'}], ensure_ascii=False)
+
+        with requests_mock.mock() as m:
+            m.register_uri('GET', 'https://app.stocks.exchange/api2/ticker', content=body.encode('cp1251'),
+                           headers={'Content-Type': 'application/json; charset=windows-1251'})
+
+            resp = api.call('ticker')
+
+        self.assertEqual(resp.data, [{'name': 'привет'}])
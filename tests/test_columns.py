@@ -0,0 +1,59 @@
+import array
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+
+from pycryptoclients import columns
+from pycryptoclients.columns import INT64, FLOAT64, make_columns, to_float, to_scaled_int, to_timestamp
+
+
+ITEMS = [
+    {'timestamp': 1523479914, 'price': '0.00003251'},
+    {'timestamp': 1523469243, 'price': '0.00003250', 'extra': True}
+]
+
+
+class TestColumns(TestCase):
+
+    def setUp(self):
+        self.columns = (
+            ('timestamp', 'timestamp', INT64, int),
+            ('price', 'price', FLOAT64, to_float),
+            ('price_units', 'price', INT64, to_scaled_int(10 ** 8))
+        )
+
+    def test_converters(self):
+        self.assertEqual(to_scaled_int(10 ** 8)('0.00003251'), 3251)
+        self.assertEqual(to_scaled_int(100)(0.29), 29)
+        self.assertEqual(to_timestamp('2018-04-11 17:30:00'), 1523467800)
+        self.assertEqual(to_timestamp('1523467800'), 1523467800)
+
+    def test_array_columns(self):
+        data = make_columns(ITEMS, self.columns, use_numpy=False)
+
+        self.assertEqual(data['timestamp'], array.array(INT64, [1523479914, 1523469243]))
+        self.assertEqual(data['price'], array.array(FLOAT64, [0.00003251, 0.00003250]))
+        self.assertEqual(list(data['price_units']), [3251, 3250])
+
+        # items are consumed lazily
+        data = make_columns((dict(item) for item in ITEMS), self.columns, use_numpy=False)
+        self.assertEqual(list(data['price_units']), [3251, 3250])
+
+    @skipIf(columns.numpy is None, 'numpy is not installed')
+    def test_numpy_columns(self):
+        data = make_columns(ITEMS, self.columns)
+
+        self.assertEqual(data['timestamp'].dtype, columns.numpy.int64)
+        self.assertEqual(data['price'].dtype, columns.numpy.float64)
+        self.assertEqual(data['timestamp'].tolist(), [1523479914, 1523469243])
+        self.assertEqual(data['price_units'].tolist(), [3251, 3250])
+
+        empty = make_columns([], self.columns)
+        self.assertEqual(len(empty['price']), 0)
+        self.assertEqual(empty['price'].dtype, columns.numpy.float64)
+
+    @patch.object(columns, 'numpy', None)
+    def test_numpy_missing(self):
+        self.assertIsInstance(make_columns(ITEMS, self.columns)['price'], array.array)
+
+        with self.assertRaises(ImportError):
+            make_columns(ITEMS, self.columns, use_numpy=True)
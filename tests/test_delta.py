@@ -0,0 +1,102 @@
+import json
+import queue
+import requests_mock
+from unittest import TestCase
+from unittest.mock import patch
+
+from pycryptoclients.delta import Delta, DeltaTracker
+from pycryptoclients.markets.stocks_exchange.api import StocksExchangeAPI
+from pycryptoclients.markets.stocks_exchange.request import STOCKS_EXCHANGE_BASE_URL
+from pycryptoclients.poller import Poller
+from tests.test_markets import PRICES_RESPONSE
+
+
+class TestDeltaTracker(TestCase):
+
+    def test_update(self):
+        tracker = DeltaTracker()
+        prices = json.loads(PRICES_RESPONSE)
+
+        delta = tracker.update(prices)
+        self.assertEqual(len(delta.added), 3)
+        self.assertFalse(delta.changed or delta.removed)
+
+        changed = dict(prices[1], buy='6402')
+        delta = tracker.update([prices[0], changed, {'market_name': 'ETH_BTC', 'buy': '0.07'}])
+        self.assertEqual(delta.added, [{'market_name': 'ETH_BTC', 'buy': '0.07'}])
+        self.assertEqual(delta.changed, [changed])
+        self.assertEqual(delta.removed, [prices[2]])
+        self.assertEqual(len(delta), 3)
+
+        self.assertFalse(tracker.update([prices[0], changed, {'market_name': 'ETH_BTC', 'buy': '0.07'}]))
+        self.assertEqual(len(tracker.snapshot().added), 3)
+
+    def test_raw_body_fast_path(self):
+        tracker = DeltaTracker(key=lambda record: record['market_name'])
+        content = PRICES_RESPONSE.encode('utf-8')
+
+        self.assertEqual(len(tracker.update(json.loads(PRICES_RESPONSE), content)), 3)
+        self.assertTrue(tracker.is_unchanged(content))
+
+        # records are not even looked at when body is the same
+        self.assertFalse(tracker.update(None, content))
+
+        with self.assertRaises(TypeError):
+            tracker.update({'success': 1}, b'{"success": 1}')
+
+    def test_typed_records(self):
+        api = StocksExchangeAPI(typed_records=True)
+        tracker = DeltaTracker()
+
+        with requests_mock.mock() as m:
+            m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='prices'), text=PRICES_RESPONSE)
+            delta = api.call_delta('prices', tracker).data
+
+        self.assertEqual([price.market_name for price in delta.added], ['PRG_BTC', 'BTC_USDT', 'ARDOR_BTC'])
+
+
+class TestCallDelta(TestCase):
+
+    @requests_mock.Mocker()
+    def test_call_delta(self, m):
+        api = StocksExchangeAPI(save_responses=True)
+        tracker = DeltaTracker()
+        prices = json.loads(PRICES_RESPONSE)
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='prices'),
+                       [{'text': PRICES_RESPONSE}, {'text': PRICES_RESPONSE},
+                        {'text': json.dumps(prices[:2] + [dict(prices[2], sell='1')])}])
+
+        self.assertEqual(len(api.call_delta('prices', tracker).data.added), 3)
+
+        with patch.object(api._codec, 'loads') as loads_mock:
+            delta = api.call_delta('prices', tracker, saving_time=60).data
+
+        self.assertIsInstance(delta, Delta)
+        self.assertFalse(delta)
+        loads_mock.assert_not_called()
+
+        delta = api.call_delta('prices', tracker).data
+        self.assertEqual([price['market_name'] for price in delta.changed], ['ARDOR_BTC'])
+
+        # responses of delta calls are never saved
+        self.assertEqual(m.call_count, 3)
+
+
+class TestPollerDeltas(TestCase):
+
+    @requests_mock.Mocker()
+    def test_poller_deltas(self, m):
+        prices = json.loads(PRICES_RESPONSE)
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='prices'),
+                       [{'text': PRICES_RESPONSE}, {'text': PRICES_RESPONSE},
+                        {'text': json.dumps(prices[:2])}])
+        received = queue.Queue()
+
+        with Poller(StocksExchangeAPI(), stagger=False) as poller:
+            poller.subscribe('prices', interval=0.01, queue=received, delta_key='market_name')
+            _, first = received.get(timeout=1)
+            _, second = received.get(timeout=1)
+
+        self.assertEqual(len(first.data.added), 3)
+        self.assertEqual(second.data.removed, [prices[2]])
+        self.assertFalse(second.data.added or second.data.changed)
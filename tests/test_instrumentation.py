@@ -0,0 +1,180 @@
+import io
+import logging
+import requests
+import requests_mock
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from pycryptoclients.exc import CCAPIDataException
+from pycryptoclients.instrumentation import CallbackInstrument, LoggingInstrument, MetricsRegistry, \
+    OpenTelemetryInstrument, CallTimings, CACHE_HIT, CACHE_MISS
+from pycryptoclients.markets.stocks_exchange.api import StocksExchangeAPI
+from pycryptoclients.markets.stocks_exchange.request import STOCKS_EXCHANGE_BASE_URL
+from pycryptoclients.retry import RetryPolicy
+from tests.test_markets import TICKER_RESPONSE, GENERIC_ERROR_RESPONSE, TRADE_HISTORY_RESPONSE
+
+
+TICKER_URL = STOCKS_EXCHANGE_BASE_URL.format(method='ticker')
+PRIVATE_URL = STOCKS_EXCHANGE_BASE_URL.format(method='')
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        super(TestInstrumentation, self).setUp()
+        self.timings = []
+        self.api = StocksExchangeAPI(api_key='key', api_secret='secret',
+                                     instruments=[CallbackInstrument(self.timings.append)])
+
+    def tearDown(self):
+        self.api.close()
+        super(TestInstrumentation, self).tearDown()
+
+    @requests_mock.Mocker()
+    def test_public_call(self, m):
+        m.register_uri('GET', TICKER_URL, text=TICKER_RESPONSE)
+        self.api.call('ticker', saving_time=0)
+
+        timings, = self.timings
+        self.assertEqual(timings.method, 'ticker')
+        self.assertIsNone(timings.cache)
+        self.assertEqual(timings.attempts, 1)
+        self.assertEqual(timings.retries, 0)
+        self.assertEqual(timings.status_code, 200)
+        self.assertEqual(timings.sign, 0.0)
+        self.assertTrue(timings.ok)
+        self.assertGreater(timings.parse, 0.0)
+        self.assertGreaterEqual(timings.duration, timings.build + timings.prepare + timings.parse)
+
+    @requests_mock.Mocker()
+    def test_cache(self, m):
+        m.register_uri('GET', TICKER_URL, text=TICKER_RESPONSE)
+        self.api.call('ticker', saving_id='test')
+        self.api.call('ticker', saving_id='test')
+
+        self.assertEqual(m.call_count, 1)
+        self.assertEqual([t.cache for t in self.timings], [CACHE_MISS, CACHE_HIT])
+        self.assertEqual(self.timings[1].attempts, 0)
+        self.assertEqual(self.timings[1].parse, 0.0)
+
+    @requests_mock.Mocker()
+    def test_private_call(self, m):
+        m.register_uri('POST', PRIVATE_URL, text=GENERIC_ERROR_RESPONSE)
+
+        with self.assertRaises(CCAPIDataException) as cm:
+            self.api.call('get_account_info')
+
+        timings, = self.timings
+        self.assertEqual(timings.method, 'GetInfo')
+        self.assertGreater(timings.sign, 0.0)
+        self.assertGreaterEqual(timings.prepare, timings.sign)
+        self.assertIs(timings.exc, cm.exception)
+        self.assertFalse(timings.ok)
+
+    @requests_mock.Mocker()
+    def test_stream(self, m):
+        class SlowBody(io.BytesIO):
+            def read(self, *args, **kwargs):
+                time.sleep(0.005)
+                return super(SlowBody, self).read(*args, **kwargs)
+
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='trades?pair=BTC_NXT'),
+                       body=SlowBody(TRADE_HISTORY_RESPONSE.encode('utf-8')))
+        items = list(self.api.call_stream('trade_history', currency1='BTC', currency2='NXT', chunk_size=64))
+
+        # body is downloaded while items are consumed, after headers are received
+        timings, = self.timings
+        self.assertEqual(len(items), 3)
+        self.assertGreaterEqual(timings.download, 0.005 * (len(TRADE_HISTORY_RESPONSE) // 64))
+        self.assertGreaterEqual(timings.duration, timings.download)
+
+    @requests_mock.Mocker()
+    def test_retries(self, m):
+        m.register_uri('GET', TICKER_URL, [{'status_code': 503}, {'text': TICKER_RESPONSE}])
+        api = StocksExchangeAPI(retry_policy=RetryPolicy(backoff_base=0.001, jitter=False),
+                                instruments=[CallbackInstrument(self.timings.append)])
+        api.call('ticker', saving_time=0)
+        api.close()
+
+        timings, = self.timings
+        self.assertEqual(timings.attempts, 2)
+        self.assertEqual(timings.retries, 1)
+        self.assertEqual(timings.retry_wait, 0.001)
+
+    @requests_mock.Mocker()
+    def test_failing_instrument(self, m):
+        m.register_uri('GET', TICKER_URL, text=TICKER_RESPONSE)
+        self.api.add_instrument(CallbackInstrument(MagicMock(side_effect=ValueError)))
+
+        with self.assertLogs('pycryptoclients.instrumentation', level=logging.ERROR):
+            self.assertTrue(self.api.call('ticker', saving_time=0).data)
+
+    @requests_mock.Mocker()
+    def test_disabled(self, m):
+        m.register_uri('GET', TICKER_URL, text=TICKER_RESPONSE)
+        instrument = self.api._instruments[0]
+        self.api.remove_instrument(instrument)
+        self.api.call('ticker', saving_time=0)
+        self.assertEqual(self.timings, [])
+
+
+class TestInstruments(unittest.TestCase):
+
+    def make_timings(self, method: str='ticker', exc: Exception=None, **phases) -> CallTimings:
+        timings = CallTimings(method)
+        timings.cache = CACHE_MISS
+
+        for phase, value in phases.items():
+            setattr(timings, phase, value)
+
+        timings.complete(exc)
+        timings.duration = 0.02
+        return timings
+
+    def test_metrics_registry(self):
+        registry = MetricsRegistry(buckets=(0.01, 0.1))
+        registry.on_call(self.make_timings(server=0.005))
+        registry.on_call(self.make_timings(exc=requests.exceptions.ConnectionError(), retries=2))
+
+        self.assertEqual(registry.calls, {('ticker', CACHE_MISS, 'ok'): 1, ('ticker', CACHE_MISS, 'error'): 1})
+        self.assertEqual(registry.retries, {'ticker': 2})
+
+        lines = registry.render().splitlines()
+        self.assertIn('pycryptoclients_calls_total{cache="miss",method="ticker",status="ok"} 1', lines)
+        self.assertIn('pycryptoclients_retries_total{method="ticker"} 2', lines)
+        self.assertIn('pycryptoclients_call_seconds_bucket{le="0.01",method="ticker",phase="server"} 1', lines)
+        self.assertIn('pycryptoclients_call_seconds_bucket{le="0.01",method="ticker",phase="total"} 0', lines)
+        self.assertIn('pycryptoclients_call_seconds_bucket{le="0.1",method="ticker",phase="total"} 2', lines)
+        self.assertIn('pycryptoclients_call_seconds_bucket{le="+Inf",method="ticker",phase="total"} 2', lines)
+        self.assertIn('pycryptoclients_call_seconds_count{method="ticker",phase="total"} 2', lines)
+        self.assertFalse(any('phase="parse"' in line for line in lines))
+
+        registry.clear()
+        self.assertEqual(registry.calls, {})
+
+    def test_logging(self):
+        with self.assertLogs('pycryptoclients.instrumentation', level=logging.DEBUG) as cm:
+            LoggingInstrument().on_call(self.make_timings(server=0.005))
+            LoggingInstrument().on_call(self.make_timings(exc=ValueError('boom')))
+
+        self.assertTrue(cm.records[0].getMessage().startswith('ticker 20.0ms cache=miss'))
+        self.assertIn('server=5.0ms', cm.records[0].getMessage())
+        self.assertEqual(cm.records[1].levelno, logging.WARNING)
+        self.assertIn("error=ValueError('boom')", cm.records[1].getMessage())
+
+    def test_opentelemetry(self):
+        tracer = MagicMock()
+        exc = ValueError('boom')
+        timings = self.make_timings(exc=exc, parse=0.001)
+        OpenTelemetryInstrument(tracer=tracer).on_call(timings)
+
+        args, kwargs = tracer.start_span.call_args
+        self.assertEqual(args, ('ticker',))
+        self.assertEqual(kwargs['start_time'], int(timings.started * 1e9))
+        self.assertEqual(kwargs['attributes']['pycryptoclients.parse_seconds'], 0.001)
+        self.assertEqual(kwargs['attributes']['pycryptoclients.cache'], CACHE_MISS)
+
+        span = tracer.start_span.return_value
+        span.record_exception.assert_called_once_with(exc)
+        span.end.assert_called_once_with(end_time=int(timings.started * 1e9) + int(0.02 * 1e9))
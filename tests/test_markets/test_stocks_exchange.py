@@ -1,8 +1,22 @@
+import json
+import pickle
+import requests
 import requests_mock
+from decimal import Decimal
+from unittest.mock import patch
 
+from pycryptoclients.api import APIMethod
+from pycryptoclients.cache import MemoryCacheBackend
+from pycryptoclients.exc import CCAPIDataException, CCAPINoMethodException, CCAPIResponseParsingException
 from pycryptoclients.request import DEFAULT_USER_AGENT
 from pycryptoclients.markets.stocks_exchange.api import StocksExchangeAPI
+from pycryptoclients.markets.stocks_exchange.models import Ticker, Trade, Orderbook, OrderbookEntry
 from pycryptoclients.markets.stocks_exchange.request import STOCKS_EXCHANGE_BASE_URL
+from pycryptoclients.markets.stocks_exchange.request import GraficPrivateRequest, TradeHistoryRequest
+from pycryptoclients.markets.stocks_exchange.response import StocksExchangeResponseParser, GraficColumnsParser, \
+    TickerParser, TradeHistoryColumnsParser
+from pycryptoclients.ratelimit import RateLimiter, TokenBucket
+from pycryptoclients.retry import RetryPolicy
 from tests import CCAPITestCase
 from tests.test_markets import *
 
@@ -151,6 +165,109 @@ class TestStocksExchangeAPI(CCAPITestCase):
         with self.assertRaises(TypeError):
             self.api.call(method_name)  # currency1 and currency2 are required arguments for request
 
+    @requests_mock.Mocker()
+    def test_call_stream(self, m):
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='prices'), text=PRICES_RESPONSE)
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='trades?pair=BTC_NXT'),
+                       text=TRADE_HISTORY_RESPONSE)
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='trades?pair=BTC_ABC'),
+                       text=GENERIC_ERROR_RESPONSE)
+
+        items = self.api.call_stream('prices', chunk_size=16)
+        self.assertEqual(m.call_count, 0)  # request is sent when iteration starts
+        self.assertEqual(list(items), json.loads(PRICES_RESPONSE))
+
+        items = list(self.api.call_stream('trade_history', currency1='BTC', currency2='NXT', chunk_size=16))
+        self.assertEqual(items, json.loads(TRADE_HISTORY_RESPONSE)['result'])
+
+        with self.assertRaises(CCAPIDataException):
+            list(self.api.call_stream('trade_history', currency1='BTC', currency2='ABC'))
+
+        with self.assertRaises(CCAPINoMethodException):
+            self.api.call_stream('karabas')
+
+    @requests_mock.Mocker()
+    def test_saving_by_request_params(self, m):
+        url = STOCKS_EXCHANGE_BASE_URL.format(method='market_summary')
+        m.register_uri('GET', url + '/BTC/USDT', text=MARKET_SUMMARY_RESPONSE)
+        m.register_uri('GET', url + '/ETH/BTC', text=MARKET_SUMMARY_RESPONSE)
+
+        saving_id = 'summary'
+        self.api.call('market_summary', saving_id=saving_id, currency1='BTC', currency2='USDT')
+        self.api.call('market_summary', saving_id=saving_id, currency1='ETH', currency2='BTC')
+        self.assertEqual(m.call_count, 2)
+
+        self.api.call('market_summary', saving_id=saving_id, currency1='BTC', currency2='USDT')
+        self.api.call('market_summary', saving_id=saving_id, currency1='ETH', currency2='BTC')
+        self.assertEqual(m.call_count, 2)
+        self.assertEqual([r.url for r in m.request_history], [url + '/BTC/USDT', url + '/ETH/BTC'])
+
+    @requests_mock.Mocker()
+    def test_save_responses(self, m):
+        api = StocksExchangeAPI(api_secret=self.shared_secret, api_key=self.api_key, save_responses=True)
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='ticker'), text=TICKER_RESPONSE)
+        m.register_uri('POST', STOCKS_EXCHANGE_BASE_URL.format(method=''), text=GET_ACCOUNT_INFO_RESPONSE)
+
+        api.call('ticker')
+        api.call('ticker')
+        self.assertEqual(m.call_count, 1)
+
+        # private requests are not saved without explicit saving_id
+        api.call('get_account_info')
+        api.call('get_account_info')
+        self.assertEqual(m.call_count, 3)
+
+        api.call('get_account_info', saving_id='info')
+        api.call('get_account_info', saving_id='info')
+        self.assertEqual(m.call_count, 4)
+
+    @requests_mock.Mocker()
+    def test_shared_cache_accounts(self, m):
+        cache = MemoryCacheBackend()
+        api_a = StocksExchangeAPI(api_secret=self.shared_secret, api_key='key_a', cache=cache)
+        api_b = StocksExchangeAPI(api_secret=self.shared_secret, api_key='key_b', cache=cache)
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='ticker'), text=TICKER_RESPONSE)
+        m.register_uri('POST', STOCKS_EXCHANGE_BASE_URL.format(method=''),
+                       [{'text': GET_ACCOUNT_INFO_RESPONSE}, {'text': json.dumps({'success': 1, 'data': {}})}])
+
+        # saved private responses of one account are never returned to client of another one
+        data_a = api_a.call('get_account_info', saving_id='info').data
+        data_b = api_b.call('get_account_info', saving_id='info').data
+        self.assertEqual(m.call_count, 2)
+        self.assertNotEqual(data_a, data_b)
+        self.assertEqual(api_a.call('get_account_info', saving_id='info').data, data_a)
+        self.assertEqual(m.call_count, 2)
+
+        # public responses are shared
+        api_a.call('ticker', saving_id='ticker')
+        api_b.call('ticker', saving_id='ticker')
+        self.assertEqual(m.call_count, 3)
+
+    @patch('time.sleep')
+    @requests_mock.Mocker()
+    def test_rate_limit(self, sleep_mock, m):
+        limiter = RateLimiter(public=TokenBucket(rate=1.0), private=TokenBucket(rate=0.5))
+        api = StocksExchangeAPI(api_secret=self.shared_secret, api_key=self.api_key, rate_limiter=limiter)
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='ticker'), text=TICKER_RESPONSE)
+        m.register_uri('POST', STOCKS_EXCHANGE_BASE_URL.format(method=''), text=GET_ACCOUNT_INFO_RESPONSE)
+
+        api.call('ticker')
+        api.call('get_account_info')
+        self.assertFalse(sleep_mock.called)
+
+        api.call('ticker')
+        self.assertEqual(sleep_mock.call_count, 1)
+
+        # saved responses are not limited
+        api.call('ticker', saving_id='ticker')
+        api.call('ticker', saving_id='ticker')
+        self.assertEqual(sleep_mock.call_count, 2)
+
+        api.call('get_account_info')
+        self.assertEqual(sleep_mock.call_count, 3)
+        self.assertGreater(sleep_mock.call_args[0][0], 1.9)
+        self.assertEqual(m.call_count, 5)
+
     ######################################################
     # Test private API methods
     ######################################################
@@ -177,6 +294,49 @@ class TestStocksExchangeAPI(CCAPITestCase):
     def test_get_account_info(self, m):
         self.assertPrivateMethod('get_account_info', response_data=GET_ACCOUNT_INFO_RESPONSE, m=m)
 
+    @patch('time.sleep')
+    @requests_mock.Mocker()
+    def test_retry(self, sleep_mock, m):
+        api = StocksExchangeAPI(api_secret=self.shared_secret, api_key=self.api_key,
+                                retry_policy=RetryPolicy(max_attempts=3, jitter=False))
+        m.register_uri('POST', STOCKS_EXCHANGE_BASE_URL.format(method=''), [
+            {'status_code': 503, 'text': 'Service Unavailable'},
+            {'status_code': 429, 'text': 'Too Many Requests', 'headers': {'Retry-After': '3'}},
+            {'text': GET_ACCOUNT_INFO_RESPONSE}
+        ])
+
+        data = api.call('get_account_info').data
+        self.assertEqual(data['success'], 1)
+        self.assertEqual(m.call_count, 3)
+        self.assertEqual([c[0][0] for c in sleep_mock.call_args_list], [0.5, 3.0])
+
+        # every attempt is signed with new nonce
+        nonces = [r.json()['nonce'] for r in m.request_history]
+        self.assertEqual(len(set(nonces)), 3)
+        for i in range(3):
+            self.assertAuth(m, index=i)
+
+    @patch('time.sleep')
+    @requests_mock.Mocker()
+    def test_retry_exhausted(self, sleep_mock, m):
+        api = StocksExchangeAPI(retry_policy=RetryPolicy(max_attempts=2))
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='ticker'), status_code=502)
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            api.call('ticker')
+        self.assertEqual(m.call_count, 2)
+
+    @patch('time.sleep')
+    @requests_mock.Mocker()
+    def test_no_retry_of_trade(self, sleep_mock, m):
+        api = StocksExchangeAPI(api_secret=self.shared_secret, api_key=self.api_key, retry_policy=RetryPolicy())
+        m.register_uri('POST', STOCKS_EXCHANGE_BASE_URL.format(method=''), exc=requests.exceptions.ConnectionError)
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            api.call('trade', _type='BUY', currency1='BTC', currency2='NXT', amount=1, rate=1)
+        self.assertEqual(m.call_count, 1)
+        self.assertFalse(sleep_mock.called)
+
     @requests_mock.Mocker()
     def test_get_active_orders(self, m):
         method_name = 'get_active_orders'
@@ -252,3 +412,247 @@ class TestStocksExchangeAPI(CCAPITestCase):
     def test_reply_ticket(self, m):
         self.assertPrivateMethod('reply_ticket', response_data=REPLY_TICKET_RESPONSE, m=m, ticket_id=1,
                                  message='Some message')
+
+
+class TestStocksExchangeTypedRecords(CCAPITestCase):
+
+    def setUp(self):
+        super(TestStocksExchangeTypedRecords, self).setUp()
+        self.api = StocksExchangeAPI(api_secret=self.shared_secret, api_key=self.api_key, typed_records=True)
+
+    @requests_mock.Mocker()
+    def test_ticker(self, m):
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='ticker'), text=TICKER_RESPONSE)
+        data = self.api.call('ticker').data
+
+        self.assertEqual(len(data), 1)
+        ticker = data[0]
+        self.assertIsInstance(ticker, Ticker)
+        self.assertEqual(ticker.market_name, 'MUN_BTC')
+        self.assertEqual(ticker.bid, Decimal('0.00002905'))
+        self.assertEqual(ticker.last_day_ago, Decimal('0.00003094'))
+        self.assertEqual(ticker.updated_time, 1520779505)
+        self.assertFalse(hasattr(ticker, '__dict__'))
+
+    @requests_mock.Mocker()
+    def test_markets(self, m):
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='markets'), text=MARKETS_RESPONSE)
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='market_summary') + '/BTC/USD',
+                       text=MARKET_SUMMARY_RESPONSE)
+
+        markets = self.api.call('markets').data
+        self.assertEqual([market.market_name for market in markets], ['PRG_BTC', 'BTC_USDT'])
+        self.assertIs(markets[0].active, True)
+        self.assertEqual(markets[0].currency_precision, 8)
+
+        summary = self.api.call('market_summary', currency1='BTC', currency2='USD').data[0]
+        self.assertEqual(summary.buy_fee_percent, Decimal('0.002'))
+        self.assertIsNone(summary.partner_precision)
+
+    @requests_mock.Mocker()
+    def test_trade_history(self, m):
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='trades?pair=BTC_NXT'),
+                       text=TRADE_HISTORY_RESPONSE)
+        trades = self.api.call('trade_history', currency1='BTC', currency2='NXT').data
+
+        self.assertEqual(len(trades), 3)
+        self.assertEqual(trades[0], Trade(id=1234, timestamp=1523479914, quantity=Decimal('2.85310747'),
+                                          price=Decimal('0.00003251'), type='SELL'))
+
+    @requests_mock.Mocker()
+    def test_orderbook(self, m):
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='orderbook?pair=BTC_NXT'),
+                       text=ORDERBOOK_RESPONSE)
+        orderbook = self.api.call('orderbook', currency1='BTC', currency2='NXT').data
+
+        self.assertIsInstance(orderbook, Orderbook)
+        self.assertEqual(orderbook.buy[0], OrderbookEntry(quantity=Decimal('0.00189631'), rate=Decimal('58.27632628')))
+        self.assertEqual(len(orderbook.sell), 2)
+
+        # records survive pickling, so they can be saved by any cache backend
+        self.assertEqual(pickle.loads(pickle.dumps(orderbook)), orderbook)
+
+    @requests_mock.Mocker()
+    def test_grafic(self, m):
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='grafic_public'), text=PUBLIC_GRAFIC_RESPONSE)
+        candles = self.api.call('grafic', currency1='STEX', currency2='BTC').data
+
+        self.assertEqual([candle.date for candle in candles], ['2018-04-11 17:30:00', '2018-04-11 21:00:00'])
+        self.assertEqual(candles[1].close, Decimal('0.00021449'))
+        self.assertIsNone(candles[1].volume)
+
+    @requests_mock.Mocker()
+    def test_errors(self, m):
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='trades?pair=BTC_NXT'),
+                       text=GENERIC_ERROR_RESPONSE)
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='orderbook?pair=BTC_NXT'),
+                       text=json.dumps({'success': 1, 'result': [{'Quantity': 'x'}]}))
+
+        with self.assertRaises(CCAPIDataException):
+            self.api.call('trade_history', currency1='BTC', currency2='NXT')
+
+        with self.assertRaises(CCAPIResponseParsingException):
+            self.api.call('orderbook', currency1='BTC', currency2='NXT')
+
+    @requests_mock.Mocker()
+    def test_stream(self, m):
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='trades?pair=BTC_NXT'),
+                       text=TRADE_HISTORY_RESPONSE)
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='orderbook?pair=BTC_NXT'),
+                       text=ORDERBOOK_RESPONSE)
+        trades = list(self.api.call_stream('trade_history', currency1='BTC', currency2='NXT'))
+
+        self.assertEqual(len(trades), 3)
+        self.assertIsInstance(trades[0], Trade)
+
+        # orderbook is single record, it is parsed when response is complete
+        orderbooks = list(self.api.call_stream('orderbook', currency1='BTC', currency2='NXT', chunk_size=16))
+
+        self.assertEqual(len(orderbooks), 1)
+        self.assertIsInstance(orderbooks[0], Orderbook)
+
+    def test_raw_by_default(self):
+        api = StocksExchangeAPI()
+        self.assertIs(api.api_methods['ticker'].parser, StocksExchangeResponseParser)
+
+
+class TestStocksExchangeColumns(CCAPITestCase):
+
+    def setUp(self):
+        super(TestStocksExchangeColumns, self).setUp()
+        self.api = StocksExchangeAPI(api_secret=self.shared_secret, api_key=self.api_key, columnar=True,
+                                     typed_records=True)
+
+    @requests_mock.Mocker()
+    def test_trade_history(self, m):
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='trades?pair=BTC_NXT'),
+                       text=TRADE_HISTORY_RESPONSE)
+        data = self.api.call('trade_history', currency1='BTC', currency2='NXT').data
+
+        self.assertEqual(sorted(data), ['id', 'price', 'quantity', 'side', 'timestamp'])
+        self.assertEqual(list(data['timestamp']), [1523479914, 1523469243, 1523458927])
+        self.assertEqual(list(data['side']), [-1, 1, -1])
+        self.assertAlmostEqual(data['price'][0], 0.00003251)
+
+    @requests_mock.Mocker()
+    def test_scaled_grafic(self, m):
+        class ScaledGraficParser(GraficColumnsParser):
+            price_scale = 10 ** 8
+            use_numpy = False
+
+        m.register_uri('POST', STOCKS_EXCHANGE_BASE_URL.format(method=''), text=PRIVATE_GRAFIC_RESPONSE)
+        self.api.update_api_methods({
+            'private_grafic': APIMethod('private_grafic', GraficPrivateRequest, ScaledGraficParser)
+        })
+        data = self.api.call('private_grafic', pair='BTC_ETH').data
+
+        self.assertEqual(list(data['timestamp']), [1462147200, 1462233600])
+        self.assertEqual(list(data['close']), [535870000000, 1600000000])
+
+    @requests_mock.Mocker()
+    def test_errors(self, m):
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='grafic_public'), text=GENERIC_ERROR_RESPONSE)
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='trades?pair=BTC_NXT'),
+                       text=json.dumps({'success': 1, 'result': [{'id': 1, 'type': 'HOLD'}]}))
+
+        with self.assertRaises(CCAPIDataException):
+            self.api.call('grafic', currency1='STEX', currency2='BTC')
+
+        with self.assertRaises(CCAPIResponseParsingException):
+            self.api.call('trade_history', currency1='BTC', currency2='NXT')
+
+    @requests_mock.Mocker()
+    def test_stream(self, m):
+        class BatchedTradeHistoryParser(TradeHistoryColumnsParser):
+            stream_batch_size = 2
+
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='trades?pair=BTC_NXT'),
+                       text=TRADE_HISTORY_RESPONSE)
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='grafic_public'), text=PUBLIC_GRAFIC_RESPONSE)
+        self.api.update_api_methods({
+            'trade_history': APIMethod('trade_history', TradeHistoryRequest, BatchedTradeHistoryParser)
+        })
+        batches = list(self.api.call_stream('trade_history', currency1='BTC', currency2='NXT', chunk_size=16))
+
+        self.assertEqual([list(batch['timestamp']) for batch in batches], [[1523479914, 1523469243], [1523458927]])
+
+        # candles are nested deeper than `stream_items_key`, so they come in one batch
+        batches = list(self.api.call_stream('grafic', currency1='STEX', currency2='BTC', chunk_size=16))
+        expected = self.api.call('grafic', currency1='STEX', currency2='BTC').data
+
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(list(batches[0]['timestamp']), list(expected['timestamp']))
+
+    def test_methods(self):
+        self.assertIs(self.api.api_methods['grafic'].parser, GraficColumnsParser)
+        self.assertIs(self.api.api_methods['ticker'].parser, TickerParser)
+
+
+class TestStocksExchangePagination(CCAPITestCase):
+
+    def setUp(self):
+        super(TestStocksExchangePagination, self).setUp()
+        self.api = StocksExchangeAPI(api_secret=self.shared_secret, api_key=self.api_key, columnar=True)
+        self.requests = []
+
+    def orders_callback(self, request, context):
+        body = json.loads(request.body.decode('utf-8'))
+        self.requests.append(body)
+        end_id = body.get('end_id') or 12
+
+        # end_id is inclusive, so pages overlap by one order
+        ids = [i for i in range(end_id + 1, 0, -1) if i <= 12][:body['count']]
+        return json.dumps({'success': 1, 'data': {str(i): {'pair': 'BTC_NXT', 'amount': str(i)} for i in ids}})
+
+    @requests_mock.Mocker()
+    def test_iter_private_trade_history(self, m):
+        m.register_uri('POST', STOCKS_EXCHANGE_BASE_URL.format(method=''), text=self.orders_callback)
+        orders = list(self.api.iter_private_trade_history(count=5, pair='BTC_NXT'))
+
+        self.assertEqual([order['id'] for order in orders], list(range(12, 0, -1)))
+        self.assertEqual(orders[0]['amount'], '12')
+        self.assertEqual([request.get('end_id') for request in self.requests], [None, 7, 3])
+        self.assertTrue(all(request['method'] == 'TradeHistory' and request['pair'] == 'BTC_NXT'
+                            for request in self.requests))
+
+    @requests_mock.Mocker()
+    def test_iter_active_orders(self, m):
+        m.register_uri('POST', STOCKS_EXCHANGE_BASE_URL.format(method=''), text=GET_ACTIVE_ORDERS_RESPONSE)
+        orders = list(self.api.iter_active_orders(prefetch=False))
+
+        self.assertEqual([order['id'] for order in orders], [5303391, 5303351])
+        self.assertEqual(m.call_count, 1)
+
+    @requests_mock.Mocker()
+    def test_iter_transactions_history(self, m):
+        m.register_uri('POST', STOCKS_EXCHANGE_BASE_URL.format(method=''), text=TRANSACTIONS_HISTORY_RESPONSE)
+        transactions = list(self.api.iter_transactions_history(count=2))
+
+        self.assertEqual(sorted((item['type'], item['id']) for item in transactions),
+                         [('DEPOSIT', 112), ('DEPOSIT', 113), ('WITHDRAWAL', 15)])
+
+        # the second page repeats the first one, so iteration stops
+        self.assertEqual(m.call_count, 2)
+        self.assertEqual(json.loads(m.request_history[1].body.decode('utf-8'))['from'], 2)
+
+    @requests_mock.Mocker()
+    def test_iter_private_grafic(self, m):
+        def grafic_callback(request, context):
+            page = json.loads(request.body.decode('utf-8'))['page']
+            data = json.loads(PRIVATE_GRAFIC_RESPONSE)
+            data['data'].update(current_page=page, count_pages=2)
+            data['data']['graf'] = data['data']['graf'][page - 1:page]
+            return json.dumps(data)
+
+        m.register_uri('POST', STOCKS_EXCHANGE_BASE_URL.format(method=''), text=grafic_callback)
+        candles = list(self.api.iter_private_grafic(pair='BTC_ETH'))
+
+        self.assertEqual([candle['date'] for candle in candles], ['2016-05-02 00:00:00', '2016-05-03 00:00:00'])
+        self.assertEqual(m.call_count, 2)
+
+    @requests_mock.Mocker()
+    def test_errors(self, m):
+        m.register_uri('POST', STOCKS_EXCHANGE_BASE_URL.format(method=''), text=GENERIC_ERROR_RESPONSE)
+
+        with self.assertRaises(CCAPIDataException):
+            list(self.api.iter_active_orders())
@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+import tempfile
+import requests_mock
+from unittest import TestCase
+
+from pycryptoclients.markets.stocks_exchange.api import StocksExchangeAPI
+from pycryptoclients.markets.stocks_exchange.history import HistoryStore, HistorySync
+from pycryptoclients.markets.stocks_exchange.request import STOCKS_EXCHANGE_BASE_URL
+
+
+class TestHistorySync(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = HistoryStore(os.path.join(self.tmp_dir, 'history.db'))
+        self.sync = HistorySync(StocksExchangeAPI(api_key='key', api_secret='secret'), self.store, page_size=3)
+        self.trades = {i: {'pair': 'BTC_NXT', 'type': 'buy', 'amount': str(i), 'rate': '5352', 'timestamp': 1000 + i}
+                       for i in range(1, 8)}
+        self.deposits = {i: {'Currency': 'NXT', 'Amount': str(i), 'Date': 2000 + i} for i in range(1, 6)}
+        self.withdrawals = {i: {'Currency': 'NXT', 'Amount': str(i), 'Date': 3000 + i} for i in range(1, 3)}
+        self.requests = []
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def callback(self, request, context):
+        body = json.loads(request.body.decode('utf-8'))
+        self.requests.append(body)
+
+        if body['method'] == 'TradeHistory':
+            ids = sorted(i for i in self.trades if i >= (body.get('from_id') or 0))[:body['count']]
+            return json.dumps({'success': 1, 'data': {str(i): self.trades[i] for i in ids}})
+
+        offset = body.get('from') or 0
+        data = {}
+
+        for _type, transactions in (('DEPOSIT', self.deposits), ('WITHDRAWAL', self.withdrawals)):
+            ids = sorted(transactions, reverse=True)[offset:offset + body['count']]
+            if ids:
+                data[_type] = {str(i): transactions[i] for i in ids}
+
+        return json.dumps({'success': 1, 'data': data})
+
+    @requests_mock.Mocker()
+    def test_sync_trades(self, m):
+        m.register_uri('POST', STOCKS_EXCHANGE_BASE_URL.format(method=''), text=self.callback)
+
+        self.assertEqual(self.sync.sync_trades('BTC_NXT'), 7)
+        self.assertEqual(self.store.get_state('trades:BTC_NXT'), (7, 1007))
+        self.assertEqual([r['from_id'] for r in self.requests], [None, 4, 7])
+
+        # only newer trades are requested
+        self.requests = []
+        self.trades[8] = dict(self.trades[7], timestamp=1008)
+        self.assertEqual(self.sync.sync_trades('BTC_NXT'), 1)
+        self.assertEqual([r['from_id'] for r in self.requests], [8])
+        self.assertEqual(self.sync.sync_trades('BTC_NXT'), 0)
+
+        trades = self.store.get_trades('BTC_NXT', since=1003, until=1006)
+        self.assertEqual([trade['id'] for trade in trades], [3, 4, 5])
+        self.assertEqual(trades[0]['amount'], '3')
+        self.assertEqual(len(self.store.get_trades()), 8)
+        self.assertEqual(self.store.get_trades('BTC_ETH'), [])
+
+    @requests_mock.Mocker()
+    def test_sync_transactions(self, m):
+        m.register_uri('POST', STOCKS_EXCHANGE_BASE_URL.format(method=''), text=self.callback)
+
+        self.assertEqual(self.sync.sync_transactions('NXT'), 7)
+        self.assertEqual(self.store.get_state('transactions:NXT:DEPOSIT'), (5, 2005))
+        self.assertEqual(self.store.get_state('transactions:NXT:WITHDRAWAL'), (2, 3002))
+
+        self.requests = []
+        self.deposits[6] = dict(self.deposits[5], Date=2006)
+        self.assertEqual(self.sync.sync_transactions('NXT', prefetch=False), 1)
+
+        # fetching stops at the first page because it reaches synced deposits and withdrawals
+        self.assertEqual(len(self.requests), 1)
+
+        transactions = self.store.get_transactions('NXT', since=2004, until=3000)
+        self.assertEqual([(item['type'], item['id']) for item in transactions],
+                         [('DEPOSIT', 4), ('DEPOSIT', 5), ('DEPOSIT', 6)])
+
+    def test_persistence(self):
+        self.store.add_trades('trades:ALL', [dict(self.trades[1], id=1), dict(self.trades[2], id=2)])
+        self.assertEqual(self.store.add_trades('trades:ALL', [dict(self.trades[2], id=2)]), 0)
+
+        store = HistoryStore(self.store.path)
+        self.assertEqual(store.get_state('trades:ALL'), (2, 1002))
+        self.assertEqual(len(store.get_trades()), 2)
+        store.close()
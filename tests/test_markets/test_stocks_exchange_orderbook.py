@@ -0,0 +1,115 @@
+import requests_mock
+from decimal import Decimal
+from unittest import TestCase
+
+from pycryptoclients.markets.stocks_exchange.api import StocksExchangeAPI
+from pycryptoclients.markets.stocks_exchange.orderbook import OrderBook, OrderBookDiff, LevelChange, BIDS, ASKS
+from pycryptoclients.markets.stocks_exchange.request import STOCKS_EXCHANGE_BASE_URL
+from tests.test_markets import ORDERBOOK_RESPONSE
+
+
+def make_snapshot(buy, sell) -> dict:
+    return {
+        'success': 1,
+        'result': {
+            'buy': [{'Quantity': quantity, 'Rate': rate} for rate, quantity in buy],
+            'sell': [{'Quantity': quantity, 'Rate': rate} for rate, quantity in sell]
+        }
+    }
+
+
+class TestOrderBook(TestCase):
+
+    def setUp(self):
+        self.book = OrderBook('BTC', 'USDT')
+        self.diff = self.book.update(make_snapshot(buy=[('99', '1'), ('100', '2'), ('98', '3')],
+                                                   sell=[('102', '1.5'), ('101', '0.5'), ('103', '4')]))
+
+    def test_snapshot(self):
+        self.assertEqual(len(self.book), 6)
+        self.assertEqual(len(self.diff), 6)
+        self.assertTrue(all(change.is_added for change in self.diff))
+        self.assertEqual([change.price for change in self.diff.bids], [Decimal('100'), Decimal('99'), Decimal('98')])
+
+        self.assertEqual(self.book.best_bid(), (Decimal('100'), Decimal('2')))
+        self.assertEqual(self.book.best_ask(), (Decimal('101'), Decimal('0.5')))
+        self.assertEqual(self.book.spread(), Decimal('1'))
+        self.assertEqual(self.book.levels(ASKS, 2),
+                         [(Decimal('101'), Decimal('0.5')), (Decimal('102'), Decimal('1.5'))])
+
+    def test_depth(self):
+        self.assertEqual(self.book.get_quantity(BIDS, '99'), Decimal('1'))
+        self.assertEqual(self.book.count_levels(BIDS, '99'), 2)
+        self.assertEqual(self.book.depth(BIDS, '99'), Decimal('3'))
+        self.assertEqual(self.book.depth(BIDS, '100.5'), Decimal('0'))
+        self.assertEqual(self.book.depth(ASKS, '102.5'), Decimal('2'))
+        self.assertEqual(self.book.depth(ASKS, '1000'), Decimal('6'))
+
+        self.assertEqual(self.book.price_for_quantity(ASKS, '0.5'), Decimal('101'))
+        self.assertEqual(self.book.price_for_quantity(ASKS, '0.6'), Decimal('102'))
+        self.assertEqual(self.book.price_for_quantity(BIDS, '5'), Decimal('98'))
+        self.assertIsNone(self.book.price_for_quantity(BIDS, '7'))
+
+    def test_diff(self):
+        diff = self.book.update(make_snapshot(buy=[('100', '2'), ('99', '1.5'), ('100.5', '1')],
+                                              sell=[('101', '0.5'), ('102', '1.5'), ('103', '4')]))
+
+        self.assertEqual(len(diff), 3)
+        added, changed, removed = diff.bids
+        self.assertTrue(added.is_added)
+        self.assertEqual(added.price, Decimal('100.5'))
+        self.assertEqual((changed.price, changed.old_quantity, changed.quantity),
+                         (Decimal('99'), Decimal('1'), Decimal('1.5')))
+        self.assertTrue(removed.is_removed)
+        self.assertEqual(removed.price, Decimal('98'))
+        self.assertFalse(diff.asks)
+
+        self.assertEqual(self.book.best_bid(), (Decimal('100.5'), Decimal('1')))
+        self.assertEqual(self.book.depth(BIDS, '99'), Decimal('4.5'))
+
+        # unchanged snapshot produces empty diff
+        self.assertFalse(self.book.update(make_snapshot(buy=[('100', '2'), ('99', '1.5'), ('100.5', '1')],
+                                                        sell=[('101', '0.5'), ('102', '1.5'), ('103', '4')])))
+
+    def test_apply_diff(self):
+        replica = OrderBook('BTC', 'USDT')
+        replica.apply_diff(self.diff)
+        replica.apply_diff(self.book.update(make_snapshot(buy=[('99', '1'), ('97', '1')], sell=[('101', '0.7')])))
+
+        self.assertEqual(replica.bids, self.book.bids)
+        self.assertEqual(replica.asks, self.book.asks)
+        self.assertEqual(replica.depth(ASKS, '110'), Decimal('0.7'))
+
+    def test_apply_absent_removal(self):
+        replica = OrderBook('BTC', 'USDT')
+        replica.apply_diff(self.diff)
+        bids, asks = replica.bids, replica.asks
+        replica.apply_diff(OrderBookDiff([LevelChange(side=BIDS, price=Decimal('98.5'), quantity=None,
+                                                      old_quantity=Decimal('1'))]))
+
+        self.assertEqual(replica.bids, bids)
+        self.assertEqual(replica.asks, asks)
+        self.assertEqual(replica.best_bid(), self.book.best_bid())
+
+    def test_merged_and_empty_levels(self):
+        book = OrderBook()
+        book.update({'buy': [{'Quantity': '1', 'Rate': '10'}, {'Quantity': '2', 'Rate': '10.0'},
+                             {'Quantity': '0', 'Rate': '9'}], 'sell': []})
+
+        self.assertEqual(book.bids, [(Decimal('10'), Decimal('3'))])
+        self.assertIsNone(book.best_ask())
+        self.assertIsNone(book.spread())
+
+    @requests_mock.Mocker()
+    def test_refresh(self, m):
+        m.register_uri('GET', STOCKS_EXCHANGE_BASE_URL.format(method='orderbook?pair=BTC_NXT'),
+                       text=ORDERBOOK_RESPONSE)
+        book = OrderBook('BTC', 'NXT')
+
+        for api in (StocksExchangeAPI(), StocksExchangeAPI(typed_records=True)):
+            book.update({'buy': [], 'sell': []})
+            diff = book.refresh(api)
+
+            self.assertEqual(len(diff), 4)
+            self.assertEqual(book.best_bid(), (Decimal('100'), Decimal('0.003253')))
+            self.assertEqual(book.best_ask(), (Decimal('0.5'), Decimal('0.00001995')))
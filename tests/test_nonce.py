@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+
+from pycryptoclients.nonce import NonceGenerator, FileNonceGenerator, get_nonce_generator
+
+
+class TestNonceGenerator(TestCase):
+
+    @patch('time.time')
+    def test_monotonic(self, time_mock):
+        time_mock.return_value = 100.0
+        generator = NonceGenerator()
+        self.assertEqual([generator() for _ in range(3)], [100000000, 100000001, 100000002])
+
+        # clock going backwards does not decrease nonce
+        time_mock.return_value = 99.0
+        self.assertEqual(generator(), 100000003)
+
+        time_mock.return_value = 101.0
+        self.assertEqual(generator(), 101000000)
+
+    def test_threads(self):
+        generator = NonceGenerator()
+        nonces = []
+
+        def generate():
+            for _ in range(1000):
+                nonces.append(generator())
+
+        threads = [threading.Thread(target=generate) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(set(nonces)), 4000)
+
+    def test_makeweight(self):
+        with self.assertRaises(ValueError):
+            NonceGenerator('1234')
+
+        with self.assertRaises(ValueError):
+            NonceGenerator(-245643)
+
+    def test_get_nonce_generator(self):
+        self.assertIs(get_nonce_generator(b'key'), get_nonce_generator(b'key'))
+        self.assertIsNot(get_nonce_generator(b'key'), get_nonce_generator(b'other'))
+
+
+class TestFileNonceGenerator(TestCase):
+
+    def setUp(self):
+        super(TestFileNonceGenerator, self).setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'nonce')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+        super(TestFileNonceGenerator, self).tearDown()
+
+    @patch('time.time')
+    def test_shared_and_persistent(self, time_mock):
+        time_mock.return_value = 100.0
+        generator = FileNonceGenerator(self.path)
+        other_generator = FileNonceGenerator(self.path)
+
+        self.assertEqual(generator(), 100000000)
+        self.assertEqual(other_generator(), 100000001)
+        self.assertEqual(generator(), 100000002)
+
+        # state survives restart even if clock was moved back
+        time_mock.return_value = 50.0
+        self.assertEqual(FileNonceGenerator(self.path)(), 100000003)
@@ -0,0 +1,152 @@
+import asyncio
+import threading
+from unittest import TestCase
+
+from pycryptoclients.pagination import iter_pages, AsyncPageIterator
+from tests import AsyncTestCase
+
+
+class TestIterPages(TestCase):
+
+    def setUp(self):
+        self.items = list(range(1, 12))
+        self.cursors = []
+
+    def fetch_page(self, cursor):
+        # pages of 5 items which overlap by one item
+        self.cursors.append(cursor)
+        start = cursor or 0
+        items = self.items[start:start + 5]
+        return items, start + 4 if start + 5 < len(self.items) else None
+
+    def test_pages(self):
+        for prefetch in (True, False):
+            self.cursors = []
+            self.assertEqual(list(iter_pages(self.fetch_page, key=lambda item: item, prefetch=prefetch)), self.items)
+            self.assertEqual(self.cursors, [None, 4, 8])
+
+    def test_no_key(self):
+        self.assertEqual(len(list(iter_pages(self.fetch_page, prefetch=False))), 13)
+
+    def test_stop_without_new_items(self):
+        pages = {None: ([1, 2], 1), 1: ([1, 2], 2)}
+        self.assertEqual(list(iter_pages(pages.__getitem__, key=lambda item: item, prefetch=False)), [1, 2])
+
+    def test_empty(self):
+        self.assertEqual(list(iter_pages(lambda cursor: ([], None))), [])
+
+    def test_prefetch(self):
+        prefetched = threading.Event()
+
+        def fetch_page(cursor):
+            if cursor is None:
+                return [1, 2], 1
+
+            prefetched.set()
+            return [3], None
+
+        pages = iter_pages(fetch_page)
+        self.assertEqual(next(pages), 1)
+
+        # second page is requested while the first one is being consumed
+        self.assertTrue(prefetched.wait(1))
+        self.assertEqual(list(pages), [2, 3])
+
+    def test_errors(self):
+        def fetch_page(cursor):
+            if cursor is None:
+                return [1], 1
+            raise ValueError(cursor)
+
+        pages = iter_pages(fetch_page)
+        self.assertEqual(next(pages), 1)
+
+        with self.assertRaises(ValueError):
+            next(pages)
+
+
+class TestAsyncPageIterator(AsyncTestCase):
+
+    async def collect(self, pages) -> list:
+        items = []
+
+        async for item in pages:
+            items.append(item)
+
+        return items
+
+    async def test_pages(self):
+        items = list(range(1, 12))
+
+        for prefetch in (True, False):
+            cursors = []
+
+            async def fetch_page(cursor):
+                cursors.append(cursor)
+                start = cursor or 0
+                return items[start:start + 5], start + 4 if start + 5 < len(items) else None
+
+            pages = AsyncPageIterator(fetch_page, key=lambda item: item, prefetch=prefetch)
+            self.assertEqual(await self.collect(pages), items)
+            self.assertEqual(cursors, [None, 4, 8])
+
+    async def test_stop_without_new_items(self):
+        pages = {None: ([1, 2], 1), 1: ([1, 2], 2)}
+
+        async def fetch_page(cursor):
+            return pages[cursor]
+
+        self.assertEqual(await self.collect(AsyncPageIterator(fetch_page, key=lambda item: item)), [1, 2])
+
+    async def test_prefetch(self):
+        prefetched = asyncio.Event()
+
+        async def fetch_page(cursor):
+            if cursor is None:
+                return [1, 2], 1
+
+            prefetched.set()
+            return [3], None
+
+        pages = AsyncPageIterator(fetch_page)
+        self.assertEqual(await pages.__anext__(), 1)
+
+        # second page is requested while the first one is being consumed
+        await asyncio.wait_for(prefetched.wait(), 1)
+        self.assertEqual(await self.collect(pages), [2, 3])
+
+    async def test_close(self):
+        started = asyncio.Event()
+
+        async def fetch_page(cursor):
+            if cursor is None:
+                return [1, 2], 1
+
+            started.set()
+            await asyncio.sleep(10)
+
+        pages = AsyncPageIterator(fetch_page)
+        self.assertEqual(await pages.__anext__(), 1)
+        await started.wait()
+        future = pages._future
+        await pages.aclose()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await future
+
+        self.assertEqual(await self.collect(pages), [])
+
+    async def test_errors(self):
+        async def fetch_page(cursor):
+            if cursor is None:
+                return [1], 1
+            raise ValueError(cursor)
+
+        pages = AsyncPageIterator(fetch_page)
+        self.assertEqual(await pages.__anext__(), 1)
+
+        with self.assertRaises(ValueError):
+            await pages.__anext__()
+
+        with self.assertRaises(StopAsyncIteration):
+            await pages.__anext__()
@@ -0,0 +1,148 @@
+import asyncio
+import queue
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from pycryptoclients.markets.stocks_exchange.api import StocksExchangeAPI
+from pycryptoclients.poller import Poller, AsyncPoller
+from pycryptoclients.response import CCAPIResponse
+from tests import AsyncTestCase
+
+
+class TestPoller(TestCase):
+
+    def setUp(self):
+        self.api = StocksExchangeAPI()
+        self.calls = []
+        self.data = {'ticker': [1]}
+        self.lock = threading.Lock()
+
+    def call(self, method, **kwargs):
+        with self.lock:
+            self.calls.append((method, kwargs))
+
+        if method == 'fail':
+            raise ValueError(method)
+
+        return CCAPIResponse(list(self.data[method]))
+
+    def test_coalescing_and_changes(self):
+        received = queue.Queue()
+
+        with patch.object(self.api, 'call', side_effect=self.call), Poller(self.api, stagger=False) as poller:
+            first = poller.subscribe('ticker', interval=0.02, queue=received)
+            second = poller.subscribe('ticker', interval=0.5, callback=lambda s, r: received.put((s, r)))
+            every = poller.subscribe('ticker', interval=0.5, only_changed=False,
+                                     callback=lambda s, r: received.put((s, r)))
+
+            self.assertIs(first.job, second.job)
+            self.assertEqual(first.job.interval, 0.02)
+
+            # the first result is delivered to every subscriber
+            deliveries = [received.get(timeout=1) for _ in range(3)]
+            self.assertEqual(set(s for s, _ in deliveries), {first, second, every})
+            self.assertTrue(all(r.data == [1] for _, r in deliveries))
+
+            # unchanged data is delivered only to subscriber which wants every result
+            subscription, response = received.get(timeout=1)
+            self.assertIs(subscription, every)
+
+            self.data['ticker'] = [2]
+            changed = set()
+
+            while len(changed) < 3:
+                subscription, response = received.get(timeout=1)
+                if response.data == [2]:
+                    changed.add(subscription)
+
+            self.assertEqual(changed, {first, second, every})
+
+        # all subscriptions share one job polled with the shortest interval
+        self.assertTrue(all(call == ('ticker', {'saving_time': 0}) for call in self.calls))
+
+    def test_unsubscribe_and_errors(self):
+        received = queue.Queue()
+
+        with patch.object(self.api, 'call', side_effect=self.call), Poller(self.api, stagger=False) as poller:
+            subscription = poller.subscribe('fail', interval=0.01, queue=received)
+
+            for _ in range(2):
+                _, response = received.get(timeout=1)
+                self.assertIsInstance(response.exc, ValueError)
+
+            poller.unsubscribe(subscription)
+            self.assertFalse(poller._jobs)
+            time.sleep(0.05)
+            calls = len(self.calls)
+            time.sleep(0.05)
+            self.assertEqual(len(self.calls), calls)
+
+        with self.assertRaises(ValueError):
+            Poller(self.api).subscribe('ticker', interval=0)
+
+    def test_late_subscription(self):
+        poller = Poller(self.api, stagger=False)
+        received = []
+        first = poller.subscribe('ticker', interval=1.0, callback=lambda s, r: received.append((s, r.data, r.exc)))
+        job = first.job
+        error = ValueError('ticker')
+
+        poller._complete(job, time.monotonic(), CCAPIResponse([1]))
+        late = poller.subscribe('ticker', interval=1.0, callback=lambda s, r: received.append((s, r.data, r.exc)))
+        poller._complete(job, time.monotonic(), CCAPIResponse(None, exc=error))
+        poller._complete(job, time.monotonic(), CCAPIResponse([1]))
+
+        # subscriber which got only error receives current data even though it did not change
+        self.assertEqual(received, [(first, [1], None), (first, None, error), (late, None, error), (late, [1], None)])
+
+    def test_late_delta_subscription(self):
+        poller = Poller(self.api, stagger=False)
+        received = []
+        first = poller.subscribe('ticker', interval=1.0, delta_key='id', callback=lambda s, r: received.append((s, r)))
+        job = first.job
+
+        poller._complete(job, time.monotonic(), CCAPIResponse(job.tracker.update([{'id': 1}])))
+        late = poller.subscribe('ticker', interval=1.0, delta_key='id', callback=lambda s, r: received.append((s, r)))
+        poller._complete(job, time.monotonic(), CCAPIResponse(None, exc=ValueError('ticker')))
+        poller._complete(job, time.monotonic(), CCAPIResponse(job.tracker.update([{'id': 1}, {'id': 2}])))
+
+        # snapshot is delivered to late subscriber after error instead of delta
+        late_deliveries = [response for subscription, response in received if subscription is late]
+        self.assertEqual(len(late_deliveries), 2)
+        self.assertIsNotNone(late_deliveries[0].exc)
+        self.assertEqual(late_deliveries[1].data.added, [{'id': 1}, {'id': 2}])
+        self.assertEqual(received[-2][1].data.added, [{'id': 2}])
+
+    def test_stagger(self):
+        poller = Poller(self.api)
+        subscriptions = [poller.subscribe('ticker', interval=10.0, pair=str(i)) for i in range(20)]
+        next_runs = sorted(subscription.job.next_run - time.monotonic() for subscription in subscriptions)
+
+        self.assertTrue(all(-1.0 < next_run < 10.0 for next_run in next_runs))
+        self.assertGreater(next_runs[-1] - next_runs[0], 1.0)
+
+
+class TestAsyncPoller(AsyncTestCase):
+
+    async def test_poll(self):
+        api = StocksExchangeAPI()
+        values = iter([[1], [1], [2]])
+
+        async def call(method, **kwargs):
+            return CCAPIResponse(next(values, [2]))
+
+        with patch.object(api, 'call', side_effect=call):
+            poller = AsyncPoller(api, stagger=False)
+            received = asyncio.Queue()
+            poller.subscribe('ticker', interval=0.01, queue=received)
+            task = asyncio.ensure_future(poller.run())
+
+            _, first = await asyncio.wait_for(received.get(), 1)
+            _, second = await asyncio.wait_for(received.get(), 1)
+
+            poller.stop()
+            await asyncio.wait_for(task, 1)
+
+        self.assertEqual((first.data, second.data), ([1], [2]))
@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from pycryptoclients.ratelimit import TokenBucket, FileTokenBucket, RateLimiter
+
+
+class TestTokenBucket(TestCase):
+
+    @patch('time.monotonic')
+    def test_reserve(self, time_mock):
+        time_mock.return_value = 100.0
+        bucket = TokenBucket(rate=2.0, capacity=3)
+
+        # burst within capacity is not delayed
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0.0, 0.0, 0.0])
+
+        # next callers are queued
+        self.assertAlmostEqual(bucket.reserve(), 0.5)
+        self.assertAlmostEqual(bucket.reserve(), 1.0)
+
+        time_mock.return_value = 101.0
+        self.assertAlmostEqual(bucket.reserve(), 0.5)
+
+        # bucket is never refilled above capacity
+        time_mock.return_value = 200.0
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(bucket.reserve(), 0.5)
+
+    @patch('time.sleep')
+    def test_acquire(self, sleep_mock):
+        bucket = TokenBucket(rate=1.0)
+        bucket.acquire()
+        self.assertFalse(sleep_mock.called)
+
+        bucket.acquire()
+        self.assertEqual(sleep_mock.call_count, 1)
+        self.assertGreater(sleep_mock.call_args[0][0], 0.9)
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestFileTokenBucket(TestCase):
+
+    def setUp(self):
+        super(TestFileTokenBucket, self).setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'bucket')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+        super(TestFileTokenBucket, self).tearDown()
+
+    @patch('time.time')
+    def test_shared_state(self, time_mock):
+        time_mock.return_value = 100.0
+        bucket = FileTokenBucket(self.path, rate=1.0, capacity=2)
+        other_bucket = FileTokenBucket(self.path, rate=1.0, capacity=2)
+
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(other_bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 1.0)
+        self.assertAlmostEqual(other_bucket.reserve(), 2.0)
+
+        time_mock.return_value = 104.0
+        self.assertEqual(bucket.reserve(), 0.0)
+
+
+class TestRateLimiter(TestCase):
+
+    def test_get_buckets(self):
+        ticker = TokenBucket(1.0)
+        public = TokenBucket(1.0)
+        private = TokenBucket(1.0)
+        limiter = RateLimiter(methods={'ticker': ticker}, public=public, private=private,
+                              key_bucket_factory=lambda: TokenBucket(1.0))
+
+        self.assertEqual(limiter.get_buckets('ticker'), [ticker, public])
+        self.assertEqual(limiter.get_buckets('prices'), [public])
+
+        key_buckets = limiter.get_buckets('GetInfo', is_private=True, api_key=b'key')
+        self.assertEqual(key_buckets[0], private)
+        self.assertIs(limiter.get_buckets('Trade', is_private=True, api_key=b'key')[1], key_buckets[1])
+        self.assertIsNot(limiter.get_buckets('Trade', is_private=True, api_key=b'other')[1], key_buckets[1])
+
+    @patch('time.monotonic')
+    def test_reserve(self, time_mock):
+        time_mock.return_value = 100.0
+        limiter = RateLimiter(methods={'ticker': TokenBucket(1.0)}, public=TokenBucket(4.0))
+
+        self.assertEqual(limiter.reserve('ticker'), 0.0)
+        self.assertAlmostEqual(limiter.reserve('ticker'), 1.0)
+        self.assertEqual(limiter.reserve('prices'), 0.0)
+        self.assertEqual(RateLimiter().reserve('ticker'), 0.0)
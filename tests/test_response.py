@@ -0,0 +1,67 @@
+import json
+from unittest import TestCase
+
+from pycryptoclients.response import JSONStreamDecoder
+
+
+def decode(document, chunk_size=1, items_key=None):
+    decoder = JSONStreamDecoder(items_key=items_key)
+    data = document.encode('utf-8')
+    items = []
+
+    for i in range(0, len(data), chunk_size):
+        items.extend(decoder.feed(data[i:i + chunk_size]))
+
+    items.extend(decoder.close())
+    return items, decoder
+
+
+class TestJSONStreamDecoder(TestCase):
+
+    def test_array(self):
+        array = [{'market_name': 'MUN_BTC', 'ask': '0.000033', 'vol': 2665.35}, [1, [2, 3]], 'строка', 12345,
+                 -1.5e3, None, True, False, {}]
+        document = json.dumps(array, ensure_ascii=False, indent=2)
+
+        for chunk_size in (1, 2, 7, 64, len(document) * 4):
+            items, decoder = decode(document, chunk_size)
+            self.assertEqual(items, array)
+            self.assertFalse(decoder.is_object)
+
+        self.assertEqual(decode('[]')[0], [])
+        self.assertEqual(decode(' [ 1 , 2 ] \n')[0], [1, 2])
+
+    def test_items_are_returned_early(self):
+        decoder = JSONStreamDecoder()
+        self.assertEqual(decoder.feed(b'[{"a": 1}, {"b"'), [{'a': 1}])
+        self.assertEqual(decoder.feed(b': 2}, 12'), [{'b': 2}])
+        self.assertEqual(decoder.feed(b'3'), [])
+        self.assertEqual(decoder.feed(b']'), [123])
+        self.assertEqual(decoder.close(), [])
+
+    def test_object(self):
+        document = json.dumps({'success': 1, 'result': [{'id': 1}, {'id': 2}], 'extra': {'result': [3]}})
+        items, decoder = decode(document, 3, items_key='result')
+        self.assertEqual(items, [{'id': 1}, {'id': 2}])
+        self.assertTrue(decoder.is_object)
+        self.assertEqual(decoder.envelope, {'success': 1, 'extra': {'result': [3]}})
+
+        # not an array value is returned as single item
+        items, decoder = decode(json.dumps({'result': {'buy': [], 'sell': []}, 'error': None}), items_key='result')
+        self.assertEqual(items, [{'buy': [], 'sell': []}])
+        self.assertEqual(decoder.envelope, {'error': None})
+
+        items, decoder = decode(json.dumps({'success': 0, 'error': 'Invalid pair'}), items_key='result')
+        self.assertEqual(items, [])
+        self.assertEqual(decoder.envelope, {'success': 0, 'error': 'Invalid pair'})
+
+        self.assertEqual(decode('{}', items_key='result')[0], [])
+
+    def test_scalar(self):
+        self.assertEqual(decode('12')[0], [12])
+        self.assertEqual(decode('"text"')[0], ['text'])
+
+    def test_invalid(self):
+        for document in ('[1, 2', '[1 2]', '[1,]', '{"a" 1}', '{"a": 1,}', '[1] 2', '{"a": tru}', ''):
+            with self.assertRaises(ValueError, msg=document):
+                decode(document)
@@ -0,0 +1,72 @@
+import requests
+from email.utils import formatdate
+from unittest import TestCase
+from unittest.mock import patch
+
+from pycryptoclients.markets.stocks_exchange.request import TickerRequest, TradeRequest
+from pycryptoclients.retry import RetryPolicy
+
+
+def make_http_error(status_code, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    return requests.exceptions.HTTPError(response=response)
+
+
+class TestRetryPolicy(TestCase):
+
+    def setUp(self):
+        super(TestRetryPolicy, self).setUp()
+        self.req = TickerRequest()
+
+    def test_is_retryable(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.is_retryable(self.req, make_http_error(503)))
+        self.assertTrue(policy.is_retryable(self.req, make_http_error(429)))
+        self.assertFalse(policy.is_retryable(self.req, make_http_error(404)))
+        self.assertTrue(policy.is_retryable(self.req, requests.exceptions.ConnectionError()))
+        self.assertTrue(policy.is_retryable(self.req, requests.exceptions.ReadTimeout()))
+        self.assertFalse(policy.is_retryable(self.req, requests.exceptions.InvalidURL()))
+
+        trade = TradeRequest(api_key=b'key', api_secret=b'secret', _type='BUY', currency1='BTC', currency2='NXT',
+                             amount=1, rate=1)
+        self.assertFalse(policy.is_retryable(trade, requests.exceptions.ConnectionError()))
+        self.assertFalse(policy.is_retryable(trade, make_http_error(503)))
+
+    def test_backoff(self):
+        policy = RetryPolicy(max_attempts=10, backoff_base=0.5, backoff_cap=3.0, jitter=False)
+        exc = make_http_error(503)
+        self.assertEqual([policy.get_retry_delay(self.req, exc, i) for i in range(1, 7)],
+                         [0.5, 1.0, 2.0, 3.0, 3.0, 3.0])
+
+    @patch('random.uniform')
+    def test_jitter(self, uniform_mock):
+        uniform_mock.return_value = 0.3
+        policy = RetryPolicy(backoff_base=1.0)
+        self.assertEqual(policy.get_retry_delay(self.req, make_http_error(503), 2), 0.3)
+        uniform_mock.assert_called_once_with(0, 2.0)
+
+    def test_max_attempts(self):
+        policy = RetryPolicy(max_attempts=2)
+        exc = make_http_error(503)
+        self.assertIsNotNone(policy.get_retry_delay(self.req, exc, 1))
+        self.assertIsNone(policy.get_retry_delay(self.req, exc, 2))
+
+    def test_retry_after(self):
+        policy = RetryPolicy(jitter=False)
+        self.assertEqual(policy.get_retry_delay(self.req, make_http_error(429, {'Retry-After': '7'}), 1), 7.0)
+
+        # backoff longer than Retry-After is kept
+        self.assertEqual(policy.get_retry_delay(self.req, make_http_error(429, {'Retry-After': '0'}), 1), 0.5)
+
+        with patch('time.time') as time_mock:
+            time_mock.return_value = 1000.0
+            exc = make_http_error(503, {'Retry-After': formatdate(1012.0, usegmt=True)})
+            self.assertEqual(policy.get_retry_delay(self.req, exc, 1), 12.0)
+
+        exc = make_http_error(503, {'Retry-After': 'later'})
+        self.assertEqual(policy.get_retry_delay(self.req, exc, 1), 0.5)
+
+        policy = RetryPolicy(jitter=False, respect_retry_after=False)
+        self.assertEqual(policy.get_retry_delay(self.req, make_http_error(429, {'Retry-After': '7'}), 1), 0.5)
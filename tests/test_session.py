@@ -0,0 +1,65 @@
+import requests_mock
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from pycryptoclients.request import CCAPIRequest
+from pycryptoclients.session import CCSession
+
+
+url = 'http://example.com/test'
+
+
+class TestRequest(CCAPIRequest):
+    default_base_url = url
+
+
+class TestCCSession(TestCase):
+
+    def test_pool_configuration(self):
+        session = CCSession(pool_connections=3, pool_maxsize=7, pool_block=True)
+        adapter = session._get_session().get_adapter(url)
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertTrue(adapter._pool_block)
+        self.assertIs(adapter, session._get_session().get_adapter('https://example.com'))
+
+    @requests_mock.Mocker()
+    def test_keep_alive(self, m):
+        m.register_uri('GET', url, text='[]')
+
+        CCSession().send(TestRequest().prepare())
+        self.assertNotEqual(m.request_history[0].headers.get('Connection'), 'close')
+
+        CCSession(keep_alive=False).send(TestRequest().prepare())
+        self.assertEqual(m.request_history[1].headers['Connection'], 'close')
+
+    @patch('time.monotonic')
+    def test_idle_eviction(self, time_mock):
+        time_mock.return_value = 100.0
+        session = CCSession(idle_timeout=30.0, pool_maxsize=2)
+        sess = session._get_session()
+        pool = sess.get_adapter(url).poolmanager.connection_from_url(url)
+        idle, busy = MagicMock(), MagicMock()
+        pool.pool.get()  # slot of connection of request in flight
+        pool.pool.get()
+        pool.pool.put(idle)
+
+        time_mock.return_value = 120.0
+        session._get_session()
+        self.assertFalse(idle.close.called)
+
+        time_mock.return_value = 151.0
+        self.assertIs(session._get_session(), sess)
+        self.assertEqual(idle.close.call_count, 1)
+
+        # connection in flight is not closed and returns to pool
+        pool._put_conn(busy)
+        self.assertFalse(busy.close.called)
+        self.assertEqual(pool.pool.qsize(), 2)
+
+    def test_close(self):
+        with CCSession() as session:
+            sess = session._get_session()
+
+        self.assertIsNone(session._session)
+        self.assertIsNot(session._get_session(), sess)
@@ -1,6 +1,7 @@
+import threading
 from unittest import TestCase
 
-from pycryptoclients.utils import set_not_none_dict_kwargs, make_nonce
+from pycryptoclients.utils import set_not_none_dict_kwargs, make_nonce, SingleFlight
 
 
 class TestUtils(TestCase):
@@ -27,3 +28,48 @@ class TestUtils(TestCase):
         self.assertNotIn('d', _dict)
         self.assertEqual(_dict['e'], 0)
         self.assertEqual(_dict['f'], '')
+
+    def test_single_flight(self):
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def func(value):
+            calls.append(value)
+            started.set()
+            release.wait(5)
+            return value
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flights.do('key', func, 1)))
+        leader.start()
+        started.wait(5)
+
+        followers = [threading.Thread(target=lambda: results.append(flights.do('key', func, 2))) for _ in range(3)]
+        for t in followers:
+            t.start()
+
+        # other keys are not blocked by flight in progress
+        self.assertEqual(flights.do('other', lambda: 'other'), 'other')
+
+        release.set()
+        for t in [leader] + followers:
+            t.join(5)
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, [1, 1, 1, 1])
+
+        # finished flight is forgotten
+        self.assertEqual(flights.do('key', lambda: 3), 3)
+
+    def test_single_flight_exception(self):
+        flights = SingleFlight()
+
+        def func():
+            raise KeyError('fail')
+
+        with self.assertRaises(KeyError):
+            flights.do('key', func)
+
+        self.assertEqual(flights.do('key', lambda: 1), 1)
@@ -2,9 +2,11 @@ import json
 import unittest
 import requests_mock
 
+from pycryptoclients.exc import CCAPIDataException, CCAPINoMethodException
 from pycryptoclients.request import DEFAULT_USER_AGENT
 from pycryptoclients.response import CCAPIResponse
 from pycryptoclients.wallets.dash.api import DashWalletRPCClient
+from pycryptoclients.wallets.dash.request import DashRPCRequest
 from tests.test_wallets import DASH_GETINFO_RESPONSE
 
 
@@ -70,6 +72,85 @@ class TestDashWalletRPCClient(unittest.TestCase):
         self.assertIsInstance(data, dict)
         self.assertDictEqual(json.loads(DASH_GETINFO_RESPONSE)['result'], data)
 
+    def test_request_cache_key(self):
+        kwargs = dict(rpc_user='test_user', rpc_password='test_1', base_url=TEST_URL, method_name='signmessage',
+                      args_num=2)
+        req = DashRPCRequest(params=(234, 455), **kwargs)
+        same_req = DashRPCRequest(params=(234, 455), **kwargs)
+        same_req.json['id'] = 'other'
+
+        self.assertEqual(req.cache_key(), same_req.cache_key())
+        self.assertNotEqual(req.cache_key(), DashRPCRequest(params=(234, 456), **kwargs).cache_key())
+
+    @requests_mock.Mocker()
+    def test_call_stream(self, m):
+        deltas = [{'satoshis': i, 'txid': 'tx{}'.format(i), 'index': 0, 'height': 100 + i} for i in range(50)]
+        m.register_uri('POST', TEST_URL, text=json.dumps({'result': deltas, 'error': None, 'id': '1'}))
+
+        items = list(self.client.call_stream('getaddressdeltas', ({'addresses': ['XaddR']},), chunk_size=32))
+        self.assertEqual(items, deltas)
+        self.assertEqual(m.request_history[0].json()['method'], 'getaddressdeltas')
+
+        m.register_uri('POST', TEST_URL, text=json.dumps({'result': None, 'error': {'code': -5}, 'id': '1'}))
+        with self.assertRaises(CCAPIDataException):
+            list(self.client.call_stream('getaddressdeltas'))
+
+    @staticmethod
+    def batch_response(request, context):
+        # answer in reversed order to check matching of responses by id
+        response = []
+        for call in reversed(request.json()):
+            if call['method'] == 'verifymessage':
+                response.append({'result': None, 'error': {'code': -5, 'message': 'Invalid address'},
+                                 'id': call['id']})
+            else:
+                response.append({'result': {'method': call['method'], 'params': call['params']}, 'error': None,
+                                 'id': call['id']})
+        return json.dumps(response)
+
+    @requests_mock.Mocker()
+    def test_batch(self, m):
+        m.register_uri('POST', TEST_URL, text=self.batch_response)
+
+        responses = self.client.batch([
+            'getinfo',
+            ('getreceivedbyaddress', ('XaddR', 6, 'extra')),
+            ('verifymessage', ('XaddR', 'sign', 'message'))
+        ])
+
+        self.assertEqual(m.call_count, 1)
+        req_body = m.request_history[0].json()
+        self.assertIsInstance(req_body, list)
+        self.assertEqual([c['method'] for c in req_body], ['getinfo', 'getreceivedbyaddress', 'verifymessage'])
+        self.assertEqual(len(set(c['id'] for c in req_body)), 3)
+
+        self.assertEqual(len(responses), 3)
+        self.assertDictEqual(responses[0].data, {'method': 'getinfo', 'params': []})
+        self.assertDictEqual(responses[1].data, {'method': 'getreceivedbyaddress', 'params': ['XaddR', 6]})
+        self.assertIsNone(responses[1].exc)
+        self.assertIsNone(responses[2].data)
+        self.assertIsInstance(responses[2].exc, CCAPIDataException)
+
+    @requests_mock.Mocker()
+    def test_batch_chunks(self, m):
+        m.register_uri('POST', TEST_URL, text=self.batch_response)
+
+        calls = [('getaddressbalance', ({'addresses': ['Xaddr{}'.format(i)]},)) for i in range(5)]
+        responses = self.client.batch(calls, batch_size=2)
+
+        self.assertEqual(m.call_count, 3)
+        self.assertEqual([len(r.json()) for r in m.request_history], [2, 2, 1])
+        self.assertEqual(len(responses), 5)
+        self.assertTrue(all(r.data['method'] == 'getaddressbalance' for r in responses))
+
+        # addresses of balance lookups are sent
+        expected = [[{'addresses': ['Xaddr{}'.format(i)]}] for i in range(5)]
+        self.assertEqual([r.data['params'] for r in responses], expected)
+
+    def test_batch_absent_method(self):
+        with self.assertRaises(CCAPINoMethodException):
+            self.client.batch(['getinfo', 'karabas'])
+
 
 if __name__ == '__main__':
     unittest.main()